@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Compare JSON codecs and gzip for changes requests, against a local stub server.
+
+Usage: python benchmarks/bench_compression.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import threading
+import timeit
+
+from six.moves import BaseHTTPServer, socketserver
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+from gkeepapi import jsoncodec # pylint: disable=wrong-import-position
+from bench_snapshot import sample # pylint: disable=wrong-import-position
+
+PAGE = 20000
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Returns the same page of changes for every request, gzipped if the client accepts it."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        body = self.server.response
+        encoding = None
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = self.server.response_gzip
+            encoding = 'gzip'
+
+        self.server.sent += length
+        self.server.received += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): # pylint: disable=arguments-differ
+        pass
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+def main():
+    keep = sample()
+    nodes = keep.dump()['nodes'][:PAGE]
+    response = {'toVersion': '1', 'truncated': False, 'nodes': nodes}
+
+    codecs = [jsoncodec.JSONCodec()]
+    try:
+        codecs.append(jsoncodec.OrjsonCodec())
+    except ImportError:
+        print('orjson is not installed')
+
+    def bench(name, func):
+        t = min(timeit.repeat(func, number=1, repeat=5))
+        print('%-32s %8.1f ms' % (name, t * 1000))
+        return t
+
+    print('%d nodes' % len(nodes))
+    for codec in codecs:
+        data = codec.dumps(response)
+        bench('%s encode' % codec.name, lambda codec=codec: codec.dumps(response))
+        bench('%s decode' % codec.name, lambda codec=codec, data=data: codec.loads(data))
+    data = codecs[0].dumps(response)
+    bench('gzip', lambda: jsoncodec.gzip(data))
+    print('%-32s %8.1f KiB' % ('body', len(data) / 1024.0))
+    print('%-32s %8.1f KiB' % ('body, gzipped', len(jsoncodec.gzip(data)) / 1024.0))
+
+    server = Server(('127.0.0.1', 0), Handler)
+    server.response = data
+    server.response_gzip = jsoncodec.gzip(data)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.daemon = True
+    thread.start()
+
+    auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES)
+    auth._auth_token = 'token' # pylint: disable=protected-access
+    try:
+        for codec in codecs:
+            for compress in (False, True):
+                api = gkeepapi.KeepAPI(auth, codec=codec, compress=compress)
+                api._base_url = 'http://127.0.0.1:%d/' % server.server_address[1] # pylint: disable=protected-access
+                if not compress:
+                    # Opt out of compressed responses too.
+                    api._prepareRequest = _identity(api._prepareRequest) # pylint: disable=protected-access
+
+                server.sent = server.received = 0
+                name = '%s%s changes' % (codec.name, ', gzip' if compress else '')
+                bench(name, lambda api=api: api.changes(nodes=nodes))
+                print('%-32s %8.1f KiB up %8.1f KiB down' % (
+                    '', server.sent / 5 / 1024.0, server.received / 5 / 1024.0
+                ))
+                api.getTransport().close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def _identity(prepare):
+    def wrapper(auth_token, req_kwargs):
+        prepare(auth_token, req_kwargs)
+        req_kwargs['headers']['Accept-Encoding'] = 'identity'
+    return wrapper
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Compare upload size and serialization time of whole nodes against deltas, for typical edits.
+
+Usage: python benchmarks/bench_delta.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+from gkeepapi import jsoncodec # pylint: disable=wrong-import-position
+
+N = 2000
+
+def synced():
+    """Generate notes and lists as they'd be after a sync."""
+    keep = gkeepapi.Keep()
+    label = keep.createLabel('Label')
+    for i in range(N):
+        node = keep.createList('List %d' % i, [('Item %d' % j, False) for j in range(3)])
+        node.labels.add(label)
+        node.collaborators.add('user%d@example.com' % i)
+    for node in keep._findDirtyNodes(): # pylint: disable=protected-access
+        raw = node.save()
+        raw['serverId'] = 'server.' + raw['id']
+        raw['baseVersion'] = '1'
+        node.load(raw)
+    return keep
+
+def edit_text(node):
+    node.items[0].text = 'Updated text'
+
+def check(node):
+    node.items[1].checked = True
+
+def rename(node):
+    node.title = 'Renamed'
+
+def pin(node):
+    node.pinned = True
+
+def main():
+    codec = jsoncodec.JSONCodec()
+    print('%d lists, 3 items each' % N)
+    for edit in (edit_text, check, rename, pin):
+        results = []
+        for delta in (False, True):
+            keep = synced()
+            lists = keep.all()
+            def save(lists=lists, keep=keep, delta=delta):
+                for node in lists:
+                    edit(node)
+                return [
+                    node.save_delta() if delta else node.save()
+                    for node in keep._findDirtyNodes() # pylint: disable=protected-access
+                ]
+            elapsed = min(timeit.repeat(save, number=1, repeat=5))
+            results.append((elapsed, len(codec.dumps(save()))))
+        (full_time, full_size), (delta_time, delta_size) = results
+        print('%-10s %8.1f KiB -> %8.1f KiB  %6.1f ms -> %6.1f ms' % (
+            edit.__name__, full_size / 1024.0, delta_size / 1024.0, full_time * 1000, delta_time * 1000
+        ))
+
+if __name__ == '__main__':
+    main()
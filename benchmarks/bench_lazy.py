@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Compare eager and lazy node parsing when restoring a large account.
+
+Usage: python benchmarks/bench_lazy.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+
+N = 10000
+
+def sample():
+    """Generate a dump with a mix of notes and lists."""
+    keep = gkeepapi.Keep()
+    for i in range(N):
+        if i % 2:
+            keep.createNote('Note %d' % i, 'Some text %d' % i)
+        else:
+            keep.createList('List %d' % i, [('Item %d' % j, bool(j % 2)) for j in range(3)])
+    return keep.dump()
+
+def restore(state, lazy):
+    keep = gkeepapi.Keep(lazy=lazy)
+    keep.restore(state)
+    return keep
+
+def main():
+    state = sample()
+
+    # Parity
+    assert restore(state, False).dump() == restore(state, True).dump()
+
+    def bench(name, lazy):
+        t = min(timeit.repeat(lambda: restore(state, lazy), number=1, repeat=3))
+        tracemalloc.start()
+        keep = restore(state, lazy) # pylint: disable=unused-variable
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('%-24s %8.1f ms  %8.1f MiB peak' % (name, t * 1000, peak / 1048576.0))
+        return t
+
+    print('%d top level nodes' % N)
+    a = bench('eager restore', False)
+    b = bench('lazy restore', True)
+    print('%-24s %8.1fx' % ('speedup', a / b))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Time reads of a large list, reads after each kind of edit, and inserting items one at a time or in bulk.
+
+Usage: python benchmarks/bench_list.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+
+N = 10000
+
+def sample():
+    """Generate a list with every fifth item indented under the one before it."""
+    keep = gkeepapi.Keep()
+    glist = keep.createList('List', [('Item %d' % i, bool(i % 3)) for i in range(N)])
+    items = glist.items
+    for i in range(1, N, 5):
+        items[i - 1].indent(items[i])
+    return glist
+
+def main():
+    glist = sample()
+    items = glist.items
+    edits = [
+        ('read', lambda i: None),
+        ('text', lambda i: setattr(items[i], 'text', 'Edited')),
+        ('check', lambda i: setattr(items[i], 'checked', not items[i].checked)),
+        ('sort', lambda i: setattr(items[i], 'sort', items[i].sort + 1)),
+    ]
+    print('%d items' % N)
+    for name, edit in edits:
+        counter = iter(range(N))
+        def run(edit=edit, counter=counter):
+            edit(next(counter))
+            return glist.items, glist.checked, glist.unchecked, glist.text
+        elapsed = min(timeit.repeat(run, number=10, repeat=3)) / 10
+        print('%-6s %8.2f ms per edit + items, checked, unchecked and text' % (name, elapsed * 1000))
+
+    def add():
+        glist = gkeepapi.Keep().createList('List')
+        for i in range(N):
+            glist.add('Item %d' % i)
+
+    def extend():
+        glist = gkeepapi.Keep().createList('List')
+        glist.extend(('Item %d' % i, False) for i in range(N))
+
+    for name, insert in (('add', add), ('extend', extend)):
+        elapsed = min(timeit.repeat(insert, number=1, repeat=3))
+        print('%-6s %8.1f ms to insert %d items' % (name, elapsed * 1000, N))
+
+if __name__ == '__main__':
+    main()
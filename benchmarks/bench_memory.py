@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Measure the memory footprint of restored nodes.
+
+Usage: python benchmarks/bench_memory.py
+"""
+from __future__ import print_function
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+
+N = 10000
+
+def sample():
+    """Generate a dump with a mix of notes and lists."""
+    keep = gkeepapi.Keep()
+    for i in range(N):
+        if i % 2:
+            keep.createNote('Note %d' % i, 'Some text %d' % i)
+        else:
+            keep.createList('List %d' % i, [('Item %d' % j, bool(j % 2)) for j in range(3)])
+    return keep.dump()
+
+def measure(state, lazy):
+    """Restore the state and return the retained size in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    keep = gkeepapi.Keep(lazy=lazy)
+    keep.restore(state)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return keep, size
+
+def main():
+    state = sample()
+    print('%d top level nodes, %d nodes' % (N, len(state['nodes'])))
+    for name, lazy in (('eager restore', False), ('lazy restore', True)):
+        keep, size = measure(state, lazy)
+        count = len(keep._nodes) # pylint: disable=protected-access
+        print('%-24s %8.1f MiB  %6d bytes/node' % (name, size / 1048576.0, size // count))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Time common searches over a large account.
+
+Usage: python benchmarks/bench_query.py
+"""
+from __future__ import print_function
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+from bench_snapshot import sample # pylint: disable=wrong-import-position
+
+def main():
+    keep = sample()
+    label = keep.findLabel('Label 3')
+    pattern = re.compile('Item 2')
+    searches = [
+        ('all', dict()),
+        ('label', dict(labels=[label])),
+        ('label + color', dict(labels=[label], colors=[gkeepapi.node.ColorValue.White])),
+        ('text', dict(query='Some text 4')),
+        ('pattern', dict(query=pattern, colors=[gkeepapi.node.ColorValue.Red])),
+        ('unlabeled', dict(labels=[], pinned=False)),
+    ]
+    print('%d notes' % len(keep._nodes.getChildren(gkeepapi.node.Root.ID))) # pylint: disable=protected-access
+    for name, kwargs in searches:
+        elapsed = min(timeit.repeat(lambda kwargs=kwargs: list(keep.find(**kwargs)), number=3, repeat=3)) / 3
+        print('%-14s %8.2f ms' % (name, elapsed * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Compare binary snapshots against the dict + JSON state cache.
+
+Usage: python benchmarks/bench_snapshot.py
+"""
+from __future__ import print_function
+
+import io
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+
+N = 50000
+
+def sample():
+    """Generate an account with a mix of notes and lists."""
+    keep = gkeepapi.Keep()
+    labels = [keep.createLabel('Label %d' % i) for i in range(20)]
+    for i in range(N):
+        if i % 2:
+            node = keep.createNote('Note %d' % i, 'Some text %d' % i)
+        else:
+            node = keep.createList('List %d' % i, [('Item %d' % j, bool(j % 2)) for j in range(3)])
+        if i % 3 == 0:
+            node.labels.add(labels[i % len(labels)])
+    keep._keep_version = '1234567890' # pylint: disable=protected-access
+    return keep
+
+def json_dump(keep):
+    fp = io.StringIO()
+    json.dump(keep.dump(), fp)
+    return fp.getvalue()
+
+def json_restore(data):
+    keep = gkeepapi.Keep()
+    keep.restore(json.load(io.StringIO(data)))
+    return keep
+
+def snapshot_dump(keep):
+    fp = io.BytesIO()
+    keep.dumpTo(fp)
+    return fp.getvalue()
+
+def snapshot_restore(data):
+    keep = gkeepapi.Keep()
+    keep.restoreFrom(io.BytesIO(data))
+    return keep
+
+def main():
+    keep = sample()
+    state = keep.dump()
+    json_data = json_dump(keep)
+    snapshot_data = snapshot_dump(keep)
+
+    # Parity
+    assert snapshot_restore(snapshot_data).dump() == state
+
+    def bench(name, func):
+        t = min(timeit.repeat(func, number=1, repeat=3))
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('%-24s %8.1f ms  %8.1f MiB peak' % (name, t * 1000, peak / 1048576.0))
+        return t
+
+    print('%d top level nodes, %d nodes' % (N, len(state['nodes'])))
+    print('%-24s %8.1f MiB' % ('json size', len(json_data.encode('utf-8')) / 1048576.0))
+    print('%-24s %8.1f MiB' % ('snapshot size', len(snapshot_data) / 1048576.0))
+    a = bench('json dump', lambda: json_dump(keep))
+    b = bench('snapshot dump', lambda: snapshot_dump(keep))
+    print('%-24s %8.1fx' % ('dump speedup', a / b))
+    a = bench('json restore', lambda: json_restore(json_data))
+    b = bench('snapshot restore', lambda: snapshot_restore(snapshot_data))
+    print('%-24s %8.1fx' % ('restore speedup', a / b))
+
+if __name__ == '__main__':
+    main()
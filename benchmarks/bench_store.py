@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Compare resuming from and updating persistent stores against restoring a full snapshot and dumping.
+
+Usage: python benchmarks/bench_store.py
+"""
+from __future__ import print_function
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+from bench_snapshot import N, sample # pylint: disable=wrong-import-position
+
+def main():
+    keep = sample()
+    # Locally modified notes are loaded up front, so start from a synced account.
+    for node in keep._findDirtyNodes(): # pylint: disable=protected-access
+        node.save()
+    snapshot = io.BytesIO()
+    keep.dumpTo(snapshot)
+    snapshot_data = snapshot.getvalue()
+    note_id = keep.all()[N // 2].id
+
+    label_id = keep.findLabel('Label 0').id
+    stores = (('mmap', gkeepapi.store.MmapStore), ('sqlite', gkeepapi.store.SQLiteStore))
+
+    def bench(name, func):
+        t = min(timeit.repeat(func, number=1, repeat=3))
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('%-24s %8.1f ms  %8.1f MiB peak' % (name, t * 1000, peak / 1048576.0))
+        return t
+
+    def snapshot_resume():
+        keep = gkeepapi.Keep()
+        keep.restoreFrom(io.BytesIO(snapshot_data))
+        return keep
+
+    print('%d top level nodes' % N)
+    base_get = bench('snapshot resume + get', lambda: snapshot_resume().get(note_id))
+    base_find = bench('snapshot resume + find', lambda: list(snapshot_resume().find(labels=[label_id])))
+    base_dump = bench('dump', keep.dump)
+
+    tmp = tempfile.mkdtemp()
+    try:
+        for name, cls in stores:
+            path = os.path.join(tmp, name)
+            store = cls(path)
+            gkeepapi.Keep(store=store).restore(keep.dump())
+            store.close()
+            print('%-24s %8.1f MiB' % (name + ' size', os.path.getsize(path) / 1048576.0))
+
+            def store_get(cls=cls, path=path):
+                store = cls(path)
+                node = gkeepapi.Keep(store=store).get(note_id)
+                store.close()
+                return node
+
+            def store_find(cls=cls, path=path):
+                store = cls(path)
+                nodes = list(gkeepapi.Keep(store=store).find(labels=[label_id]))
+                store.close()
+                return nodes
+
+            store = cls(path)
+            store_keep = gkeepapi.Keep(store=store)
+
+            def store_update(store_keep=store_keep):
+                store_keep.get(note_id).title = 'Updated'
+                store_keep._flushStore() # pylint: disable=protected-access
+
+            assert snapshot_resume().get(note_id).save(False) == store_get().save(False)
+            assert len(list(snapshot_resume().find(labels=[label_id]))) == len(store_find())
+
+            print('%-24s %8.1fx' % (name + ' get speedup', base_get / bench(name + ' resume + get', store_get)))
+            print('%-24s %8.1fx' % (name + ' find speedup', base_find / bench(name + ' resume + find', store_find)))
+            print('%-24s %8.1fx' % (name + ' update speedup', base_dump / bench(name + ' update', store_update)))
+            store.close()
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Compare peak memory of an initial sync with and without streaming, against a local stub server.
+
+Usage: python benchmarks/bench_stream.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+import threading
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gkeepapi # pylint: disable=wrong-import-position
+from gkeepapi import jsoncodec # pylint: disable=wrong-import-position
+from bench_snapshot import sample # pylint: disable=wrong-import-position
+from bench_compression import PAGE, Server, Handler # pylint: disable=wrong-import-position
+
+def main():
+    nodes = sample().dump()['nodes'][:PAGE]
+    data = jsoncodec.JSONCodec().dumps({'toVersion': '1', 'truncated': False, 'nodes': nodes})
+    del nodes
+
+    server = Server(('127.0.0.1', 0), Handler)
+    server.response = data
+    server.response_gzip = jsoncodec.gzip(data)
+    server.sent = server.received = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    thread.daemon = True
+    thread.start()
+
+    auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES)
+    auth._auth_token = 'token' # pylint: disable=protected-access
+    print('%d nodes, %.1f MiB' % (PAGE, len(data) / 1048576.0))
+    try:
+        for stream in (False, True):
+            def sync(stream=stream):
+                keep = gkeepapi.Keep(stream=stream)
+                keep._keep_api.setAuth(auth) # pylint: disable=protected-access
+                keep._keep_api._base_url = 'http://127.0.0.1:%d/' % server.server_address[1] # pylint: disable=protected-access
+                keep._reminders_api.list = lambda: {'storageVersion': '1'} # pylint: disable=protected-access
+                keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'} # pylint: disable=protected-access
+                keep.sync()
+                return keep
+
+            elapsed = min(timeit.repeat(sync, number=1, repeat=3))
+            tracemalloc.start()
+            keep = sync()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del keep
+            print('%-12s %8.1f ms  %8.1f MiB peak  %8.1f MiB retained' % (
+                'stream' if stream else 'buffered', elapsed * 1000, peak / 1048576.0, current / 1048576.0
+            ))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Compare the NodeTimestamps codec against strptime/strftime.
+
+Usage: python benchmarks/bench_timestamps.py
+"""
+from __future__ import print_function
+
+import datetime
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gkeepapi import node # pylint: disable=wrong-import-position
+
+N = 100000
+
+def sample():
+    """Generate a mix of server (millisecond) and client (microsecond) timestamps, a third of them zero."""
+    strs = []
+    for i in range(N):
+        if i % 3 == 0:
+            strs.append('1970-01-01T00:00:00.000Z')
+            continue
+        dt = datetime.datetime.utcfromtimestamp(random.randint(0, 2000000000) + random.random())
+        tzs = dt.strftime(node.NodeTimestamps.TZ_FMT)
+        strs.append(tzs[:-4] + 'Z' if i % 2 else tzs)
+    return strs
+
+def main():
+    strs = sample()
+    dts = [datetime.datetime.strptime(tzs, node.NodeTimestamps.TZ_FMT) for tzs in strs]
+
+    # Parity
+    assert dts == [node.NodeTimestamps.str_to_dt(tzs) for tzs in strs]
+    assert [dt.strftime(node.NodeTimestamps.TZ_FMT) for dt in dts] == [node.NodeTimestamps.dt_to_str(dt) for dt in dts]
+
+    def bench(name, func):
+        t = min(timeit.repeat(func, number=1, repeat=5))
+        print('%-24s %8.1f ms  %6.2f us/op' % (name, t * 1000, t * 1e6 / N))
+        return t
+
+    print('%d timestamps' % N)
+    a = bench('strptime', lambda: [datetime.datetime.strptime(tzs, node.NodeTimestamps.TZ_FMT) for tzs in strs])
+    b = bench('str_to_dt', lambda: [node.NodeTimestamps.str_to_dt(tzs) for tzs in strs])
+    print('%-24s %8.1fx' % ('parse speedup', a / b))
+    a = bench('strftime', lambda: [dt.strftime(node.NodeTimestamps.TZ_FMT) for dt in dts])
+    b = bench('dt_to_str', lambda: [node.NodeTimestamps.dt_to_str(dt) for dt in dts])
+    print('%-24s %8.1fx' % ('format speedup', a / b))
+
+if __name__ == '__main__':
+    main()
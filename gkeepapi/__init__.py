@@ -7,16 +7,27 @@ __version__ = '0.11.5'
 
 import logging
 import re
+import sys
 import time
 import random
+import threading
 
 from uuid import getnode as get_mac
 
 import six
 import gpsoauth
-import requests
 
 from . import node as _node
+from . import index as _index
+from . import snapshot as _snapshot
+from . import store
+from . import transport as _transport
+from . import retry as _retry
+from . import tokencache
+from . import jsoncodec
+from . import jsonstream
+from . import upload as _upload
+from . import query as _query
 from . import exception
 
 logger = logging.getLogger(__name__)
@@ -26,14 +37,90 @@ try:
 except AttributeError:
     Pattern = re.Pattern # pylint: disable=no-member
 
+class _Task(object):
+    """Runs a function on a separate thread."""
+    def __init__(self, func, *args, **kwargs):
+        self._value = None
+        self._error = None
+        self._done = False
+        self._cleanup = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, args=(func, args, kwargs), name='gkeepapi-task')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, func, args, kwargs):
+        try:
+            value = func(*args, **kwargs)
+        except Exception: # pylint: disable=broad-except
+            self._error = sys.exc_info()
+            value = None
+        with self._lock:
+            self._value = value
+            self._done = True
+            cleanup = self._cleanup
+        if cleanup is not None and self._error is None:
+            cleanup(value)
+
+    def cancel(self, cleanup):
+        """Discard the result without waiting for the function to return.
+
+        Args:
+            cleanup (callable): Called with the return value, if any, to release it.
+        """
+        with self._lock:
+            self._cleanup = cleanup
+            done = self._done
+        if done and self._error is None:
+            cleanup(self._value)
+
+    def wait(self):
+        """Wait for the function to return.
+
+        Returns:
+            Union[Tuple, None]: Exception info, if the function raised.
+        """
+        self._thread.join()
+        return self._error
+
+    def result(self):
+        """Wait for the function to return.
+
+        Returns:
+            Any: The return value.
+
+        Raises:
+            Exception: Whatever the function raised.
+        """
+        if self.wait() is not None:
+            six.reraise(*self._error)
+        return self._value
+
 class APIAuth(object):
-    """Authentication token manager"""
-    def __init__(self, scopes):
+    """Authentication token manager.
+
+    The OAuth token is refreshed in the background shortly before it expires, so requests rarely hit an expired
+    token. Concurrent refreshes are coalesced into one.
+    """
+    REFRESH_MARGIN = 300
+
+    def __init__(self, scopes, cache=None, clock=time.time):
+        """
+        Args:
+            scopes (str): The OAuth scopes.
+            cache (gkeepapi.tokencache.TokenCache): A cache to reuse unexpired OAuth tokens from.
+            clock (callable): A function returning the current time in seconds since the epoch.
+        """
         self._master_token = None
         self._auth_token = None
+        self._expiry = None
         self._email = None
         self._android_id = None
         self._scopes = scopes
+        self._cache = cache
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._prefetch = None
 
     def login(self, email, password, android_id):
         """Authenticate to Google with the provided credentials.
@@ -53,7 +140,7 @@ class APIAuth(object):
             raise exception.LoginException(res.get('Error'), res.get('ErrorDetail'))
         self._master_token = res['Token']
 
-        self.refresh()
+        self._loadToken()
         return True
 
     def load(self, email, master_token, android_id):
@@ -71,7 +158,7 @@ class APIAuth(object):
         self._android_id = android_id
         self._master_token = master_token
 
-        self.refresh()
+        self._loadToken()
         return True
 
     def getMasterToken(self):
@@ -125,15 +212,30 @@ class APIAuth(object):
         self._android_id = android_id
 
     def getAuthToken(self):
-        """Gets the auth token.
+        """Gets the auth token. If it's about to expire, a refresh is started in the background. If it has
+        already expired, it's refreshed first.
 
         Returns:
             Union[str, None]: The auth token.
         """
+        if self._expiry is not None:
+            remaining = self._expiry - self._clock()
+            if remaining <= 0:
+                return self.refresh()
+            if remaining <= self.REFRESH_MARGIN:
+                self._refreshAhead()
         return self._auth_token
 
+    def getExpiry(self):
+        """Gets the auth token expiry time.
+
+        Returns:
+            Union[float, None]: Seconds since the epoch, or None if unknown.
+        """
+        return self._expiry
+
     def refresh(self):
-        """Refresh the OAuth token.
+        """Refresh the OAuth token. If another thread is already refreshing it, wait for that instead.
 
         Returns:
             string: The auth token.
@@ -141,6 +243,36 @@ class APIAuth(object):
         Raises:
             LoginException: If there was a problem refreshing the OAuth token.
         """
+        stale_token = self._auth_token
+        with self._lock:
+            if self._auth_token != stale_token:
+                return self._auth_token
+            return self._refresh()
+
+    def _refreshAhead(self):
+        with self._lock:
+            if self._prefetch is None:
+                self._prefetch = _Task(self._prefetchToken)
+
+    def _prefetchToken(self):
+        try:
+            # This runs on its own thread, so call the blocking refresh even if a subclass overrides it.
+            APIAuth.refresh(self)
+        except Exception as e: # pylint: disable=broad-except
+            logger.warning('Failed to refresh access token: %s', e)
+        finally:
+            self._prefetch = None
+
+    def _loadToken(self):
+        """Use a cached OAuth token if possible. Otherwise, request a new one."""
+        if self._cache is not None:
+            cached = self._cache.get(self._cache.key(self._email, self._scopes))
+            if cached is not None and cached[1] - self._clock() > self.REFRESH_MARGIN:
+                self._auth_token, self._expiry = cached
+                return self._auth_token
+        return self._refresh()
+
+    def _refresh(self):
         res = gpsoauth.perform_oauth(
             self._email, self._master_token, self._android_id,
             service=self._scopes,
@@ -152,23 +284,47 @@ class APIAuth(object):
                 raise exception.LoginException(res.get('Error'))
 
         self._auth_token = res['Auth']
+        self._expiry = float(res['Expiry']) if res.get('Expiry') else None
+        if self._cache is not None and self._expiry is not None:
+            self._cache.set(self._cache.key(self._email, self._scopes), self._auth_token, self._expiry)
         return self._auth_token
 
     def logout(self):
         """Log out of the account."""
         self._master_token = None
         self._auth_token = None
+        self._expiry = None
         self._email = None
         self._android_id = None
 
 class API(object):
     """Base API wrapper"""
     RETRY_CNT = 2
-    def __init__(self, base_url, auth=None):
-        self._session = requests.Session()
+    COMPRESS_MIN_SIZE = 1024
+    """Request bodies smaller than this aren't compressed"""
+
+    STREAM_CHUNK_SIZE = 65536
+    """Bytes to read at a time from streamed responses"""
+
+    def __init__(self, base_url, auth=None, transport=None, retry_policy=None, codec=None, compress=False): # pylint: disable=too-many-arguments
+        """
+        Args:
+            base_url (str): The API endpoint.
+            auth (APIAuth): The auth object.
+            transport (gkeepapi.transport.Transport): The transport to send requests with. By default, the API
+                gets its own.
+            retry_policy (gkeepapi.retry.RetryPolicy): The policy for retrying failed requests.
+            codec (gkeepapi.jsoncodec.JSONCodec): The codec for request and response bodies. Defaults to the
+                fastest one available.
+            compress (bool): Whether to gzip request bodies.
+        """
+        self._transport = transport if transport is not None else _transport.Transport()
+        self._retry_policy = retry_policy if retry_policy is not None else \
+            _retry.RetryPolicy(budgets={_retry.ErrorKind.Auth: self.RETRY_CNT})
+        self._codec = codec if codec is not None else jsoncodec.default_codec()
+        self._compress = compress
         self._auth = auth
         self._base_url = base_url
-        self._session.headers.update({'User-Agent': 'gkeepapi/' + __version__})
 
     def getAuth(self):
         """Get authentication details for this API.
@@ -186,38 +342,175 @@ class API(object):
         """
         self._auth = auth
 
-    def send(self, **req_kwargs):
+    def getTransport(self):
+        """Get the transport for this API.
+
+        Returns:
+            gkeepapi.transport.Transport: The transport.
+        """
+        return self._transport
+
+    def setTransport(self, transport):
+        """Set the transport for this API.
+
+        Args:
+            transport (gkeepapi.transport.Transport): The transport.
+        """
+        self._transport = transport
+
+    def getRetryPolicy(self):
+        """Get the retry policy for this API.
+
+        Returns:
+            gkeepapi.retry.RetryPolicy: The policy.
+        """
+        return self._retry_policy
+
+    def setRetryPolicy(self, retry_policy):
+        """Set the retry policy for this API.
+
+        Args:
+            retry_policy (gkeepapi.retry.RetryPolicy): The policy.
+        """
+        self._retry_policy = retry_policy
+
+    def getCodec(self):
+        """Get the JSON codec for this API.
+
+        Returns:
+            gkeepapi.jsoncodec.JSONCodec: The codec.
+        """
+        return self._codec
+
+    def setCodec(self, codec):
+        """Set the JSON codec for this API.
+
+        Args:
+            codec (gkeepapi.jsoncodec.JSONCodec): The codec.
+        """
+        self._codec = codec
+
+    def setCompression(self, compress):
+        """Set whether request bodies are gzipped. Responses are always requested with gzip.
+
+        Args:
+            compress (bool): Whether to compress requests.
+        """
+        self._compress = compress
+
+    def send(self, idempotent=None, stream=None, **req_kwargs):
         """Send an authenticated request to a Google API.
-        Automatically retries if the access token has expired.
+        Automatically refreshes the access token if it has expired, and retries transient errors according to the
+        :py:class:`gkeepapi.retry.RetryPolicy`.
 
         Args:
+            idempotent (Union[bool, None]): Whether the request can safely be repeated if it might've been
+                processed. Defaults to True for GET requests.
+            stream (Union[str, None]): If set, a successful response is parsed incrementally, streaming the array
+                with this key. Errors while reading the stream aren't retried.
             **req_kwargs: Arbitrary keyword arguments to pass to Requests.
 
         Return:
-            dict: The parsed JSON response.
+            Union[dict, gkeepapi.jsonstream.ObjectStream]: The parsed JSON response, or a stream if requested.
 
         Raises:
             APIException: If the server returns an error.
             LoginException: If :py:meth:`login` has not been called.
         """
-        i = 0
+        if idempotent is None:
+            idempotent = req_kwargs.get('method', 'GET').upper() == 'GET'
+
+        if stream is not None:
+            req_kwargs['stream'] = True
+
+        policy = self._retry_policy
+        attempts = {}
         while True:
-            response = self._send(**req_kwargs).json()
-            if 'error' not in response:
-                break
+            try:
+                response = self._send(**req_kwargs)
+                if stream is not None and response.status_code == 200:
+                    return jsonstream.ObjectStream(
+                        self._transport.iterContent(response, self.STREAM_CHUNK_SIZE), stream, response.close
+                    )
+                content = b''.join(self._transport.iterContent(response, self.STREAM_CHUNK_SIZE)) \
+                    if stream is not None else response.content
+            except self._transport.CONNECTION_ERRORS as e:
+                delay = None
+                if idempotent or not self._transport.wasSent(e):
+                    delay = self._nextDelay(attempts, _retry.ErrorKind.Connection)
+                if delay is None:
+                    raise
+                logger.info('Retrying after connection error in %.1fs: %s', delay, e)
+                policy.sleep(delay)
+                continue
 
-            error = response['error']
-            if error['code'] != 401:
+            data = self._parseResponse(response, content)
+            if 'error' not in data:
+                return data
+
+            error = data['error']
+            kind = policy.classify(error['code'])
+            delay = None
+            # Only rate limited requests are known not to have been processed.
+            if kind in (_retry.ErrorKind.Auth, _retry.ErrorKind.Throttle) or (kind is not None and idempotent):
+                retry_after = policy.parseRetryAfter(response.headers.get('Retry-After'))
+                delay = self._nextDelay(attempts, kind, retry_after)
+            if delay is None:
                 raise exception.APIException(error['code'], error)
 
-            if i >= self.RETRY_CNT:
-                raise exception.APIException(error['code'], error)
+            if kind == _retry.ErrorKind.Auth:
+                logger.info('Refreshing access token')
+                self._auth.refresh()
+            else:
+                logger.info('Retrying after error %s in %.1fs', error['code'], delay)
+                policy.sleep(delay)
+
+    def _nextDelay(self, attempts, kind, retry_after=None):
+        delay = self._retry_policy.getDelay(kind, attempts.get(kind, 0), retry_after)
+        attempts[kind] = attempts.get(kind, 0) + 1
+        return delay
+
+    def _parseResponse(self, response, content):
+        """Parse a response, synthesizing an error if the body isn't JSON.
+
+        Args:
+            response (requests.Response): The response.
+            content (bytes): The response body.
+
+        Returns:
+            dict: The parsed response.
+        """
+        try:
+            data = self._codec.loads(content)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return data
+        return {'error': {'code': response.status_code, 'message': content.decode('utf-8', 'replace')}}
 
-            logger.info('Refreshing access token')
-            self._auth.refresh()
-            i += 1
+    def _prepareRequest(self, auth_token, req_kwargs):
+        """Add auth headers to a request and encode its JSON body.
 
-        return response
+        Args:
+            auth_token (str): The auth token.
+            req_kwargs (dict): Keyword arguments for the request. Modified in place.
+        """
+        headers = {
+            'Authorization': 'OAuth ' + auth_token,
+            'User-Agent': 'gkeepapi/' + __version__,
+            # The transport decompresses responses transparently.
+            'Accept-Encoding': 'gzip',
+        }
+        headers.update(req_kwargs.get('headers') or {})
+
+        if 'json' in req_kwargs:
+            body = self._codec.dumps(req_kwargs.pop('json'))
+            headers['Content-Type'] = 'application/json; charset=UTF-8'
+            if self._compress and len(body) >= self.COMPRESS_MIN_SIZE:
+                body = jsoncodec.gzip(body)
+                headers['Content-Encoding'] = 'gzip'
+            req_kwargs['data'] = body
+        req_kwargs['headers'] = headers
 
     def _send(self, **req_kwargs):
         """Send an authenticated request to a Google API.
@@ -235,11 +528,8 @@ class API(object):
         if auth_token is None:
             raise exception.LoginException('Not logged in')
 
-        req_kwargs.setdefault('headers', {
-            'Authorization': 'OAuth ' + auth_token
-        })
-
-        return self._session.request(**req_kwargs)
+        self._prepareRequest(auth_token, req_kwargs)
+        return self._transport.request(**req_kwargs)
 
 class KeepAPI(API):
     """Low level Google Keep API client. Mimics the Android Google Keep app.
@@ -248,8 +538,8 @@ class KeepAPI(API):
     """
     API_URL = 'https://www.googleapis.com/notes/v1/'
 
-    def __init__(self, auth=None):
-        super(KeepAPI, self).__init__(self.API_URL, auth)
+    def __init__(self, auth=None, transport=None, retry_policy=None, codec=None, compress=False): # pylint: disable=too-many-arguments
+        super(KeepAPI, self).__init__(self.API_URL, auth, transport, retry_policy, codec, compress)
 
         create_time = time.time()
         self._session_id = self._generateId(create_time)
@@ -261,16 +551,18 @@ class KeepAPI(API):
             random.randint(1000000000, 9999999999)
         )
 
-    def changes(self, target_version=None, nodes=None, labels=None):
+    def changes(self, target_version=None, nodes=None, labels=None, stream=False):
         """Sync up (and down) all changes.
 
         Args:
             target_version (str): The local change version.
             nodes (List[dict]): A list of nodes to sync up to the server.
             labels (List[dict]): A list of labels to sync up to the server.
+            stream (bool): Whether to parse the response incrementally. Changed nodes can then be read with
+                :py:meth:`gkeepapi.jsonstream.ObjectStream.items` as they're received.
 
         Return:
-            dict: Description of all changes.
+            Union[dict, gkeepapi.jsonstream.ObjectStream]: Description of all changes.
 
         Raises:
             APIException: If the server returns an error.
@@ -325,10 +617,13 @@ class KeepAPI(API):
 
         logger.debug('Syncing %d labels and %d nodes', len(labels), len(nodes))
 
+        # Nodes are identified by client-generated IDs, so resending changes doesn't duplicate them.
         return self.send(
             url=self._base_url + 'changes',
             method='POST',
-            json=params
+            json=params,
+            idempotent=True,
+            stream='nodes' if stream else None
         )
 
 class MediaAPI(API):
@@ -338,8 +633,8 @@ class MediaAPI(API):
     """
     API_URL = 'https://keep.google.com/media/v2/'
 
-    def __init__(self, auth=None):
-        super(MediaAPI, self).__init__(self.API_URL, auth)
+    def __init__(self, auth=None, transport=None, retry_policy=None, codec=None, compress=False): # pylint: disable=too-many-arguments
+        super(MediaAPI, self).__init__(self.API_URL, auth, transport, retry_policy, codec, compress)
 
     def get(self, blob):
         """Get the canonical link to a media blob.
@@ -363,8 +658,8 @@ class RemindersAPI(API):
     """
     API_URL = 'https://www.googleapis.com/reminders/v1internal/reminders/'
 
-    def __init__(self, auth=None):
-        super(RemindersAPI, self).__init__(self.API_URL, auth)
+    def __init__(self, auth=None, transport=None, retry_policy=None, codec=None, compress=False): # pylint: disable=too-many-arguments
+        super(RemindersAPI, self).__init__(self.API_URL, auth, transport, retry_policy, codec, compress)
         self.static_params = {
             "taskList": [
                 {"systemListId": "MEMENTO"},
@@ -425,7 +720,8 @@ class RemindersAPI(API):
         return self.send(
             url=self._base_url + 'list',
             method='POST',
-            json=params
+            json=params,
+            idempotent=True
         )
 
     def history(self, storage_version):
@@ -440,7 +736,8 @@ class RemindersAPI(API):
         return self.send(
             url=self._base_url + 'history',
             method='POST',
-            json=params
+            json=params,
+            idempotent=True
         )
 
     def update(self):
@@ -478,28 +775,196 @@ class Keep(object):
         keep.sync()
     """
     OAUTH_SCOPES = 'oauth2:https://www.googleapis.com/auth/memento https://www.googleapis.com/auth/reminders'
+    RESTORE_BATCH_SIZE = 1000
 
-    def __init__(self):
-        self._keep_api = KeepAPI()
-        self._reminders_api = RemindersAPI()
-        self._media_api = MediaAPI()
+    def __init__(self, text_index=False, lazy=False, store=None, transport=None, retry_policy=None, token_cache=None,
+                 compress=False, stream=False, batcher=None): # pylint: disable=too-many-arguments
+        """
+        Args:
+            text_index (bool): Whether to maintain a full-text index to speed up :py:meth:`find` queries.
+            lazy (bool): Whether to defer decoding node timestamps, settings, annotations, collaborators and
+                blobs until they're accessed.
+            store (gkeepapi.store.Store): A persistent store to resume from. Notes are only loaded
+                from the store when they're accessed, and the store is updated after every :py:meth:`sync`.
+            transport (gkeepapi.transport.Transport): The transport to send requests with. This can be shared
+                between Keep objects. By default, a new one is created.
+            retry_policy (gkeepapi.retry.RetryPolicy): The policy for retrying failed requests. Transient errors are
+                retried with backoff by default.
+            token_cache (gkeepapi.tokencache.TokenCache): A cache of OAuth tokens for :py:meth:`login` and
+                :py:meth:`resume`. Use a :py:class:`gkeepapi.tokencache.FileTokenCache` to reuse tokens across
+                restarts.
+            compress (bool): Whether to gzip request bodies. This mostly benefits syncs that upload many changes.
+            stream (bool): Whether to parse changes from the server as they're received, rather than reading whole
+                responses into memory first. This lowers peak memory use during the initial sync of large accounts.
+            batcher (gkeepapi.upload.UploadBatcher): Splits local changes into several requests. By default,
+                requests are limited to 1000 nodes or about 4 MiB.
+        """
+        self._stream = stream
+        self._batcher = batcher if batcher is not None else _upload.UploadBatcher()
+        self._upload = None
+        self._token_cache = token_cache
+        self._keep_api = None
+        self._reminders_api = None
+        self._media_api = None
+        self._createAPIs(transport, retry_policy, compress)
         self._keep_version = None
         self._reminder_version = None
         self._labels = {}
-        self._nodes = {}
-        self._sid_map = {}
+        self._nodes = _index.NodeRegistry()
+        self._dirty_nodes = {}
+        self._use_text_index = text_index
+        self._text_index = None
+        self._lazy = lazy
+        self._label_index = _index.LabelIndex()
+        self._store = None
+        self._store_nodes = {}
+        self._store_deleted = set()
+        self._store_loading = False
 
         self._clear()
+        if store is not None:
+            self._store = store
+            self._loadStore()
+
+    def _createAPIs(self, transport, retry_policy, compress):
+        """Create the API clients.
+
+        Args:
+            transport (gkeepapi.transport.Transport): The transport to send requests with, or None to create one.
+            retry_policy (gkeepapi.retry.RetryPolicy): The policy for retrying failed requests.
+            compress (bool): Whether to gzip request bodies.
+        """
+        if transport is None:
+            transport = _transport.Transport()
+        self._keep_api = KeepAPI(transport=transport, retry_policy=retry_policy, compress=compress)
+        self._reminders_api = RemindersAPI(transport=transport, retry_policy=retry_policy, compress=compress)
+        self._media_api = MediaAPI(transport=transport, retry_policy=retry_policy)
 
     def _clear(self):
         self._keep_version = None
         self._reminder_version = None
         self._labels = {}
-        self._nodes = {}
-        self._sid_map = {}
+        self._nodes = _index.NodeRegistry()
+        self._dirty_nodes = {}
+        self._text_index = _index.TextIndex() if self._use_text_index else None
+        self._label_index = _index.LabelIndex()
+        self._store_nodes = {}
+        self._store_deleted = set()
+        if self._store is not None:
+            self._store.clear()
 
         root_node = _node.Root()
-        self._nodes[_node.Root.ID] = root_node
+        root_node.watch(self._onNodeModified)
+        self._nodes.add(root_node)
+
+    def _onNodeModified(self, node):
+        self._dirty_nodes[node.id] = node
+        if self._store is not None:
+            self._store_nodes[node.id] = node
+        self._nodes.reindex(node)
+        self._indexText(node)
+        if isinstance(node, _node.TopLevelNode):
+            self._label_index.update(node)
+
+    def _indexText(self, node):
+        """Queue the top level node containing the given node for text reindexing.
+
+        Args:
+            node (gkeepapi.node.Node): The modified node.
+        """
+        if self._text_index is None:
+            return
+
+        while node is not None and node.parent_id != _node.Root.ID:
+            node = node.parent
+        if node is not None:
+            self._text_index.update(node)
+
+    def _loadStore(self):
+        """Load account metadata and locally modified nodes from the store."""
+        meta = self._store.getMeta()
+        if meta is None:
+            return
+
+        self._parseUserInfo({'labels': meta['labels']})
+        self._keep_version = meta['keep_version']
+        self._reminder_version = meta.get('reminder_version')
+        self._materialize(self._store.getDirtyIds())
+
+    def _materialize(self, node_ids):
+        """Load nodes from the store, along with the rest of the note containing them.
+
+        Args:
+            node_ids (Iterable[str]): Node IDs. IDs that aren't stored or are already loaded are ignored.
+        """
+        store = self._store
+        if store is None:
+            return
+
+        top_ids = set()
+        for node_id in node_ids:
+            if node_id in self._nodes or node_id not in store:
+                continue
+            parent_id = store.getParentId(node_id)
+            while parent_id != _node.Root.ID and parent_id in store:
+                node_id = parent_id
+                parent_id = store.getParentId(node_id)
+            if node_id not in self._nodes:
+                top_ids.add(node_id)
+
+        if not top_ids:
+            return
+
+        raw = []
+        queue = list(top_ids)
+        while queue:
+            node_id = queue.pop()
+            raw.append(store.load(node_id))
+            queue.extend(store.getChildIds(node_id))
+
+        self._store_loading = True
+        try:
+            self._parseNodes(raw)
+        finally:
+            self._store_loading = False
+
+    def _materializeAll(self):
+        """Load all notes from the store."""
+        if self._store is not None:
+            self._materialize(self._store.getChildIds(_node.Root.ID))
+
+    def _flushStore(self):
+        """Write nodes modified since the last call to the store."""
+        store = self._store
+        if store is None:
+            return
+
+        nodes = {}
+        for node in self._store_nodes.values():
+            # Skip nodes that have been detached from the tree.
+            top_node = node
+            while top_node is not None and top_node.parent_id != _node.Root.ID:
+                top_node = top_node.parent
+            if top_node is None or self._nodes.get(top_node.id) is not top_node:
+                continue
+
+            nodes[node.id] = node
+            # New children (ListItems) aren't reported individually.
+            for child in node.children:
+                if child.dirty or child.id not in store:
+                    nodes[child.id] = child
+
+        deleted_ids = set()
+        queue = list(self._store_deleted)
+        while queue:
+            node_id = queue.pop()
+            deleted_ids.add(node_id)
+            queue.extend(store.getChildIds(node_id))
+        deleted_ids.difference_update(nodes)
+
+        store.update(self._keep_version, self._reminder_version, self.labels(), nodes.values(), deleted_ids)
+        self._store_nodes = {}
+        self._store_deleted = set()
 
     def login(self, username, password, state=None, sync=True):
         """Authenticate to Google with the provided credentials & sync.
@@ -512,7 +977,7 @@ class Keep(object):
         Raises:
             LoginException: If there was a problem logging in.
         """
-        auth = APIAuth(self.OAUTH_SCOPES)
+        auth = APIAuth(self.OAUTH_SCOPES, self._token_cache)
 
         ret = auth.login(username, password, get_mac())
         if ret:
@@ -531,7 +996,7 @@ class Keep(object):
         Raises:
             LoginException: If there was a problem logging in.
         """
-        auth = APIAuth(self.OAUTH_SCOPES)
+        auth = APIAuth(self.OAUTH_SCOPES, self._token_cache)
 
         ret = auth.load(email, master_token, android_id=get_mac())
         if ret:
@@ -570,19 +1035,20 @@ class Keep(object):
         Args:
             state (dict): Serialized state to load.
         """
-        # Find all nodes manually, as the Keep object isn't aware of new ListItems
-        # until they've been synced to the server.
-        nodes = []
-        for node in self.all():
-            nodes.append(node)
-            for child in node.children:
-                nodes.append(child)
         return {
             'keep_version': self._keep_version,
             'labels': [label.save(False) for label in self.labels()],
-            'nodes': [node.save(False) for node in nodes]
+            'nodes': [node.save(False) for node in self._dumpNodes()]
         }
 
+    def _dumpNodes(self):
+        # Find all nodes manually, as the Keep object isn't aware of new ListItems
+        # until they've been synced to the server.
+        for node in self.all():
+            yield node
+            for child in node.children:
+                yield child
+
     def restore(self, state):
         """Unserialize saved note data.
 
@@ -593,6 +1059,59 @@ class Keep(object):
         self._parseUserInfo({'labels': state['labels']})
         self._parseNodes(state['nodes'])
         self._keep_version = state['keep_version']
+        self._flushStore()
+
+    def dumpTo(self, fp):
+        """Serialize note data to a binary snapshot. This is a more compact and faster alternative to
+        :py:meth:`dump`.
+
+        Args:
+            fp (file): A file object opened in binary mode.
+        """
+        writer = _snapshot.Writer(fp)
+        writer.write(_snapshot.RecordType.Meta, {'keep_version': self._keep_version})
+        for label in self.labels():
+            writer.write(_snapshot.RecordType.Label, label.save(False))
+        for node in self._dumpNodes():
+            writer.write(_snapshot.RecordType.Node, node.save(False))
+        writer.close()
+
+    def restoreFrom(self, fp):
+        """Unserialize note data from a binary snapshot written by :py:meth:`dumpTo`.
+
+        Args:
+            fp (file): A file object opened in binary mode.
+
+        Raises:
+            ParseException: If the snapshot is invalid.
+        """
+        self._clear()
+        keep_version = None
+        labels = []
+        nodes = []
+        for type_, value in _snapshot.Reader(fp):
+            if type_ == _snapshot.RecordType.Meta:
+                keep_version = value['keep_version']
+            elif type_ == _snapshot.RecordType.Label:
+                labels.append(value)
+            elif type_ == _snapshot.RecordType.Node:
+                if labels is not None:
+                    self._parseUserInfo({'labels': labels})
+                    labels = None
+                # Nodes are parsed in batches. Only split before a top level node, so that list items
+                # can always find their siblings.
+                if len(nodes) >= self.RESTORE_BATCH_SIZE and value.get('parentId') == _node.Root.ID:
+                    self._parseNodes(nodes)
+                    nodes = []
+                nodes.append(value)
+            else:
+                logger.warning('Unknown snapshot record type: %s', type_)
+
+        if labels is not None:
+            self._parseUserInfo({'labels': labels})
+        self._parseNodes(nodes)
+        self._keep_version = keep_version
+        self._flushStore()
 
     def get(self, node_id):
         """Get a note with the given ID.
@@ -603,9 +1122,15 @@ class Keep(object):
         Returns:
             gkeepapi.node.TopLevelNode: The Note or None if not found.
         """
-        return \
-            self._nodes[_node.Root.ID].get(node_id) or \
-            self._nodes[_node.Root.ID].get(self._sid_map.get(node_id))
+        if self._store is not None:
+            self._materialize([node_id, self._store.getIdByServerId(node_id)])
+
+        node = self._nodes.getChildren(_node.Root.ID).get(node_id)
+        if node is None:
+            node = self._nodes.getByServerId(node_id)
+            if node is not None and node.parent_id != _node.Root.ID:
+                node = None
+        return node
 
     def add(self, node):
         """Register a top level node (and its children) for syncing up to the server. There's no need to call this for nodes created by
@@ -621,8 +1146,12 @@ class Keep(object):
         if node.parent_id != _node.Root.ID:
             raise exception.InvalidException('Not a top level node')
 
-        self._nodes[node.id] = node
+        self._nodes.add(node)
         self._nodes[node.parent_id].append(node, False)
+        if self._store is not None:
+            self._store_nodes[node.id] = node
+        self._indexText(node)
+        self._label_index.update(node)
 
     def find(self, query=None, func=None, labels=None, colors=None, pinned=None, archived=None, trashed=False): # pylint: disable=too-many-arguments
         """Find Notes based on the specified criteria.
@@ -639,26 +1168,29 @@ class Keep(object):
         Return:
             List[gkeepapi.node.TopLevelNode]: Results.
         """
+        q = self.query().pinned(pinned).archived(archived).trashed(trashed)
+        if query is not None:
+            q.text(query)
+        if func is not None:
+            q.filter(func)
         if labels is not None:
-            labels = [i.id if isinstance(i, _node.Label) else i for i in labels]
-
-        return (node for node in self.all() if
-            (query is None or (
-                (isinstance(query, six.string_types) and (query in node.title or query in node.text)) or
-                (isinstance(query, Pattern) and (
-                    query.search(node.title) or query.search(node.text)
-                ))
-            )) and
-            (func is None or func(node)) and \
-            (labels is None or \
-             (not labels and not node.labels.all()) or \
-             (any((node.labels.get(i) is not None for i in labels)))
-            ) and \
-            (colors is None or node.color in colors) and \
-            (pinned is None or node.pinned == pinned) and \
-            (archived is None or node.archived == archived) and \
-            (trashed is None or node.trashed == trashed)
-        )
+            if labels:
+                q.label(*labels)
+            else:
+                q.unlabeled()
+        if colors is not None:
+            q.color(*colors)
+        return iter(q)
+
+    def query(self):
+        """Start a query for Notes. Criteria are added by chaining calls::
+
+            notes = keep.query().label(label).pinned().text('milk').all()
+
+        Returns:
+            gkeepapi.query.Query: A query matching all notes that aren't trashed.
+        """
+        return _query.Query(self)
 
     def createNote(self, title=None, text=None):
         """Create a new managed note. Any changes to the note will be uploaded when :py:meth:`sync` is called.
@@ -694,8 +1226,7 @@ class Keep(object):
         node = _node.List()
         if title is not None:
             node.title = title
-        for text, checked in items:
-            node.add(text, checked)
+        node.extend(items)
         self.add(node)
         return node
 
@@ -760,7 +1291,8 @@ class Keep(object):
 
         label = self._labels[label_id]
         label.delete()
-        for node in self.all():
+        self._materializeAll()
+        for node in list(self._label_index.get(label_id).values()):
             node.labels.remove(label)
 
     def labels(self):
@@ -782,19 +1314,32 @@ class Keep(object):
         """
         return self._media_api.get(blob)
 
+    def hasChanges(self):
+        """Check whether there are local changes that haven't been synced up to the server.
+
+        Returns:
+            bool: Whether there are changes.
+        """
+        # Copy the values, as this might be called from another thread while nodes are being modified.
+        return any(node.dirty for node in list(self._dirty_nodes.values())) or \
+            any(label.dirty for label in list(self._labels.values()))
+
     def all(self):
         """Get all Notes.
 
         Returns:
             List[gkeepapi.node.TopLevelNode]: Notes
         """
-        return self._nodes[_node.Root.ID].children
+        self._materializeAll()
+        return list(self._nodes.getChildren(_node.Root.ID).values())
 
-    def sync(self, resync=False):
+    def sync(self, resync=False, concurrent=False):
         """Sync the local Keep tree with the server. If resyncing, local changes will be detroyed. Otherwise, local changes to notes, labels and reminders will be detected and synced up.
 
         Args:
             resync (bool): Whether to resync data.
+            concurrent (bool): Whether to overlap requests with processing. Reminders are synced on a separate
+                thread, and the next page of changes is fetched while the current one is being parsed.
 
         Raises:
             SyncException: If there is a consistency issue.
@@ -802,45 +1347,264 @@ class Keep(object):
         if resync:
             self._clear()
 
+        try:
+            if concurrent:
+                self._syncConcurrently()
+            else:
+                self._syncReminders()
+                self._syncNotes()
+        finally:
+            if self._upload is not None:
+                self._upload.abort()
+            self._upload = None
+
+        self._finishSync()
+
+    def _syncConcurrently(self):
+        """Sync reminders and notes in parallel. Errors from syncing notes take precedence."""
+        reminders = _Task(self._syncReminders)
+        try:
+            self._syncNotesPipelined()
+        except Exception:
+            error = reminders.wait()
+            if error is not None:
+                logger.error('Reminder sync failed', exc_info=error)
+            raise
+
+        reminders.result()
+
+    def _syncReminders(self):
         while True:
             logger.debug('Starting reminder sync: %s', self._reminder_version)
-            changes = self._reminders_api.list()
-
-            if 'task' in changes:
-                self._parseTasks(changes['task'])
-
-            self._reminder_version = changes['storageVersion']
-            logger.debug('Finishing sync: %s', self._reminder_version)
+            self._applyReminderChanges(self._reminders_api.list())
             history = self._reminders_api.history(self._reminder_version)
             if self._reminder_version == history['highestStorageVersion']:
                 break
 
+    def _syncNotes(self):
         while True:
             logger.debug('Starting keep sync: %s', self._keep_version)
+            changes = self._keep_api.changes(**self._prepareChanges())
+            if not self._finishBatch(self._applyChanges(changes)):
+                break
 
-            labels_updated = any((i.dirty for i in self._labels.values()))
-            changes = self._keep_api.changes(
-                target_version=self._keep_version,
-                nodes=[i.save() for i in self._findDirtyNodes()],
-                labels=[i.save() for i in self._labels.values()] if labels_updated else None,
-            )
+    def _syncNotesPipelined(self):
+        """Sync notes, fetching the next page of changes while the current one is parsed.
+
+        The first batch of local changes is sent up with the first request, so later requests only need the
+        version. Pages are still applied in order. Any remaining batches are sent once all pages are applied.
+        """
+        logger.debug('Starting keep sync: %s', self._keep_version)
+        kwargs = {'stream': True} if self._stream else {}
+        changes = self._keep_api.changes(**self._prepareChanges())
+        while True:
+            pending = None
+            try:
+                # Streamed pages can only be prefetched if the version precedes the nodes. Pages that are
+                # already known to be rejected aren't followed.
+                fields = changes.readFields() if isinstance(changes, jsonstream.ObjectStream) else changes
+                self._checkChanges(fields)
+                if fields.get('truncated') and 'toVersion' in fields:
+                    logger.debug('Prefetching keep sync: %s', fields['toVersion'])
+                    pending = _Task(self._keep_api.changes, target_version=fields['toVersion'], **kwargs)
+
+                truncated = self._applyChanges(changes)
+            except Exception:
+                if isinstance(changes, jsonstream.ObjectStream):
+                    changes.close()
+                if pending is not None:
+                    pending.cancel(self._discardChanges)
+                raise
+            self._upload.acknowledge()
+
+            if not truncated:
+                break
+            if pending is not None:
+                changes = pending.result()
+            else:
+                changes = self._keep_api.changes(target_version=self._keep_version, **kwargs)
 
-            if changes.get('forceFullResync'):
-                raise exception.ResyncRequiredException('Full resync required')
+        if self._upload.remaining:
+            self._syncNotes()
 
-            if changes.get('upgradeRecommended'):
-                raise exception.UpgradeRecommendedException('Upgrade recommended')
+    @staticmethod
+    def _discardChanges(changes):
+        """Release a page of changes that won't be applied.
 
-            if 'userInfo' in changes:
-                self._parseUserInfo(changes['userInfo'])
+        Args:
+            changes (Union[dict, gkeepapi.jsonstream.ObjectStream]): The response from :py:meth:`KeepAPI.changes`.
+        """
+        if isinstance(changes, jsonstream.ObjectStream):
+            changes.close()
 
-            if 'nodes' in changes:
-                self._parseNodes(changes['nodes'])
+    def _applyReminderChanges(self, changes):
+        """Apply a page of reminder changes from the server.
 
-            self._keep_version = changes['toVersion']
-            logger.debug('Finishing sync: %s', self._keep_version)
-            if not changes['truncated']:
-                break
+        Args:
+            changes (dict): The response from :py:meth:`RemindersAPI.list`.
+        """
+        if 'task' in changes:
+            self._parseTasks(changes['task'])
+
+        self._reminder_version = changes['storageVersion']
+        logger.debug('Finishing sync: %s', self._reminder_version)
+
+    def _prepareChanges(self):
+        """Collect local changes to send up to the server.
+
+        Returns:
+            dict: Keyword arguments for :py:meth:`KeepAPI.changes`.
+        """
+        if self._upload is None:
+            self._upload = self._batcher.start(self._findDirtyNodes())
+
+        labels_updated = any((i.dirty for i in self._labels.values()))
+        kwargs = {
+            'target_version': self._keep_version,
+            'nodes': self._upload.nextBatch(),
+            'labels': [i.save() for i in self._labels.values()] if labels_updated else None,
+        }
+        if self._stream:
+            kwargs['stream'] = True
+        return kwargs
+
+    def _finishBatch(self, truncated):
+        """Record that a batch of local changes was applied.
+
+        Args:
+            truncated (bool): Whether there are more changes to fetch.
+
+        Returns:
+            bool: Whether another request is needed.
+        """
+        self._upload.acknowledge()
+        return truncated or self._upload.remaining
+
+    def _applyChanges(self, changes):
+        """Apply a page of changes from the server.
+
+        Args:
+            changes (Union[dict, gkeepapi.jsonstream.ObjectStream]): The response from :py:meth:`KeepAPI.changes`.
+
+        Returns:
+            bool: Whether there are more changes to fetch.
+
+        Raises:
+            SyncException: If there is a consistency issue.
+        """
+        streamed = isinstance(changes, jsonstream.ObjectStream)
+        if streamed:
+            changes = self._readChanges(changes)
+
+        self._checkChanges(changes)
+
+        if 'userInfo' in changes:
+            self._parseUserInfo(changes['userInfo'])
+
+        if 'nodes' in changes:
+            if self._store is not None and not streamed:
+                self._materialize(
+                    node_id for raw_node in changes['nodes']
+                    for node_id in (raw_node['id'], raw_node.get('parentId'))
+                )
+            self._parseNodes(changes['nodes'])
+
+        self._keep_version = changes['toVersion']
+        logger.debug('Finishing sync: %s', self._keep_version)
+        return changes['truncated']
+
+    def _readChanges(self, stream):
+        """Read a page of changes from the server as it's received. The raw response is never held in memory, but
+        nodes are held until the whole page is read, as fields after them might reject it. New nodes are decoded
+        as they're received, as they take up less space than raw data.
+
+        Args:
+            stream (gkeepapi.jsonstream.ObjectStream): The response from :py:meth:`KeepAPI.changes`.
+
+        Returns:
+            dict: The changes. Nodes are raw, or decoded but not yet added to the tree.
+
+        Raises:
+            SyncException: If there is a consistency issue.
+        """
+        try:
+            changes = stream.readFields()
+            # Stop early if the fields before the nodes already reject the page.
+            self._checkChanges(changes)
+            raw_nodes = stream.items()
+            if self._store is not None:
+                raw_nodes = self._materializeEach(raw_nodes)
+            raw_nodes = list(self._decodeNew(raw_nodes))
+        finally:
+            stream.close()
+
+        changes = dict(changes)
+        changes['nodes'] = raw_nodes
+        return changes
+
+    def _materializeEach(self, raw_nodes, batch_size=1000):
+        """Load stored nodes touched by a stream of changes, in batches, before they're parsed.
+
+        Args:
+            raw_nodes (Iterable[dict]): Raw nodes.
+            batch_size (int): Number of nodes to look up at a time.
+
+        Yields:
+            dict: The raw nodes.
+        """
+        batch = []
+        for raw_node in raw_nodes:
+            batch.append(raw_node)
+            if len(batch) >= batch_size:
+                self._materialize(node_id for raw in batch for node_id in (raw['id'], raw.get('parentId')))
+                for raw in batch:
+                    yield raw
+                batch = []
+        self._materialize(node_id for raw in batch for node_id in (raw['id'], raw.get('parentId')))
+        for raw in batch:
+            yield raw
+
+    def _decodeNew(self, raw_nodes):
+        """Decode nodes that don't exist yet, without adding them to the tree.
+
+        Args:
+            raw_nodes (Iterable[dict]): Raw nodes.
+
+        Yields:
+            Union[dict, gkeepapi.node.Node]: New nodes, and raw data for the rest.
+        """
+        created = set()
+        for raw_node in raw_nodes:
+            node_id = raw_node['id']
+            # Changes to existing nodes, and nodes that appear twice, are applied from raw data later.
+            node = None
+            if 'parentId' in raw_node and node_id not in self._nodes and node_id not in created:
+                node = _node.from_json(raw_node, self._lazy)
+            if node is None:
+                yield raw_node
+            else:
+                created.add(node_id)
+                yield node
+
+    @staticmethod
+    def _checkChanges(changes):
+        """Check whether the server rejected a sync.
+
+        Args:
+            changes (dict): Fields from the response to :py:meth:`KeepAPI.changes`.
+
+        Raises:
+            SyncException: If the client needs to resync or upgrade.
+        """
+        if changes.get('forceFullResync'):
+            raise exception.ResyncRequiredException('Full resync required')
+
+        if changes.get('upgradeRecommended'):
+            raise exception.UpgradeRecommendedException('Upgrade recommended')
+
+    def _finishSync(self):
+        """Persist the result of a sync."""
+        self._flushStore()
 
         if _node.DEBUG:
             self._clean()
@@ -850,27 +1614,39 @@ class Keep(object):
 
     def _parseNodes(self, raw): # pylint: disable=too-many-branches
         created_nodes = []
+        updated_nodes = []
         deleted_nodes = []
         listitem_nodes = []
         for raw_node in raw:
+            if isinstance(raw_node, _node.Node):
+                # Decoded while the page was read
+                node = raw_node
+                self._nodes.add(node)
+                created_nodes.append(node)
+                logger.debug('Created node: %s', node.id)
+
             # Update nodes
-            if raw_node['id'] in self._nodes:
+            elif raw_node['id'] in self._nodes:
                 node = self._nodes[raw_node['id']]
 
-                if 'parentId' in raw_node:
+                if 'parentId' not in raw_node:
+                    deleted_nodes.append(node)
+                elif self._upload is not None and self._upload.isUnsent(node.id):
+                    # Local changes haven't been sent yet. The server merges them once they are.
+                    logger.debug('Skipped node with unsent changes: %s', raw_node['id'])
+                    continue
+                else:
                     node.load(raw_node)
-                    self._sid_map[node.server_id] = node.id
+                    self._nodes.reindex(node)
+                    updated_nodes.append(node)
                     logger.debug('Updated node: %s', raw_node['id'])
-                else:
-                    deleted_nodes.append(node)
 
             else:
-                node = _node.from_json(raw_node)
+                node = _node.from_json(raw_node, self._lazy)
                 if node is None:
                     logger.debug('Discarded unknown node')
                 else:
-                    self._nodes[raw_node['id']] = node
-                    self._sid_map[node.server_id] = node.id
+                    self._nodes.add(node)
                     created_nodes.append(node)
                     logger.debug('Created node: %s', raw_node['id'])
 
@@ -899,20 +1675,35 @@ class Keep(object):
             parent_node = self._nodes.get(node.parent_id)
             parent_node.append(node, False)
 
+        if self._store is not None and not self._store_loading:
+            for node in created_nodes + updated_nodes:
+                self._store_nodes[node.id] = node
+            for node in deleted_nodes:
+                self._store_deleted.add(node.id)
+
+        for node in created_nodes + updated_nodes:
+            self._indexText(node)
+            if isinstance(node, _node.TopLevelNode):
+                self._label_index.update(node)
+
         # Detach deleted nodes from the tree
         for node in deleted_nodes:
+            if self._text_index is not None:
+                if node.parent_id == _node.Root.ID:
+                    self._text_index.remove(node.id)
+                else:
+                    self._indexText(node.parent)
+            self._label_index.remove(node.id)
             node.parent.remove(node)
-            del self._nodes[node.id]
-            if node.server_id is not None:
-                del self._sid_map[node.server_id]
+            self._nodes.remove(node.id)
+            self._dirty_nodes.pop(node.id, None)
             logger.debug('Deleted node: %s', node.id)
 
-        for node in self.all():
-            for label_id in node.labels._labels: # pylint: disable=protected-access
-                node.labels._labels[label_id] = self._labels.get(label_id) # pylint: disable=protected-access
+        self._rebindLabels(node for node in created_nodes + updated_nodes if isinstance(node, _node.TopLevelNode))
 
     def _parseUserInfo(self, raw):
         labels = {}
+        changed_ids = set()
         if 'labels' in raw:
             for label in raw['labels']:
                 if label['mainId'] in self._labels:
@@ -921,25 +1712,89 @@ class Keep(object):
                     logger.debug('Updated label: %s', label['mainId'])
                 else:
                     node = _node.Label()
+                    changed_ids.add(label['mainId'])
                     logger.debug('Created label: %s', label['mainId'])
                 node.load(label)
                 labels[label['mainId']] = node
 
         for label_id in self._labels:
+            changed_ids.add(label_id)
             logger.debug('Deleted label: %s', label_id)
 
         self._labels = labels
 
+        # Only notes referencing a created or deleted label need their references updated.
+        nodes = {}
+        for label_id in changed_ids:
+            nodes.update(self._label_index.get(label_id))
+        self._rebindLabels(nodes.values())
+
+    def _rebindLabels(self, nodes):
+        """Point label references on the given nodes at the current :class:`gkeepapi.node.Label` objects.
+
+        Args:
+            nodes (Iterable[gkeepapi.node.TopLevelNode]): Nodes to update.
+        """
+        for node in nodes:
+            for label_id in node.labels._labels: # pylint: disable=protected-access
+                node.labels._labels[label_id] = self._labels.get(label_id) # pylint: disable=protected-access
+
     def _findDirtyNodes(self):
+        """Collect nodes that need to be synced up to the server.
+
+        Only nodes that reported a modification since the last call are examined. Ancestors of a
+        modified node are included as well, ahead of their children.
+
+        Returns:
+            List[gkeepapi.node.Node]: Dirty nodes.
+        """
+        root = self._nodes[_node.Root.ID]
+        found = {}
+        for node_id, node in list(self._dirty_nodes.items()):
+            if not node._local_dirty: # pylint: disable=protected-access
+                del self._dirty_nodes[node_id]
+                continue
+
+            chain = []
+            while node is not None and node is not root:
+                chain.append(node)
+                node = node.parent
+            attached = node is root
+
+            for node in reversed(chain):
+                # Register new nodes (ListItems) the Keep object isn't aware of yet.
+                if node.id not in self._nodes:
+                    if not attached:
+                        continue
+                    self._nodes.add(node)
+                found[node.id] = node
+
+        if _node.DEBUG:
+            expected = self._scanDirtyNodes()
+            if set(expected) != set(found):
+                logger.error('Dirty node mismatch: missing %s, extra %s',
+                    sorted(set(expected) - set(found)),
+                    sorted(set(found) - set(expected))
+                )
+
+        return list(found.values())
+
+    def _scanDirtyNodes(self):
+        """Collect dirty nodes by checking every node in the tree. Used to verify
+        :py:meth:`_findDirtyNodes` in debug mode.
+
+        Returns:
+            Dict[str, gkeepapi.node.Node]: Dirty nodes.
+        """
         for node in list(self._nodes.values()):
             for child in node.children:
                 if not child.id in self._nodes:
-                    self._nodes[child.id] = child
+                    self._nodes.add(child)
 
-        nodes = []
+        nodes = {}
         for node in self._nodes.values():
             if node.dirty:
-                nodes.append(node)
+                nodes[node.id] = node
 
         return nodes
 
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.aio
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+
+An asyncio client, built on :py:mod:`aiohttp`. This requires Python 3.5+ and the `aio` extra::
+
+    pip install gkeepapi[aio]
+"""
+
+import asyncio
+import logging
+
+from uuid import getnode as get_mac
+
+import aiohttp
+
+from . import APIAuth, API, KeepAPI, MediaAPI, RemindersAPI, Keep
+from . import exception
+from . import retry as _retry
+from . import jsoncodec
+
+logger = logging.getLogger(__name__)
+
+class AsyncAPIAuth(APIAuth):
+    """Authentication token manager for the asyncio client.
+
+    :py:mod:`gpsoauth` is synchronous, so requests to the auth server are run in the default executor.
+    """
+    def getAuthToken(self):
+        """Gets the auth token. If it's about to expire, a refresh is started in the background. Expired tokens are
+        never refreshed inline, as that would block the event loop. Instead, they're refreshed when the server
+        rejects them.
+
+        Returns:
+            Union[str, None]: The auth token.
+        """
+        if self._expiry is not None and self._expiry - self._clock() <= self.REFRESH_MARGIN:
+            self._refreshAhead()
+        return self._auth_token
+
+    async def login(self, email, password, android_id): # pylint: disable=invalid-overridden-method
+        """Authenticate to Google with the provided credentials.
+
+        Args:
+            email (str): The account to use.
+            password (str): The account password.
+            android_id (str): An identifier for this client.
+
+        Raises:
+            LoginException: If there was a problem logging in.
+        """
+        return await self._run(super(AsyncAPIAuth, self).login, email, password, android_id)
+
+    async def load(self, email, master_token, android_id): # pylint: disable=invalid-overridden-method
+        """Authenticate to Google with the provided master token.
+
+        Args:
+            email (str): The account to use.
+            master_token (str): The master token.
+            android_id (str): An identifier for this client.
+
+        Raises:
+            LoginException: If there was a problem logging in.
+        """
+        return await self._run(super(AsyncAPIAuth, self).load, email, master_token, android_id)
+
+    async def refresh(self): # pylint: disable=invalid-overridden-method
+        """Refresh the OAuth token.
+
+        Returns:
+            string: The auth token.
+
+        Raises:
+            LoginException: If there was a problem refreshing the OAuth token.
+        """
+        return await self._run(super(AsyncAPIAuth, self).refresh)
+
+    @staticmethod
+    async def _run(func, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+class AsyncAPI(API):
+    """Base asyncio API wrapper.
+
+    :py:meth:`send` is a coroutine, so the request methods inherited from the synchronous API classes return
+    awaitables.
+    """
+    def __init__(self, base_url, auth=None, transport=None, retry_policy=None, codec=None, compress=False): # pylint: disable=super-init-not-called,unused-argument,too-many-arguments
+        # Requests are sent with the aiohttp session, rather than a transport.
+        self._session = None
+        self._retry_policy = retry_policy if retry_policy is not None else \
+            _retry.RetryPolicy(budgets={_retry.ErrorKind.Auth: self.RETRY_CNT}, sleep=asyncio.sleep)
+        self._codec = codec if codec is not None else jsoncodec.default_codec()
+        self._compress = compress
+        self._auth = auth
+        self._base_url = base_url
+
+    def getSession(self):
+        """Get the HTTP session for this API.
+
+        Returns:
+            Union[aiohttp.ClientSession, None]: The session.
+        """
+        return self._session
+
+    def setSession(self, session):
+        """Set the HTTP session for this API. Sessions can be shared between APIs and accounts.
+
+        Args:
+            session (aiohttp.ClientSession): The session.
+        """
+        self._session = session
+
+    async def send(self, idempotent=None, stream=None, **req_kwargs): # pylint: disable=invalid-overridden-method,arguments-differ,unused-argument
+        """Send an authenticated request to a Google API.
+        Automatically refreshes the access token if it has expired, and retries transient errors according to the
+        :py:class:`gkeepapi.retry.RetryPolicy`. The policy's `sleep` must return an awaitable, like
+        :py:func:`asyncio.sleep`.
+
+        Args:
+            idempotent (Union[bool, None]): Whether the request can safely be repeated if it might've been
+                processed. Defaults to True for GET requests.
+            stream (Union[str, None]): Ignored. Responses are always read in full.
+            **req_kwargs: Arbitrary keyword arguments to pass to :py:meth:`aiohttp.ClientSession.request`.
+
+        Return:
+            dict: The parsed JSON response.
+
+        Raises:
+            APIException: If the server returns an error.
+            LoginException: If :py:meth:`login` has not been called.
+        """
+        if idempotent is None:
+            idempotent = req_kwargs.get('method', 'GET').upper() == 'GET'
+
+        policy = self._retry_policy
+        attempts = {}
+        while True:
+            try:
+                response, body = await self._send(**req_kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = None
+                # The request wasn't sent if the connection couldn't be established.
+                if idempotent or isinstance(e, aiohttp.ClientConnectorError):
+                    delay = self._nextDelay(attempts, _retry.ErrorKind.Connection)
+                if delay is None:
+                    raise
+                logger.info('Retrying after connection error in %.1fs: %s', delay, e)
+                await policy.sleep(delay)
+                continue
+
+            try:
+                data = self._codec.loads(body)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                data = {'error': {'code': response.status, 'message': body.decode('utf-8', 'replace')}}
+            if 'error' not in data:
+                return data
+
+            error = data['error']
+            kind = policy.classify(error['code'])
+            delay = None
+            if kind in (_retry.ErrorKind.Auth, _retry.ErrorKind.Throttle) or (kind is not None and idempotent):
+                retry_after = policy.parseRetryAfter(response.headers.get('Retry-After'))
+                delay = self._nextDelay(attempts, kind, retry_after)
+            if delay is None:
+                raise exception.APIException(error['code'], error)
+
+            if kind == _retry.ErrorKind.Auth:
+                logger.info('Refreshing access token')
+                await self._auth.refresh()
+            else:
+                logger.info('Retrying after error %s in %.1fs', error['code'], delay)
+                await policy.sleep(delay)
+
+    async def _send(self, **req_kwargs): # pylint: disable=invalid-overridden-method
+        """Send an authenticated request to a Google API.
+
+        Args:
+            **req_kwargs: Arbitrary keyword arguments to pass to :py:meth:`aiohttp.ClientSession.request`.
+
+        Return:
+            Tuple[aiohttp.ClientResponse, bytes]: The raw response and its body.
+
+        Raises:
+            LoginException: If :py:meth:`login` has not been called.
+        """
+        auth_token = self._auth.getAuthToken()
+        if auth_token is None:
+            raise exception.LoginException('Not logged in')
+
+        self._prepareRequest(auth_token, req_kwargs)
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.request(**req_kwargs) as response:
+            body = await response.read()
+        return response, body
+
+class AsyncKeepAPI(KeepAPI, AsyncAPI):
+    """Low level asyncio Google Keep API client. See :py:class:`gkeepapi.KeepAPI`."""
+
+class AsyncMediaAPI(MediaAPI, AsyncAPI):
+    """Low level asyncio Google Media API client. See :py:class:`gkeepapi.MediaAPI`."""
+    async def get(self, blob): # pylint: disable=invalid-overridden-method
+        """Get the canonical link to a media blob.
+
+        Args:
+            blob (gkeepapi.node.Blob): The blob.
+
+        Returns:
+            str: A link to the media.
+        """
+        response, _ = await self._send(
+            url=self._base_url + blob.parent.server_id + '/' + blob.server_id + '?s=0',
+            method='GET',
+            allow_redirects=False
+        )
+        return response.headers.get('Location')
+
+class AsyncRemindersAPI(RemindersAPI, AsyncAPI):
+    """Low level asyncio Google Reminders API client. See :py:class:`gkeepapi.RemindersAPI`."""
+
+class AsyncKeep(Keep):
+    """High level asyncio Google Keep client.
+
+    This works like :py:class:`gkeepapi.Keep`, except that methods which make requests are coroutines. Many
+    accounts can be synced concurrently on one event loop, optionally sharing a single HTTP session::
+
+        async with aiohttp.ClientSession() as session:
+            keeps = [gkeepapi.aio.AsyncKeep(session=session) for _ in accounts]
+            await asyncio.gather(*(
+                keep.resume(email, token) for keep, (email, token) in zip(keeps, accounts)
+            ))
+    """
+    def __init__(self, session=None, **kwargs):
+        """
+        Args:
+            session (aiohttp.ClientSession): An HTTP session to use. If not provided, one is created and
+                closed by :py:meth:`close`.
+            **kwargs: Arguments for :py:class:`gkeepapi.Keep`. The `sleep` of a `retry_policy` must return an
+                awaitable, like :py:func:`asyncio.sleep`. Requests are sent with the session, so `transport`
+                isn't supported.
+
+        Raises:
+            ValueError: If a `transport` is provided.
+        """
+        if kwargs.get('transport') is not None:
+            raise ValueError('Transports are not supported by the asyncio client. Pass a session instead.')
+        self._own_session = session is None
+        self._http_session = session
+        super(AsyncKeep, self).__init__(**kwargs)
+
+    def _createAPIs(self, transport, retry_policy, compress):
+        # Requests are sent with the session, so no transport is created.
+        self._keep_api = AsyncKeepAPI(retry_policy=retry_policy, compress=compress)
+        self._reminders_api = AsyncRemindersAPI(retry_policy=retry_policy, compress=compress)
+        self._media_api = AsyncMediaAPI(retry_policy=retry_policy)
+        for api in (self._keep_api, self._reminders_api, self._media_api):
+            api.setSession(self._http_session)
+
+    async def close(self):
+        """Close the HTTP session, if it was created by this object."""
+        if self._own_session and self._http_session is not None:
+            await self._http_session.close()
+        self._http_session = None
+
+    def _getSession(self):
+        if self._http_session is None:
+            self._http_session = aiohttp.ClientSession()
+            for api in (self._keep_api, self._reminders_api, self._media_api):
+                api.setSession(self._http_session)
+        return self._http_session
+
+    async def login(self, username, password, state=None, sync=True): # pylint: disable=invalid-overridden-method
+        """Authenticate to Google with the provided credentials & sync.
+
+        Args:
+            email (str): The account to use.
+            password (str): The account password.
+            state (dict): Serialized state to load.
+
+        Raises:
+            LoginException: If there was a problem logging in.
+        """
+        auth = AsyncAPIAuth(self.OAUTH_SCOPES, self._token_cache)
+
+        ret = await auth.login(username, password, get_mac())
+        if ret:
+            await self.load(auth, state, sync)
+
+        return ret
+
+    async def resume(self, email, master_token, state=None, sync=True): # pylint: disable=invalid-overridden-method
+        """Authenticate to Google with the provided master token & sync.
+
+        Args:
+            email (str): The account to use.
+            master_token (str): The master token.
+            state (dict): Serialized state to load.
+
+        Raises:
+            LoginException: If there was a problem logging in.
+        """
+        auth = AsyncAPIAuth(self.OAUTH_SCOPES, self._token_cache)
+
+        ret = await auth.load(email, master_token, android_id=get_mac())
+        if ret:
+            await self.load(auth, state, sync)
+
+        return ret
+
+    async def load(self, auth, state=None, sync=True): # pylint: disable=invalid-overridden-method
+        """Authenticate to Google with a prepared authentication object & sync.
+
+        Args:
+            auth (AsyncAPIAuth): Authentication object.
+            state (dict): Serialized state to load.
+
+        Raises:
+            LoginException: If there was a problem logging in.
+        """
+        self._keep_api.setAuth(auth)
+        self._reminders_api.setAuth(auth)
+        self._media_api.setAuth(auth)
+        if state is not None:
+            self.restore(state)
+        if sync:
+            await self.sync(True)
+
+    async def getMediaLink(self, blob): # pylint: disable=invalid-overridden-method
+        """Get the canonical link to media.
+
+        Args:
+            blob (gkeepapi.node.Blob): The media resource.
+
+        Returns:
+            str: A link to the media.
+        """
+        self._getSession()
+        return await self._media_api.get(blob)
+
+    async def sync(self, resync=False, concurrent=False): # pylint: disable=invalid-overridden-method
+        """Sync the local Keep tree with the server. See :py:meth:`gkeepapi.Keep.sync`.
+
+        Args:
+            resync (bool): Whether to resync data.
+            concurrent (bool): Whether to overlap requests with processing. Reminders and notes are synced at
+                the same time, and pages of changes are parsed in the default executor while the next page is
+                fetched. The local tree shouldn't be accessed until the sync completes.
+
+        Raises:
+            SyncException: If there is a consistency issue.
+        """
+        self._getSession()
+        if resync:
+            self._clear()
+
+        try:
+            if concurrent:
+                notes_result, reminders_result = await asyncio.gather(
+                    self._syncNotesPipelined(), self._syncReminders(), return_exceptions=True
+                )
+                if isinstance(notes_result, BaseException):
+                    if isinstance(reminders_result, BaseException):
+                        logger.error('Reminder sync failed', exc_info=reminders_result)
+                    raise notes_result
+                if isinstance(reminders_result, BaseException):
+                    raise reminders_result
+            else:
+                await self._syncReminders()
+                await self._syncNotes()
+        finally:
+            if self._upload is not None:
+                self._upload.abort()
+            self._upload = None
+
+        self._finishSync()
+
+    async def _syncReminders(self): # pylint: disable=invalid-overridden-method
+        while True:
+            logger.debug('Starting reminder sync: %s', self._reminder_version)
+            self._applyReminderChanges(await self._reminders_api.list())
+            history = await self._reminders_api.history(self._reminder_version)
+            if self._reminder_version == history['highestStorageVersion']:
+                break
+
+    async def _syncNotes(self): # pylint: disable=invalid-overridden-method
+        while True:
+            logger.debug('Starting keep sync: %s', self._keep_version)
+            changes = await self._keep_api.changes(**self._prepareChanges())
+            if not self._finishBatch(self._applyChanges(changes)):
+                break
+
+    async def _syncNotesPipelined(self): # pylint: disable=invalid-overridden-method
+        loop = asyncio.get_event_loop()
+        logger.debug('Starting keep sync: %s', self._keep_version)
+        changes = await self._keep_api.changes(**self._prepareChanges())
+        while True:
+            # Pages that are rejected aren't followed.
+            self._checkChanges(changes)
+            pending = None
+            if changes.get('truncated'):
+                logger.debug('Prefetching keep sync: %s', changes['toVersion'])
+                pending = asyncio.ensure_future(self._keep_api.changes(target_version=changes['toVersion']))
+
+            try:
+                truncated = await loop.run_in_executor(None, self._applyChanges, changes)
+            except Exception:
+                if pending is not None:
+                    pending.cancel()
+                raise
+            self._upload.acknowledge()
+
+            if not truncated:
+                break
+            changes = await pending
+
+        if self._upload.remaining:
+            await self._syncNotes()
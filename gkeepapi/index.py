@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.index
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import bisect
+import logging
+import re
+
+import six
+
+from . import node as _node
+
+logger = logging.getLogger(__name__)
+
+class NodeRegistry(object):
+    """Registry of all nodes known to a :class:`gkeepapi.Keep` object.
+
+    Behaves like a dict of node ids to nodes, and additionally maintains secondary indexes so that lookups by
+    server id, parent, type and state don't require a scan of every node. Indexes are kept up to date as
+    nodes are added, removed or reindexed (after a modification).
+    """
+    FLAGS = ('trashed', 'archived', 'pinned')
+
+    def __init__(self):
+        self._nodes = {}
+        self._sid_map = {}
+        self._parents = {}
+        self._types = {}
+        self._flags = {flag: {} for flag in self.FLAGS}
+        # Indexed values for each node, so stale index entries can be found.
+        self._state = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self._nodes
+
+    def __getitem__(self, node_id):
+        return self._nodes[node_id]
+
+    def get(self, node_id, default=None):
+        """Get a node with the given ID.
+
+        Args:
+            node_id (str): The node ID.
+            default (Any): Value to return if the node isn't found.
+
+        Returns:
+            Union[gkeepapi.node.Node, None]: The node.
+        """
+        return self._nodes.get(node_id, default)
+
+    def values(self):
+        """Get all nodes.
+
+        Returns:
+            List[gkeepapi.node.Node]: Nodes.
+        """
+        return self._nodes.values()
+
+    def add(self, node):
+        """Register a node.
+
+        Args:
+            node (gkeepapi.node.Node): The node.
+        """
+        if node.id in self._nodes:
+            self.remove(node.id)
+
+        self._nodes[node.id] = node
+        self._types.setdefault(node.type, {})[node.id] = node
+        self._state[node.id] = (None, None)
+        self.reindex(node)
+
+    def remove(self, node_id):
+        """Unregister a node.
+
+        Args:
+            node_id (str): The node ID.
+
+        Returns:
+            Union[gkeepapi.node.Node, None]: The node.
+        """
+        node = self._nodes.pop(node_id, None)
+        if node is None:
+            return None
+
+        server_id, parent_id = self._state.pop(node_id)
+        if server_id is not None and self._sid_map.get(server_id) is node:
+            del self._sid_map[server_id]
+        self._discard(self._parents, parent_id, node_id)
+        self._discard(self._types, node.type, node_id)
+        for nodes in self._flags.values():
+            nodes.pop(node_id, None)
+        return node
+
+    def reindex(self, node):
+        """Update the indexes for a node that has been modified. Does nothing if the node isn't registered.
+
+        Args:
+            node (gkeepapi.node.Node): The node.
+        """
+        if self._nodes.get(node.id) is not node:
+            return
+
+        server_id, parent_id = self._state[node.id]
+        if server_id != node.server_id:
+            if server_id is not None and self._sid_map.get(server_id) is node:
+                del self._sid_map[server_id]
+            if node.server_id is not None:
+                self._sid_map[node.server_id] = node
+
+        if parent_id != node.parent_id:
+            self._discard(self._parents, parent_id, node.id)
+            self._parents.setdefault(node.parent_id, {})[node.id] = node
+
+        self._state[node.id] = (node.server_id, node.parent_id)
+
+        if isinstance(node, _node.TopLevelNode):
+            for flag, nodes in self._flags.items():
+                if getattr(node, flag):
+                    nodes[node.id] = node
+                else:
+                    nodes.pop(node.id, None)
+
+    def getByServerId(self, server_id):
+        """Get a node with the given server ID.
+
+        Args:
+            server_id (str): The server ID.
+
+        Returns:
+            Union[gkeepapi.node.Node, None]: The node.
+        """
+        return self._sid_map.get(server_id)
+
+    def getChildren(self, parent_id):
+        """Get registered children of the given node. The returned dict must not be modified.
+
+        Args:
+            parent_id (str): The parent node ID.
+
+        Returns:
+            Dict[str, gkeepapi.node.Node]: A dict of node ids to nodes.
+        """
+        return self._parents.get(parent_id, {})
+
+    def getByType(self, type_):
+        """Get all nodes of the given type. The returned dict must not be modified.
+
+        Args:
+            type_ (gkeepapi.node.NodeType): The node type.
+
+        Returns:
+            Dict[str, gkeepapi.node.Node]: A dict of node ids to nodes.
+        """
+        return self._types.get(type_, {})
+
+    def getFlagged(self, flag):
+        """Get all top level nodes with the given state flag set. The returned dict must not be modified.
+
+        Args:
+            flag (str): One of :py:attr:`FLAGS`.
+
+        Returns:
+            Dict[str, gkeepapi.node.TopLevelNode]: A dict of node ids to nodes.
+        """
+        return self._flags[flag]
+
+    @classmethod
+    def _discard(cls, index, key, node_id):
+        nodes = index.get(key)
+        if nodes is None:
+            return
+        nodes.pop(node_id, None)
+        if not nodes:
+            del index[key]
+
+class ReverseIndex(object):
+    """Base class for indexes mapping keys to the top level nodes they're associated with."""
+    def __init__(self):
+        self._keys = {}
+        self._node_keys = {}
+
+    def __len__(self):
+        return len(self._node_keys)
+
+    def get(self, key):
+        """Get nodes associated with the given key. The returned dict must not be modified.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            Dict[str, gkeepapi.node.TopLevelNode]: A dict of node ids to nodes.
+        """
+        return self._keys.get(key, {})
+
+    def remove(self, node_id):
+        """Remove a node from the index.
+
+        Args:
+            node_id (str): The node ID.
+        """
+        self._index(node_id, set())
+
+    def _index(self, node_id, keys, node=None):
+        old_keys = self._node_keys.pop(node_id, set())
+        for key in old_keys - keys:
+            nodes = self._keys[key]
+            del nodes[node_id]
+            if not nodes:
+                del self._keys[key]
+                self._keyRemoved(key)
+        for key in keys - old_keys:
+            if key not in self._keys:
+                self._keys[key] = {}
+                self._keyAdded(key)
+            self._keys[key][node_id] = node
+        for key in keys & old_keys:
+            self._keys[key][node_id] = node
+        if keys:
+            self._node_keys[node_id] = keys
+
+    def _keyAdded(self, key):
+        pass
+
+    def _keyRemoved(self, key):
+        pass
+
+class TextIndex(ReverseIndex):
+    """Inverted index over the title and text of top level nodes.
+
+    Text is case folded and split into word terms. Substring queries are answered by looking up the terms
+    in the query, which yields a superset of the matching nodes. Callers are expected to verify candidates.
+    Terms are also indexed by their trigrams, so words that only partly match the query can be found without
+    scanning every term.
+
+    Modified nodes are only marked as stale, and are reindexed on the next search.
+    """
+    TERM_RE = re.compile(r'\w+', re.UNICODE)
+    GRAM_SIZE = 3
+
+    def __init__(self):
+        super(TextIndex, self).__init__()
+        self._stale = {}
+        self._vocabulary = None
+        self._grams = {}
+
+    @classmethod
+    def fold(cls, text):
+        """Normalize text for case insensitive matching.
+
+        Args:
+            text (str): Text.
+
+        Returns:
+            str: Case folded text.
+        """
+        text = six.text_type(text)
+        return text.casefold() if hasattr(text, 'casefold') else text.lower()
+
+    @classmethod
+    def tokenize(cls, text):
+        """Split text into terms.
+
+        Args:
+            text (str): Text.
+
+        Returns:
+            Set[str]: Terms.
+        """
+        return set(cls.TERM_RE.findall(cls.fold(text)))
+
+    def update(self, node):
+        """Mark a top level node for reindexing.
+
+        Args:
+            node (gkeepapi.node.TopLevelNode): The node.
+        """
+        self._stale[node.id] = node
+
+    def remove(self, node_id):
+        self._stale.pop(node_id, None)
+        super(TextIndex, self).remove(node_id)
+
+    def _keyAdded(self, key):
+        self._vocabulary = None
+        for gram in self._gramsOf(key):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def _keyRemoved(self, key):
+        self._vocabulary = None
+        for gram in self._gramsOf(key):
+            terms = self._grams[gram]
+            terms.discard(key)
+            if not terms:
+                del self._grams[gram]
+
+    @classmethod
+    def _gramsOf(cls, term):
+        return set(term[i:i + cls.GRAM_SIZE] for i in range(len(term) - cls.GRAM_SIZE + 1))
+
+    def _refresh(self):
+        stale = self._stale
+        self._stale = {}
+        for node_id, node in stale.items():
+            self._index(node_id, self.tokenize(node.title) | self.tokenize(node.text), node)
+
+    def term(self, term):
+        """Get nodes containing the given term. The returned dict must not be modified.
+
+        Args:
+            term (str): The term.
+
+        Returns:
+            Dict[str, gkeepapi.node.TopLevelNode]: A dict of node ids to nodes.
+        """
+        self._refresh()
+        return self.get(self.fold(term))
+
+    def prefix(self, prefix):
+        """Get nodes containing a term starting with the given prefix.
+
+        Args:
+            prefix (str): The prefix.
+
+        Returns:
+            Dict[str, gkeepapi.node.TopLevelNode]: A dict of node ids to nodes.
+        """
+        self._refresh()
+        return self._collect(self._prefixTerms(self.fold(prefix)))
+
+    def search(self, query):
+        """Get candidate nodes that may contain the given string in their title or text.
+
+        Args:
+            query (str): The string.
+
+        Returns:
+            Union[Dict[str, gkeepapi.node.TopLevelNode], None]: A dict of node ids to nodes, or None if the
+            query contains no terms and can't be answered by the index.
+        """
+        query = self.fold(query)
+        matches = list(self.TERM_RE.finditer(query))
+        if not matches:
+            return None
+
+        self._refresh()
+        candidates = None
+        for match in matches:
+            # Only terms touching the edge of the query can match part of a word.
+            token = match.group(0)
+            left = match.start() > 0
+            right = match.end() < len(query)
+            if left and right:
+                terms = [token] if token in self._keys else []
+            elif left:
+                terms = self._prefixTerms(token)
+            elif right:
+                terms = [term for term in self._substringTerms(token) if term.endswith(token)]
+            else:
+                terms = self._substringTerms(token)
+
+            nodes = self._collect(terms)
+            candidates = nodes if candidates is None else {
+                node_id: node for node_id, node in candidates.items() if node_id in nodes
+            }
+            if not candidates:
+                break
+
+        return candidates
+
+    def _prefixTerms(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._keys)
+        terms = []
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            terms.append(self._vocabulary[i])
+            i += 1
+        return terms
+
+    def _substringTerms(self, token):
+        grams = self._gramsOf(token)
+        if not grams:
+            # Tokens shorter than a trigram can only be found by scanning.
+            return [term for term in self._keys if token in term]
+        # Any term containing the token is filed under each of its trigrams, so the smallest set is enough.
+        terms = min((self._grams.get(gram, ()) for gram in grams), key=len)
+        return [term for term in terms if token in term]
+
+    def _collect(self, terms):
+        if len(terms) == 1:
+            return self._keys[terms[0]]
+        nodes = {}
+        for term in terms:
+            nodes.update(self._keys[term])
+        return nodes
+
+class LabelIndex(ReverseIndex):
+    """Reverse index of label ids to the top level nodes that reference them.
+
+    This includes labels that haven't been resolved to a :class:`gkeepapi.node.Label` yet, as well as labels
+    pending removal, so callers are expected to verify candidates.
+    """
+    def update(self, node):
+        """Reindex the labels on a top level node.
+
+        Args:
+            node (gkeepapi.node.TopLevelNode): The node.
+        """
+        self._index(node.id, set(node.labels._labels), node) # pylint: disable=protected-access
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.jsoncodec
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import json
+import zlib
+
+class JSONCodec(object):
+    """Encodes and decodes API request and response bodies with the standard :py:mod:`json` module."""
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encode an object.
+
+        Args:
+            obj (Any): The object.
+
+        Returns:
+            bytes: UTF-8 encoded JSON.
+        """
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data):
+        """Decode an object.
+
+        Args:
+            data (bytes): UTF-8 encoded JSON.
+
+        Returns:
+            Any: The object.
+
+        Raises:
+            ValueError: If the data isn't valid JSON.
+        """
+        return json.loads(data.decode('utf-8'))
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by :py:mod:`orjson`, which is several times faster than the standard library.
+    Requires `orjson`.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson # pylint: disable=import-outside-toplevel
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj)
+
+    def loads(self, data):
+        # orjson.JSONDecodeError is a ValueError.
+        return self._orjson.loads(data)
+
+def default_codec():
+    """Get the fastest available codec.
+
+    Returns:
+        JSONCodec: An :py:class:`OrjsonCodec` if `orjson` is installed, otherwise a :py:class:`JSONCodec`.
+    """
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return JSONCodec()
+
+def gzip(data, level=6):
+    """Compress data in gzip format.
+
+    Args:
+        data (bytes): The data.
+        level (int): The compression level, from 1 (fastest) to 9 (smallest).
+
+    Returns:
+        bytes: The compressed data.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
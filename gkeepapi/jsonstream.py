@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.jsonstream
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+class ObjectStream(object):
+    """Incrementally parses a JSON object from a stream of bytes. Elements of one array field are yielded as
+    they're parsed, so the whole document never needs to be in memory::
+
+        stream = ObjectStream(response.iter_content(65536), 'nodes')
+        for raw_node in stream.items():
+            ...
+        version = stream.fields['toVersion']
+
+    Values are decoded with the standard :py:mod:`json` module, which resumes parsing at any offset.
+    """
+    def __init__(self, chunks, array_key, close=None):
+        """
+        Args:
+            chunks (Iterable[bytes]): The body, in chunks.
+            array_key (str): The key of the array to stream.
+            close (callable): A function to release the underlying response.
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._array_key = array_key
+        self._close = close
+        self._buf = u''
+        self._pos = 0
+        self._eof = False
+        self._state = 'start'
+
+        self.fields = {}
+        """Fields that have been parsed so far, other than the streamed array."""
+
+    def readFields(self):
+        """Parse fields up to the start of the streamed array.
+
+        Returns:
+            dict: The fields parsed so far. If the array isn't present, this is the whole object.
+
+        Raises:
+            ValueError: If the body isn't a valid JSON object.
+        """
+        if self._state == 'start':
+            self._expect('{')
+            self._state = 'fields'
+            if self._peek() == '}':
+                self._pos += 1
+                self._state = 'done'
+
+        while self._state == 'fields':
+            key = self._value()
+            self._expect(':')
+            if key == self._array_key:
+                self._expect('[')
+                self._state = 'array'
+                if self._peek() == ']':
+                    self._pos += 1
+                    self._endField()
+                break
+            self.fields[key] = self._value()
+            self._endField()
+        return self.fields
+
+    def items(self):
+        """Parse the streamed array. Any remaining fields are parsed once it's exhausted.
+
+        Yields:
+            Any: Each element of the array.
+
+        Raises:
+            ValueError: If the body isn't a valid JSON object.
+        """
+        self.readFields()
+        while self._state == 'array':
+            yield self._value()
+            if self._separator(']'):
+                self._endField()
+        self.readFields()
+
+    def close(self):
+        """Release the underlying response."""
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def _endField(self):
+        self._state = 'done' if self._separator('}') else 'fields'
+
+    def _separator(self, close):
+        """Read a separator.
+
+        Args:
+            close (str): The closing bracket of the current container.
+
+        Returns:
+            bool: Whether the container was closed.
+        """
+        c = self._next()
+        if c == close:
+            return True
+        if c != ',':
+            raise ValueError('Expected %r or %r at offset %d, got %r' % (',', close, self._pos, c))
+        return False
+
+    def _fill(self):
+        """Read another chunk into the buffer.
+
+        Returns:
+            bool: Whether any data was read.
+        """
+        if self._eof:
+            return False
+        if self._pos > len(self._buf) // 2:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buf += text
+                return True
+        self._buf += self._decoder.decode(b'', True)
+        self._eof = True
+        return True
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON')
+
+    def _next(self):
+        c = self._peek()
+        self._pos += 1
+        return c
+
+    def _expect(self, expected):
+        c = self._next()
+        if c != expected:
+            raise ValueError('Expected %r at offset %d, got %r' % (expected, self._pos, c))
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if self._eof:
+                    raise
+                end = None
+
+            # A value ending at the end of the buffer might be a truncated number or literal.
+            if end is not None and (end < len(self._buf) or self._eof):
+                self._pos = end
+                return value
+
+            # Read at least as much again before retrying, so large values aren't parsed quadratically.
+            target = (len(self._buf) - self._pos) * 2
+            while len(self._buf) - self._pos < target and self._fill():
+                pass
@@ -21,6 +21,8 @@ DEBUG = False
 
 logger = logging.getLogger(__name__)
 
+_NO_FIELDS = frozenset()
+
 class NodeType(enum.Enum):
     """Valid note types."""
 
@@ -165,10 +167,39 @@ class RoleValue(enum.Enum):
     User = 'W'
     """Note collaborator."""
 
+def _parse_fixed_datetime(tzs):
+    """Parse a 'YYYY-MM-DDTHH:MM:SS.ffffff' string (with 1 to 6 fractional digits)."""
+    fraction = tzs[20:]
+    if not (tzs[0:4] + tzs[5:7] + tzs[8:10] + tzs[11:13] + tzs[14:16] + tzs[17:19]).isdigit():
+        raise ValueError('Invalid datetime: %s' % tzs)
+    return datetime.datetime(
+        int(tzs[0:4]), int(tzs[5:7]), int(tzs[8:10]),
+        int(tzs[11:13]), int(tzs[14:16]), int(tzs[17:19]),
+        int(fraction) * 10 ** (6 - len(fraction))
+    )
+
+# datetime.fromisoformat is implemented in C (Python 3.7+), but older versions only accept 3 or 6 fractional digits.
+_parse_iso_datetime = getattr(datetime.datetime, 'fromisoformat', _parse_fixed_datetime)
+
+# Shared placeholder for containers that are usually empty. Never modify it; replace it with a new dict.
+_EMPTY = {}
+
 class Element(object):
     """Interface for elements that can be serialized and deserialized."""
+    __slots__ = ('_dirty', '_container')
     def __init__(self):
         self._dirty = False
+        self._container = None
+
+    def _mark_dirty(self):
+        """Set the dirty bit and notify the containing element."""
+        self._dirty = True
+        self._notify_dirty()
+
+    def _notify_dirty(self):
+        """Propagate a modification notice up to the containing element."""
+        if self._container is not None:
+            self._container._notify_dirty() # pylint: disable=protected-access
 
     def _find_discrepancies(self, raw):
         s_raw = self.save(False)
@@ -247,8 +278,31 @@ class Element(object):
         """
         return self._dirty
 
+class _FieldsMixin(object):
+    """A mixin to record which fields of an element were modified, so only those need to be sent. The element
+    stores the raw keys in `_fields`, which is None if they aren't known.
+    """
+    __slots__ = ()
+    def _mark_field(self, key):
+        """Record that a field was modified.
+
+        Args:
+            key (str): The raw key.
+        """
+        if self._fields is not None and key not in self._fields:
+            self._fields = self._fields.union((key,))
+
+    def _reset_fields(self, known=True):
+        """Forget modified fields.
+
+        Args:
+            known (bool): Whether the server's copy is known to match this one.
+        """
+        self._fields = _NO_FIELDS if known else None
+
 class Annotation(Element):
     """Note annotations base class."""
+    __slots__ = ('id',)
     def __init__(self):
         super(Annotation, self).__init__()
         self.id = self._generateAnnotationId()
@@ -277,6 +331,7 @@ class Annotation(Element):
 
 class WebLink(Annotation):
     """Represents a link annotation on a :class:`TopLevelNode`."""
+    __slots__ = ('_title', '_url', '_image_url', '_provenance_url', '_description')
     def __init__(self):
         super(WebLink, self).__init__()
         self._title = ''
@@ -316,7 +371,7 @@ class WebLink(Annotation):
     @title.setter
     def title(self, value):
         self._title = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def url(self):
@@ -330,7 +385,7 @@ class WebLink(Annotation):
     @url.setter
     def url(self, value):
         self._url = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def image_url(self):
@@ -344,7 +399,7 @@ class WebLink(Annotation):
     @image_url.setter
     def image_url(self, value):
         self._image_url = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def provenance_url(self):
@@ -358,7 +413,7 @@ class WebLink(Annotation):
     @provenance_url.setter
     def provenance_url(self, value):
         self._provenance_url = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def description(self):
@@ -372,10 +427,11 @@ class WebLink(Annotation):
     @description.setter
     def description(self, value):
         self._description = value
-        self._dirty = True
+        self._mark_dirty()
 
 class Category(Annotation):
     """Represents a category annotation on a :class:`TopLevelNode`."""
+    __slots__ = ('_category',)
     def __init__(self):
         super(Category, self).__init__()
         self._category = None
@@ -403,10 +459,11 @@ class Category(Annotation):
     @category.setter
     def category(self, value):
         self._category = value
-        self._dirty = True
+        self._mark_dirty()
 
 class TaskAssist(Annotation):
     """Unknown."""
+    __slots__ = ('_suggest',)
     def __init__(self):
         super(TaskAssist, self).__init__()
         self._suggest = None
@@ -434,10 +491,11 @@ class TaskAssist(Annotation):
     @suggest.setter
     def suggest(self, value):
         self._suggest = value
-        self._dirty = True
+        self._mark_dirty()
 
 class Context(Annotation):
     """Represents a context annotation, which may contain other annotations."""
+    __slots__ = ('_entries',)
     def __init__(self):
         super(Context, self).__init__()
         self._entries = {}
@@ -446,7 +504,10 @@ class Context(Annotation):
         super(Context, self)._load(raw)
         self._entries = {}
         for key, entry in raw.get('context', {}).items():
-            self._entries[key] = NodeAnnotations.from_json({key: entry})
+            annotation = NodeAnnotations.from_json({key: entry})
+            if annotation is not None:
+                annotation._container = self # pylint: disable=protected-access
+            self._entries[key] = annotation
 
     def save(self, clean=True):
         ret = super(Context, self).save(clean)
@@ -470,9 +531,10 @@ class Context(Annotation):
 
 class NodeAnnotations(Element):
     """Represents the annotation container on a :class:`TopLevelNode`."""
+    __slots__ = ('_annotations',)
     def __init__(self):
         super(NodeAnnotations, self).__init__()
-        self._annotations = {}
+        self._annotations = _EMPTY
 
     def __len__(self):
         return len(self._annotations)
@@ -515,12 +577,14 @@ class NodeAnnotations(Element):
 
     def _load(self, raw):
         super(NodeAnnotations, self)._load(raw)
-        self._annotations = {}
-        if 'annotations' not in raw:
+        self._annotations = _EMPTY
+        if not raw.get('annotations'):
             return
 
+        self._annotations = {}
         for raw_annotation in raw['annotations']:
             annotation = self.from_json(raw_annotation)
+            annotation._container = self # pylint: disable=protected-access
             self._annotations[annotation.id] = annotation
 
     def save(self, clean=True):
@@ -556,10 +620,11 @@ class NodeAnnotations(Element):
         else:
             if node is None:
                 node = Category()
-                self._annotations[node.id] = node
+                node._container = self # pylint: disable=protected-access
+                self._writable()[node.id] = node
 
             node.category = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def links(self):
@@ -581,8 +646,9 @@ class NodeAnnotations(Element):
         Returns:
             gkeepapi.node.Annotation: The Annotation.
         """
-        self._annotations[annotation.id] = annotation
-        self._dirty = True
+        self._writable()[annotation.id] = annotation
+        annotation._container = self # pylint: disable=protected-access
+        self._mark_dirty()
         return annotation
 
     def remove(self, annotation):
@@ -596,26 +662,43 @@ class NodeAnnotations(Element):
         """
         if annotation.id in self._annotations:
             del self._annotations[annotation.id]
-        self._dirty = True
+            annotation._container = None # pylint: disable=protected-access
+        self._mark_dirty()
+
+    def _writable(self):
+        if self._annotations is _EMPTY:
+            self._annotations = {}
+        return self._annotations
 
     @property
     def dirty(self):
         return super(NodeAnnotations, self).dirty or any((annotation.dirty for annotation in self._annotations.values()))
 
-class NodeTimestamps(Element):
+class NodeTimestamps(Element, _FieldsMixin):
     """Represents the timestamps associated with a :class:`TopLevelNode`."""
+    __slots__ = ('_created', '_deleted', '_trashed', '_updated', '_edited', '_fields')
     TZ_FMT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
+    # Most nodes are never trashed or deleted, so the epoch is by far the most common value.
+    _EPOCH = datetime.datetime(1970, 1, 1)
+    _EPOCH_STR = '1970-01-01T00:00:00.000000Z'
+    _EPOCH_STRS = {
+        '1970-01-01T00:00:00.000Z': _EPOCH,
+        _EPOCH_STR: _EPOCH,
+    }
+
     def __init__(self, create_time=None):
         super(NodeTimestamps, self).__init__()
         if create_time is None:
             create_time = time.time()
 
-        self._created = self.int_to_dt(create_time)
-        self._deleted = self.int_to_dt(0)
-        self._trashed = self.int_to_dt(0)
-        self._updated = self.int_to_dt(create_time)
-        self._edited = self.int_to_dt(create_time)
+        dt = self.int_to_dt(create_time)
+        self._created = dt
+        self._deleted = self._EPOCH
+        self._trashed = self._EPOCH
+        self._updated = dt
+        self._edited = dt
+        self._fields = None
 
     def _load(self, raw):
         super(NodeTimestamps, self)._load(raw)
@@ -627,6 +710,7 @@ class NodeTimestamps(Element):
         self._updated = self.str_to_dt(raw['updated'])
         self._edited = self.str_to_dt(raw['userEdited']) \
             if 'userEdited' in raw else None
+        self._reset_fields(not self._dirty)
 
     def save(self, clean=True):
         ret = super(NodeTimestamps, self).save(clean)
@@ -639,18 +723,77 @@ class NodeTimestamps(Element):
         ret['updated'] = self.dt_to_str(self._updated)
         if self._edited is not None:
             ret['userEdited'] = self.dt_to_str(self._edited)
+        if clean:
+            self._reset_fields()
         return ret
 
+    def save_delta(self, clean=True):
+        """Serialize the update time and any timestamps that changed since they were last loaded or saved.
+
+        Args:
+            clean (bool): Whether to clear the dirty bit.
+
+        Returns:
+            dict: Raw.
+        """
+        fields = self._fields
+        if fields is None:
+            return self.save(clean)
+        ret = super(NodeTimestamps, self).save(clean)
+        ret['kind'] = 'notes#timestamps'
+        ret['updated'] = self.dt_to_str(self._updated)
+        if 'created' in fields:
+            ret['created'] = self.dt_to_str(self._created)
+        if 'deleted' in fields and self._deleted is not None:
+            ret['deleted'] = self.dt_to_str(self._deleted)
+        if 'trashed' in fields and self._trashed is not None:
+            ret['trashed'] = self.dt_to_str(self._trashed)
+        if 'userEdited' in fields and self._edited is not None:
+            ret['userEdited'] = self.dt_to_str(self._edited)
+        if clean:
+            self._reset_fields()
+        return ret
+
+    def _touch(self, dt, edited):
+        """Set the updated time, and optionally the edited time, without notifying the containing element.
+
+        Args:
+            dt (datetime.datetime): Datetime.
+            edited (bool): Whether to set the edited time.
+        """
+        self._updated = dt
+        self._mark_field('updated')
+        if edited:
+            self._edited = dt
+            self._mark_field('userEdited')
+        self._dirty = True
+
     @classmethod
     def str_to_dt(cls, tzs):
         """Convert a datetime string into an object.
 
+        Strings in the fixed :py:attr:`TZ_FMT` layout are decoded directly. Anything else is handed to
+        :py:meth:`datetime.datetime.strptime`. Datetime objects are returned as is.
+
         Params:
-            tsz (str): Datetime string.
+            tsz (Union[str, datetime.datetime]): Datetime string.
 
         Returns:
             datetime.datetime: Datetime.
         """
+        dt = cls._EPOCH_STRS.get(tzs)
+        if dt is not None:
+            return dt
+        if isinstance(tzs, datetime.datetime):
+            return tzs
+
+        if 20 < len(tzs) < 28 and tzs[-1] == 'Z' and tzs[4] == '-' and tzs[7] == '-' and tzs[10] == 'T' and \
+            tzs[13] == ':' and tzs[16] == ':' and tzs[19] == '.' and tzs[20:-1].isdigit():
+            try:
+                return _parse_iso_datetime(tzs[:-1])
+            except ValueError:
+                pass
+
         return datetime.datetime.strptime(tzs, cls.TZ_FMT)
 
     @classmethod
@@ -663,6 +806,8 @@ class NodeTimestamps(Element):
         Returns:
             datetime.datetime: Datetime.
         """
+        if tz == 0:
+            return cls._EPOCH
         return datetime.datetime.utcfromtimestamp(tz)
 
     @classmethod
@@ -672,7 +817,13 @@ class NodeTimestamps(Element):
         Returns:
             str: Datetime string.
         """
-        return dt.strftime(cls.TZ_FMT)
+        if dt == cls._EPOCH:
+            return cls._EPOCH_STR
+        return '%04d-%02d-%02dT%02d:%02d:%02d.%06dZ' % (
+            dt.year, dt.month, dt.day,
+            dt.hour, dt.minute, dt.second,
+            dt.microsecond
+        )
 
     @classmethod
     def int_to_str(cls, tz):
@@ -695,7 +846,8 @@ class NodeTimestamps(Element):
     @created.setter
     def created(self, value):
         self._created = value
-        self._dirty = True
+        self._mark_field('created')
+        self._mark_dirty()
 
     @property
     def deleted(self):
@@ -709,7 +861,8 @@ class NodeTimestamps(Element):
     @deleted.setter
     def deleted(self, value):
         self._deleted = value
-        self._dirty = True
+        self._mark_field('deleted')
+        self._mark_dirty()
 
     @property
     def trashed(self):
@@ -723,7 +876,8 @@ class NodeTimestamps(Element):
     @trashed.setter
     def trashed(self, value):
         self._trashed = value
-        self._dirty = True
+        self._mark_field('trashed')
+        self._mark_dirty()
 
     @property
     def updated(self):
@@ -737,7 +891,8 @@ class NodeTimestamps(Element):
     @updated.setter
     def updated(self, value):
         self._updated = value
-        self._dirty = True
+        self._mark_field('updated')
+        self._mark_dirty()
 
     @property
     def edited(self):
@@ -751,10 +906,12 @@ class NodeTimestamps(Element):
     @edited.setter
     def edited(self, value):
         self._edited = value
-        self._dirty = True
+        self._mark_field('userEdited')
+        self._mark_dirty()
 
 class NodeSettings(Element):
     """Represents the settings associated with a :class:`TopLevelNode`."""
+    __slots__ = ('_new_listitem_placement', '_graveyard_state', '_checked_listitems_policy')
     def __init__(self):
         super(NodeSettings, self).__init__()
         self._new_listitem_placement = NewListItemPlacementValue.Bottom
@@ -786,7 +943,7 @@ class NodeSettings(Element):
     @new_listitem_placement.setter
     def new_listitem_placement(self, value):
         self._new_listitem_placement = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def graveyard_state(self):
@@ -800,7 +957,7 @@ class NodeSettings(Element):
     @graveyard_state.setter
     def graveyard_state(self, value):
         self._graveyard_state = value
-        self._dirty = True
+        self._mark_dirty()
 
     @property
     def checked_listitems_policy(self):
@@ -814,13 +971,14 @@ class NodeSettings(Element):
     @checked_listitems_policy.setter
     def checked_listitems_policy(self, value):
         self._checked_listitems_policy = value
-        self._dirty = True
+        self._mark_dirty()
 
 class NodeCollaborators(Element):
     """Represents the collaborators on a :class:`TopLevelNode`."""
+    __slots__ = ('_collaborators',)
     def __init__(self):
         super(NodeCollaborators, self).__init__()
-        self._collaborators = {}
+        self._collaborators = _EMPTY
 
     def __len__(self):
         return len(self._collaborators)
@@ -831,7 +989,7 @@ class NodeCollaborators(Element):
             self._dirty = requests_raw.pop()
         else:
             self._dirty = False
-        self._collaborators = {}
+        self._collaborators = {} if collaborators_raw or requests_raw else _EMPTY
         for collaborator in collaborators_raw:
             self._collaborators[collaborator['email']] = RoleValue(collaborator['role'])
         for collaborator in requests_raw:
@@ -859,8 +1017,10 @@ class NodeCollaborators(Element):
             str : Collaborator email address.
         """
         if email not in self._collaborators:
+            if self._collaborators is _EMPTY:
+                self._collaborators = {}
             self._collaborators[email] = ShareRequestValue.Add
-        self._dirty = True
+        self._mark_dirty()
 
     def remove(self, email):
         """Remove a Collaborator.
@@ -873,7 +1033,7 @@ class NodeCollaborators(Element):
                 del self._collaborators[email]
             else:
                 self._collaborators[email] = ShareRequestValue.Remove
-        self._dirty = True
+        self._mark_dirty()
 
     def all(self):
         """Get all collaborators.
@@ -885,6 +1045,7 @@ class NodeCollaborators(Element):
 
 class NodeLabels(Element):
     """Represents the labels on a :class:`TopLevelNode`."""
+    __slots__ = ('_labels',)
     def __init__(self):
         super(NodeLabels, self).__init__()
         self._labels = {}
@@ -920,7 +1081,7 @@ class NodeLabels(Element):
             label (gkeepapi.node.Label): The Label object.
         """
         self._labels[label.id] = label
-        self._dirty = True
+        self._mark_dirty()
 
     def remove(self, label):
         """Remove a label.
@@ -930,7 +1091,7 @@ class NodeLabels(Element):
         """
         if label.id in self._labels:
             self._labels[label.id] = None
-        self._dirty = True
+        self._mark_dirty()
 
     def get(self, label_id):
         """Get a label by ID.
@@ -950,17 +1111,18 @@ class NodeLabels(Element):
 
 class TimestampsMixin(object):
     """A mixin to add methods for updating timestamps."""
-    def touch(self, edited=False):
+    __slots__ = ()
+    def touch(self, edited=False, dt=None):
         """Mark the node as dirty.
 
         Args:
             edited (bool): Whether to set the edited time.
+            dt (datetime.datetime): The time of the modification. Defaults to now.
         """
-        self._dirty = True
-        dt = datetime.datetime.utcnow()
-        self.timestamps.updated = dt
-        if edited:
-            self.timestamps.edited = dt
+        if dt is None:
+            dt = datetime.datetime.utcnow()
+        self.timestamps._touch(dt, edited) # pylint: disable=protected-access
+        self._mark_dirty()
 
     @property
     def trashed(self):
@@ -984,13 +1146,61 @@ class TimestampsMixin(object):
         """Mark the item as deleted."""
         self.timestamps.deleted = datetime.datetime.utcnow()
 
-class Node(Element, TimestampsMixin):
+class _Deferred(object):
+    """Raw data for a node element that hasn't been decoded yet."""
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+class _DeferredElement(object):
+    """Descriptor for a node element that may be left undecoded until first access.
+
+    The element is stored in an attribute with a leading underscore. If that attribute holds a
+    :class:`_Deferred` (see :py:meth:`Node._defer`), the element is decoded before being returned.
+    """
+    def __init__(self, name, doc=None):
+        self.name = name
+        self.attr = '_' + name
+        self.__doc__ = doc
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.attr)
+        if isinstance(value, _Deferred):
+            value = obj._hydrate(self.name, value.raw) # pylint: disable=protected-access
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.attr, value)
+
+class Node(Element, TimestampsMixin, _FieldsMixin):
     """Node base class."""
+    __slots__ = (
+        'parent', 'id', 'server_id', 'parent_id', 'type', '_sort', '_version', '_text', '_children',
+        '_timestamps', '_settings', '_annotations', 'moved', '_lazy', '_fields',
+    )
+    timestamps = _DeferredElement('timestamps', 'gkeepapi.node.NodeTimestamps: Timestamps.')
+    settings = _DeferredElement('settings', 'gkeepapi.node.NodeSettings: Settings.')
+    annotations = _DeferredElement('annotations', 'gkeepapi.node.NodeAnnotations: Annotations.')
+    _ELEMENTS = {
+        'timestamps': NodeTimestamps,
+        'settings': NodeSettings,
+        'annotations': NodeAnnotations,
+    }
+
     def __init__(self, id_=None, type_=None, parent_id=None):
         super(Node, self).__init__()
 
         create_time = time.time()
 
+        # Lazy nodes keep raw element data around until it's accessed.
+        self._lazy = False
+
+        # Raw keys of fields modified since the node was last loaded or saved. None if unknown.
+        self._fields = None
+
         self.parent = None
         self.id = self._generateId(create_time) if id_ is None else id_
         self.server_id = None
@@ -1003,6 +1213,9 @@ class Node(Element, TimestampsMixin):
         self.timestamps = NodeTimestamps(create_time)
         self.settings = NodeSettings()
         self.annotations = NodeAnnotations()
+        self.timestamps._container = self # pylint: disable=protected-access
+        self.settings._container = self # pylint: disable=protected-access
+        self.annotations._container = self # pylint: disable=protected-access
 
         # Set if there is no baseVersion in the raw data
         self.moved = False
@@ -1030,9 +1243,100 @@ class Node(Element, TimestampsMixin):
         self._sort = raw['sortValue'] if 'sortValue' in raw else self.sort
         self._version = raw['baseVersion'] if 'baseVersion' in raw else self._version
         self._text = raw['text'] if 'text' in raw else self._text
-        self.timestamps.load(raw['timestamps'])
-        self.settings.load(raw['nodeSettings'])
-        self.annotations.load(raw['annotationsGroup'])
+        self._defer('timestamps', raw['timestamps'])
+        self._defer('settings', raw['nodeSettings'])
+        self._defer('annotations', raw['annotationsGroup'])
+        self._reset_fields(not self._dirty)
+
+    def _defer(self, name, raw):
+        """Load raw data into an element, or hold onto it until first access if this node is lazy.
+
+        Args:
+            name (str): The element name.
+            raw (Any): Raw element representation.
+        """
+        if self._lazy:
+            setattr(self, '_' + name, _Deferred(raw))
+        else:
+            self._load_element(name, raw)
+
+    def _load_element(self, name, raw):
+        getattr(self, '_' + name).load(raw)
+
+    def _hydrate(self, name, raw):
+        """Decode deferred raw data into a new element.
+
+        Args:
+            name (str): The element name.
+            raw (Any): Raw element representation.
+
+        Returns:
+            Element: The element.
+
+        Raises:
+            ParseException: If there was an error parsing data.
+        """
+        # Elements without a factory are created by _load_element.
+        factory = self._ELEMENTS.get(name)
+        if factory is not None:
+            element = factory()
+            element._container = self # pylint: disable=protected-access
+            setattr(self, '_' + name, element)
+        try:
+            self._load_element(name, raw)
+        except (KeyError, ValueError) as e:
+            setattr(self, '_' + name, _Deferred(raw))
+            raise_from(exception.ParseException('Parse error in %s' % (type(self)), raw), e)
+        return getattr(self, '_' + name)
+
+    def _element_dirty(self, name):
+        """Get the dirty state of an element without decoding it.
+
+        Args:
+            name (str): The element name.
+
+        Returns:
+            bool: Whether the element is dirty.
+        """
+        value = getattr(self, '_' + name)
+        if isinstance(value, _Deferred):
+            return self._raw_dirty(value.raw)
+        return value.dirty
+
+    @classmethod
+    def _raw_dirty(cls, raw):
+        # Collaborators are saved as a pair, with the dirty bit appended to the requests.
+        if isinstance(raw, tuple):
+            requests_raw = raw[1]
+            return bool(requests_raw) and requests_raw[-1] is True
+        if not isinstance(raw, dict):
+            return False
+        if raw.get('_dirty', False):
+            return True
+        # Annotations are saved with their own dirty bits.
+        for entry in raw.get('annotations', ()):
+            if cls._raw_dirty(entry):
+                return True
+        for entry in raw.get('context', {}).values():
+            if cls._raw_dirty(entry):
+                return True
+        return False
+
+    def _get_timestamp(self, name, key):
+        """Get a timestamp without decoding the other timestamps.
+
+        Args:
+            name (str): The attribute name on :class:`NodeTimestamps`.
+            key (str): The raw key.
+
+        Returns:
+            Union[datetime.datetime, None]: The timestamp.
+        """
+        timestamps = self._timestamps
+        if isinstance(timestamps, _Deferred):
+            raw = timestamps.raw.get(key)
+            return None if raw is None else NodeTimestamps.str_to_dt(raw)
+        return getattr(timestamps, name)
 
     def save(self, clean=True):
         ret = super(Node, self).save(clean)
@@ -1049,8 +1353,59 @@ class Node(Element, TimestampsMixin):
         ret['timestamps'] = self.timestamps.save(clean)
         ret['nodeSettings'] = self.settings.save(clean)
         ret['annotationsGroup'] = self.annotations.save(clean)
+        if clean:
+            self._reset_fields()
         return ret
 
+    def save_delta(self, clean=True):
+        """Serialize the fields that changed since this node was last loaded or saved, along with the fields
+        that identify it. Nodes the server hasn't seen, and nodes whose changes aren't known, are saved in full.
+
+        Args:
+            clean (bool): Whether to clear the dirty bit.
+
+        Returns:
+            dict: Raw.
+        """
+        if self._fields is None or self.moved or self._version is None:
+            return self.save(clean)
+        fields = self._fields
+        ret = super(Node, self).save(clean)
+        ret['id'] = self.id
+        ret['kind'] = 'notes#node'
+        ret['type'] = self.type.value
+        ret['parentId'] = self.parent_id
+        ret['baseVersion'] = self._version
+        if self.server_id is not None:
+            ret['serverId'] = self.server_id
+        ret['timestamps'] = self.timestamps.save_delta(clean)
+        if self._element_dirty('settings'):
+            ret['nodeSettings'] = self.settings.save(clean)
+        if self._element_dirty('annotations'):
+            ret['annotationsGroup'] = self.annotations.save(clean)
+        self._save_fields(ret, fields, clean)
+        if clean:
+            self._reset_fields()
+        return ret
+
+    def _save_fields(self, ret, fields, clean): # pylint: disable=unused-argument
+        """Serialize modified fields for :py:meth:`save_delta`.
+
+        Args:
+            ret (dict): Raw.
+            fields (frozenset[str]): Raw keys of modified fields.
+            clean (bool): Whether to clear the dirty bit.
+        """
+        if 'sortValue' in fields:
+            ret['sortValue'] = self._sort
+        if 'text' in fields:
+            ret['text'] = self._text
+
+    def _mark_unsent(self):
+        """Mark this node dirty again after its changes failed to upload. They'll be resent in full."""
+        self._reset_fields(False)
+        self._mark_dirty()
+
     @property
     def sort(self):
         """Get the sort id.
@@ -1063,6 +1418,7 @@ class Node(Element, TimestampsMixin):
     @sort.setter
     def sort(self, value):
         self._sort = value
+        self._mark_field('sortValue')
         self.touch()
 
     @property
@@ -1091,18 +1447,24 @@ class Node(Element, TimestampsMixin):
             value (str): Text value.
         """
         self._text = value
-        self.timestamps.edited = datetime.datetime.utcnow()
+        self._mark_field('text')
         self.touch(True)
 
     @property
     def trashed(self):
-        return self.timestamps.trashed > NodeTimestamps.int_to_dt(0)
+        trashed = self._get_timestamp('trashed', 'trashed')
+        return trashed is not None and trashed > NodeTimestamps.int_to_dt(0)
 
     @trashed.setter
     def trashed(self, value):
         self.timestamps.trashed = datetime.datetime.utcnow() if value else NodeTimestamps.int_to_dt(0)
         self.touch()
 
+    @property
+    def deleted(self):
+        deleted = self._get_timestamp('deleted', 'deleted')
+        return deleted is not None and deleted > NodeTimestamps.int_to_dt(0)
+
     @property
     def children(self):
         """Get all children.
@@ -1132,6 +1494,9 @@ class Node(Element, TimestampsMixin):
         """
         self._children[node.id] = node
         node.parent = self
+        root = self._get_root()
+        if root is not None:
+            root._attach(node) # pylint: disable=protected-access
         if dirty:
             self.touch()
 
@@ -1159,15 +1524,74 @@ class Node(Element, TimestampsMixin):
         """
         return self.server_id is None
 
+    def _get_root(self):
+        """Get the :class:`Root` this node is attached to.
+
+        Returns:
+            Union[gkeepapi.node.Root, None]: The root node or None if detached.
+        """
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node if isinstance(node, Root) else None
+
+    def _notify_dirty(self):
+        root = self._get_root()
+        if root is not None:
+            root._changed(self) # pylint: disable=protected-access
+
+    @property
+    def _local_dirty(self):
+        """Get dirty state, ignoring children.
+
+        Returns:
+            bool: Whether this node (or one of its elements) is dirty.
+        """
+        return super(Node, self).dirty or self._element_dirty('timestamps') or \
+            self._element_dirty('annotations') or self._element_dirty('settings')
+
     @property
     def dirty(self):
-        return super(Node, self).dirty or self.timestamps.dirty or self.annotations.dirty or self.settings.dirty or any((node.dirty for node in self.children))
+        return self._local_dirty or any((node.dirty for node in self.children))
 
 class Root(Node):
     """Internal root node."""
+    __slots__ = ('_watchers',)
     ID = 'root'
     def __init__(self):
         super(Root, self).__init__(id_=self.ID)
+        self._watchers = []
+
+    def watch(self, callback):
+        """Register a callback to be invoked whenever a node in this tree is modified.
+
+        Args:
+            callback (callable): Called with the modified :class:`Node`.
+        """
+        self._watchers.append(callback)
+
+    def _changed(self, node):
+        if node is self:
+            return
+        for callback in self._watchers:
+            callback(node)
+
+    def _attach(self, node):
+        """Notify watchers about dirty nodes in a newly attached subtree.
+
+        Args:
+            node (gkeepapi.node.Node): The subtree root.
+        """
+        nodes = [node]
+        while nodes:
+            node = nodes.pop()
+            if node._local_dirty: # pylint: disable=protected-access
+                self._changed(node)
+            nodes.extend(node._children.values()) # pylint: disable=protected-access
+
+    @property
+    def _local_dirty(self):
+        return False
 
     @property
     def dirty(self):
@@ -1175,7 +1599,11 @@ class Root(Node):
 
 class TopLevelNode(Node):
     """Top level node base class."""
+    __slots__ = ('_color', '_archived', '_pinned', '_title', 'labels', '_collaborators')
     _TYPE = None
+    collaborators = _DeferredElement('collaborators', 'gkeepapi.node.NodeCollaborators: Collaborators.')
+    _ELEMENTS = dict(Node._ELEMENTS, collaborators=NodeCollaborators)
+
     def __init__(self, **kwargs):
         super(TopLevelNode, self).__init__(parent_id=Root.ID, **kwargs)
         self._color = ColorValue.White
@@ -1184,6 +1612,8 @@ class TopLevelNode(Node):
         self._title = ''
         self.labels = NodeLabels()
         self.collaborators = NodeCollaborators()
+        self.labels._container = self # pylint: disable=protected-access
+        self.collaborators._container = self # pylint: disable=protected-access
 
     def _load(self, raw):
         super(TopLevelNode, self)._load(raw)
@@ -1193,12 +1623,18 @@ class TopLevelNode(Node):
         self._title = raw['title'] if 'title' in raw else ''
         self.labels.load(raw['labelIds'] if 'labelIds' in raw else [])
 
-        self.collaborators.load(
+        self._defer('collaborators', (
             raw['roleInfo'] if 'roleInfo' in raw else [],
             raw['shareRequests'] if 'shareRequests' in raw else [],
-        )
+        ))
         self.moved = 'moved' in raw
 
+    def _load_element(self, name, raw):
+        if name == 'collaborators':
+            self._collaborators.load(*raw)
+        else:
+            super(TopLevelNode, self)._load_element(name, raw)
+
     def save(self, clean=True):
         ret = super(TopLevelNode, self).save(clean)
         ret['color'] = self._color.value
@@ -1215,6 +1651,24 @@ class TopLevelNode(Node):
             ret['shareRequests'] = requests
         return ret
 
+    def _save_fields(self, ret, fields, clean):
+        super(TopLevelNode, self)._save_fields(ret, fields, clean)
+        if 'color' in fields:
+            ret['color'] = self._color.value
+        if 'isArchived' in fields:
+            ret['isArchived'] = self._archived
+        if 'isPinned' in fields:
+            ret['isPinned'] = self._pinned
+        if 'title' in fields:
+            ret['title'] = self._title
+        if self.labels.dirty:
+            ret['labelIds'] = self.labels.save(clean)
+        if self._element_dirty('collaborators'):
+            collaborators, requests = self.collaborators.save(clean)
+            ret['collaborators'] = collaborators
+            if requests:
+                ret['shareRequests'] = requests
+
     @property
     def color(self):
         """Get the node color.
@@ -1227,6 +1681,7 @@ class TopLevelNode(Node):
     @color.setter
     def color(self, value):
         self._color = value
+        self._mark_field('color')
         self.touch(True)
 
     @property
@@ -1241,6 +1696,7 @@ class TopLevelNode(Node):
     @archived.setter
     def archived(self, value):
         self._archived = value
+        self._mark_field('isArchived')
         self.touch(True)
 
     @property
@@ -1255,6 +1711,7 @@ class TopLevelNode(Node):
     @pinned.setter
     def pinned(self, value):
         self._pinned = value
+        self._mark_field('isPinned')
         self.touch(True)
 
     @property
@@ -1269,6 +1726,7 @@ class TopLevelNode(Node):
     @title.setter
     def title(self, value):
         self._title = value
+        self._mark_field('title')
         self.touch(True)
 
     @property
@@ -1281,8 +1739,8 @@ class TopLevelNode(Node):
         return 'https://keep.google.com/u/0/#' + self._TYPE.value + '/' + self.id
 
     @property
-    def dirty(self):
-        return super(TopLevelNode, self).dirty or self.labels.dirty or self.collaborators.dirty
+    def _local_dirty(self):
+        return super(TopLevelNode, self)._local_dirty or self.labels.dirty or self._element_dirty('collaborators')
 
     @property
     def blobs(self):
@@ -1295,6 +1753,7 @@ class TopLevelNode(Node):
 
 class Note(TopLevelNode):
     """Represents a Google Keep note."""
+    __slots__ = ()
     _TYPE = NodeType.Note
     def __init__(self, **kwargs):
         super(Note, self).__init__(type_=self._TYPE, **kwargs)
@@ -1330,10 +1789,14 @@ class Note(TopLevelNode):
 
 class List(TopLevelNode):
     """Represents a Google Keep list."""
+    __slots__ = ('_order',)
     _TYPE = NodeType.List
     def __init__(self, **kwargs):
         super(List, self).__init__(type_=self._TYPE, **kwargs)
 
+        # Sorted list items, including checked and deleted ones. None if it needs to be rebuilt.
+        self._order = None
+
     def add(self, text, checked=False, sort=None):
         """Add a new item to the list.
 
@@ -1342,19 +1805,126 @@ class List(TopLevelNode):
             checked (bool): Whether this item is checked.
             sort (int): Item id for sorting.
         """
+        node = self._new_item(text, checked, sort)
+        self.append(node, False)
+        self.touch(True)
+        return node
+
+    def _new_item(self, text, checked, sort):
+        """Construct a dirty item for this list.
+
+        Args:
+            text (str): The text.
+            checked (bool): Whether this item is checked.
+            sort (int): Item id for sorting. Random if None.
+
+        Returns:
+            gkeepapi.node.ListItem: The item.
+        """
+        # pylint: disable=protected-access
         node = ListItem(parent_id=self.id, parent_server_id=self.server_id)
-        node.checked = checked
-        node.text = text
+        node._text = text
+        node._checked = checked
         if sort is not None:
-            node.sort = sort
-        self.append(node, True)
-        self.touch(True)
+            node._sort = sort
+        node._dirty = True
         return node
 
+    def extend(self, items):
+        """Add several items to the bottom of the list, in order. The list is only marked dirty once.
+
+        Args:
+            items (Iterable[Tuple[str, bool]]): The text and checked state of each item.
+
+        Returns:
+            list[gkeepapi.node.ListItem]: The new items.
+        """
+        sorts = [int(node.sort) for node in self.children if isinstance(node, ListItem)]
+        sort = min(sorts) if sorts else random.randint(1000000000, 9999999999)
+        nodes = []
+        for text, checked in items:
+            sort -= 1
+            node = self._new_item(text, checked, sort)
+            self.append(node, False)
+            nodes.append(node)
+        self.touch(True)
+        return nodes
+
+    def replace_items(self, items):
+        """Delete all items and add new ones.
+
+        Args:
+            items (Iterable[Tuple[str, bool]]): The text and checked state of each item.
+
+        Returns:
+            list[gkeepapi.node.ListItem]: The new items.
+        """
+        dt = datetime.datetime.utcnow()
+        for node in self.items:
+            node.timestamps.deleted = dt
+        return self.extend(items)
+
+    def check_items(self, items=None):
+        """Check several items.
+
+        Args:
+            items (Iterable[gkeepapi.node.ListItem]): Items to check. Defaults to all items.
+        """
+        self._set_checked(items, True)
+
+    def uncheck_items(self, items=None):
+        """Uncheck several items.
+
+        Args:
+            items (Iterable[gkeepapi.node.ListItem]): Items to uncheck. Defaults to all items.
+        """
+        self._set_checked(items, False)
+
+    def _set_checked(self, items, checked):
+        dt = datetime.datetime.utcnow()
+        for node in self.items if items is None else items:
+            if node.checked != checked:
+                node._checked = checked # pylint: disable=protected-access
+                node._mark_field('checked') # pylint: disable=protected-access
+                node.touch(True, dt)
+
+    def reorder(self, items):
+        """Rearrange items into the given order. The items swap positions among themselves, so other items don't
+        move. Subitems move with their parent, so they should be reordered separately.
+
+        Args:
+            items (Iterable[gkeepapi.node.ListItem]): Items, in their new order.
+        """
+        items = list(items)
+        dt = datetime.datetime.utcnow()
+        sorts = sorted((int(node.sort) for node in items), reverse=True)
+        for node, sort in zip(items, sorts):
+            if int(node.sort) != sort:
+                node._sort = sort # pylint: disable=protected-access
+                node._mark_field('sortValue') # pylint: disable=protected-access
+                node.touch(False, dt)
+        self._order = None
+
     @property
     def text(self):
         return '\n'.join((six.text_type(node) for node in self.items))
 
+    @staticmethod
+    def items_sort_key(item):
+        """Get the key to sort a list item by. Items sort in descending order of these keys.
+
+        Indented items sort by their parent's sort id, then their own, so they follow their parent item. The
+        parent's key has a higher second element than any of its subitems, so it sorts ahead of them.
+
+        Args:
+            item (gkeepapi.node.ListItem): The item.
+        Returns:
+            tuple: Key.
+        """
+        if item.indented:
+            return (int(item.parent_item.sort), 0, int(item.sort))
+        return (int(item.sort), 1, 0)
+
     @classmethod
     def items_sort(cls, items):
         """Sort list items, taking into account parent items.
@@ -1364,45 +1934,25 @@ class List(TopLevelNode):
         Returns:
             list[gkeepapi.node.ListItem]: Sorted items.
         """
-        class t(tuple):
-            """Tuple with element-based sorting"""
-            def __cmp__(self, other):
-                for a, b in six.moves.zip_longest(self, other):
-                    if a != b:
-                        if a is None:
-                            return 1
-                        if b is None:
-                            return -1
-                        return a - b
-                return 0
-
-            def __lt__(self, other):
-                return self.__cmp__(other) < 0
-            def __gt_(self, other):
-                return self.__cmp__(other) > 0
-            def __le__(self, other):
-                return self.__cmp__(other) <= 0
-            def __ge_(self, other):
-                return self.__cmp__(other) >= 0
-            def __eq__(self, other):
-                return self.__cmp__(other) == 0
-            def __ne__(self, other):
-                return self.__cmp__(other) != 0
-
-        def key_func(x):
-            if x.indented:
-                return t((int(x.parent_item.sort), int(x.sort)))
-            return t((int(x.sort), ))
-
-        return sorted(items, key=key_func, reverse=True)
+        return sorted(items, key=cls.items_sort_key, reverse=True)
+
+    def append(self, node, dirty=True):
+        self._order = None
+        return super(List, self).append(node, dirty)
+
+    def remove(self, node, dirty=True):
+        self._order = None
+        super(List, self).remove(node, dirty)
 
     def _items(self, checked=None):
-        return self.items_sort([
-            node for node in self.children
-            if isinstance(node, ListItem) and not node.deleted and (
-                checked is None or node.checked == checked
-            )
-        ])
+        # The order only depends on sort values and indentation, so checking or deleting items filters the
+        # cached order rather than invalidating it.
+        if self._order is None:
+            self._order = self.items_sort([node for node in self.children if isinstance(node, ListItem)])
+        return [
+            node for node in self._order
+            if not node.deleted and (checked is None or node.checked == checked)
+        ]
 
     def __str__(self):
         return '\n'.join(([self.title] + [six.text_type(node) for node in self.items]))
@@ -1439,6 +1989,9 @@ class ListItem(Node):
     Interestingly enough, :class:`Note`s store their content in a single
     child :class:`ListItem`.
     """
+    __slots__ = (
+        'parent_item', 'parent_server_id', 'super_list_item_id', 'prev_super_list_item_id', '_subitems', '_checked',
+    )
     def __init__(self, parent_id=None, parent_server_id=None, super_list_item_id=None, **kwargs):
         super(ListItem, self).__init__(type_=NodeType.ListItem, parent_id=parent_id, **kwargs)
         self.parent_item = None
@@ -1453,6 +2006,12 @@ class ListItem(Node):
         self.prev_super_list_item_id = self.super_list_item_id
         self.super_list_item_id = raw.get('superListItemId') or None
         self._checked = raw.get('checked', False)
+        self._invalidate_order()
+
+    def _invalidate_order(self):
+        """Discard the cached order of the containing list."""
+        if isinstance(self.parent, List):
+            self.parent._order = None # pylint: disable=protected-access
 
     def save(self, clean=True):
         ret = super(ListItem, self).save(clean)
@@ -1461,6 +2020,13 @@ class ListItem(Node):
         ret['checked'] = self._checked
         return ret
 
+    def _save_fields(self, ret, fields, clean):
+        super(ListItem, self)._save_fields(ret, fields, clean)
+        ret['parentServerId'] = self.parent_server_id
+        ret['superListItemId'] = self.super_list_item_id
+        if 'checked' in fields:
+            ret['checked'] = self._checked
+
     def add(self, text, checked=False, sort=None):
         """Add a new sub item to the list. This item must already be attached to a list.
 
@@ -1488,6 +2054,7 @@ class ListItem(Node):
         self._subitems[node.id] = node
         node.super_list_item_id = self.id
         node.parent_item = self
+        node._invalidate_order() # pylint: disable=protected-access
         if dirty:
             node.touch(True)
 
@@ -1504,6 +2071,7 @@ class ListItem(Node):
         del self._subitems[node.id]
         node.super_list_item_id = None
         node.parent_item = None
+        node._invalidate_order() # pylint: disable=protected-access
         if dirty:
             node.touch(True)
 
@@ -1527,6 +2095,11 @@ class ListItem(Node):
         """
         return self.super_list_item_id is not None
 
+    @Node.sort.setter
+    def sort(self, value): # pylint: disable=arguments-differ
+        Node.sort.fset(self, value) # pylint: disable=no-member
+        self._invalidate_order()
+
     @property
     def checked(self):
         """Get the checked state.
@@ -1539,6 +2112,7 @@ class ListItem(Node):
     @checked.setter
     def checked(self, value):
         self._checked = value
+        self._mark_field('checked')
         self.touch(True)
 
     def __str__(self):
@@ -1550,6 +2124,7 @@ class ListItem(Node):
 
 class NodeBlob(Element):
     """Represents a blob descriptor."""
+    __slots__ = ('blob_id', 'type', '_media_id', '_mimetype', '_is_uploaded')
     _TYPE = None
     def __init__(self, type_=None):
         super(NodeBlob, self).__init__()
@@ -1580,6 +2155,7 @@ class NodeBlob(Element):
 
 class NodeAudio(NodeBlob):
     """Represents an audio blob."""
+    __slots__ = ('_length',)
     _TYPE = BlobType.Audio
     def __init__(self):
         super(NodeAudio, self).__init__(type_=self._TYPE)
@@ -1597,6 +2173,7 @@ class NodeAudio(NodeBlob):
 
 class NodeImage(NodeBlob):
     """Represents an image blob."""
+    __slots__ = ('_width', '_height', '_byte_size', '_extracted_text', '_extraction_status')
     _TYPE = BlobType.Image
     def __init__(self):
         super(NodeImage, self).__init__(type_=self._TYPE)
@@ -1635,6 +2212,7 @@ class NodeImage(NodeBlob):
 
 class NodeDrawing(NodeBlob):
     """Represents a drawing blob."""
+    __slots__ = ('_extracted_text', '_extraction_status', '_drawing_info')
     _TYPE = BlobType.Drawing
     def __init__(self):
         super(NodeDrawing, self).__init__(type_=self._TYPE)
@@ -1662,6 +2240,10 @@ class NodeDrawing(NodeBlob):
 
 class NodeDrawingInfo(Element):
     """Represents information about a drawing blob."""
+    __slots__ = (
+        'drawing_id', 'snapshot', '_snapshot_fingerprint', '_thumbnail_generated_time', '_ink_hash',
+        '_snapshot_proto_fprint',
+    )
     def __init__(self):
         super(NodeDrawingInfo, self).__init__()
         self.drawing_id = ''
@@ -1692,6 +2274,8 @@ class NodeDrawingInfo(Element):
 
 class Blob(Node):
     """Represents a Google Keep blob."""
+    __slots__ = ('_blob',)
+    blob = _DeferredElement('blob', 'gkeepapi.node.NodeBlob: Blob.')
     _blob_type_map = {
         BlobType.Audio: NodeAudio,
         BlobType.Image: NodeImage,
@@ -1731,15 +2315,27 @@ class Blob(Node):
 
     def _load(self, raw):
         super(Blob, self)._load(raw)
-        self.blob = self.from_json(raw.get('blob'))
+        self._defer('blob', raw.get('blob'))
+
+    def _load_element(self, name, raw):
+        if name == 'blob':
+            self._blob = self.from_json(raw)
+        else:
+            super(Blob, self)._load_element(name, raw)
 
     def save(self, clean=True):
         ret = super(Blob, self).save(clean)
         ret['blob'] = self.blob.save(clean)
         return ret
 
+    def _save_fields(self, ret, fields, clean):
+        super(Blob, self)._save_fields(ret, fields, clean)
+        if self._element_dirty('blob'):
+            ret['blob'] = self.blob.save(clean)
+
 class Label(Element, TimestampsMixin):
     """Represents a label."""
+    __slots__ = ('id', '_name', 'timestamps', '_merged')
     def __init__(self):
         super(Label, self).__init__()
 
@@ -1748,6 +2344,7 @@ class Label(Element, TimestampsMixin):
         self.id = self._generateId(create_time)
         self._name = ''
         self.timestamps = NodeTimestamps(create_time)
+        self.timestamps._container = self # pylint: disable=protected-access
         self._merged = NodeTimestamps.int_to_dt(0)
 
     @classmethod
@@ -1814,11 +2411,12 @@ _type_map = {
     NodeType.Blob: Blob,
 }
 
-def from_json(raw):
+def from_json(raw, lazy=False):
     """Helper to construct a node from a dict.
 
     Args:
         raw (dict): Raw node representation.
+        lazy (bool): Whether to defer decoding node elements until they're accessed.
 
     Returns:
         Node: A Node object or None.
@@ -1833,6 +2431,7 @@ def from_json(raw):
             raise_from(exception.ParseException('Parse error for %s' % (_type), raw), e)
         return None
     node = ncls()
+    node._lazy = lazy # pylint: disable=protected-access
     node.load(raw)
 
     return node
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.query
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import heapq
+import itertools
+
+import six
+
+from . import node as _node
+
+class Query(object):
+    """Finds notes matching a set of criteria. Queries are built up by chaining calls, and run when iterated::
+
+        query = keep.query().label(label).color(gkeepapi.node.ColorValue.Red).text('milk')
+        for note in query.sortByUpdated().limit(10):
+            ...
+
+    Criteria are compiled into a list of checks when the query is run. Checks that are cheap and rule out the
+    most notes run first, and candidates are taken from the smallest index that applies. Results are produced
+    as they're found, unless they're sorted. Like :py:meth:`gkeepapi.Keep.find`, trashed notes are excluded by
+    default.
+    """
+    # Relative cost of each kind of check.
+    COST_FLAG = 1.0
+    COST_COLOR = 1.0
+    COST_LABEL = 2.0
+    COST_TEXT = 10.0
+    COST_PATTERN = 50.0
+    COST_FUNC = 100.0
+
+    def __init__(self, keep):
+        """
+        Args:
+            keep (gkeepapi.Keep): The Keep object to search.
+        """
+        self._keep = keep
+        self._texts = []
+        self._labels = []
+        self._unlabeled = False
+        self._colors = None
+        self._flags = {'trashed': False}
+        self._funcs = []
+        self._limit = None
+        self._descending = None
+
+    def text(self, query):
+        """Match notes containing a string or regular expression in their title or text. If called more than
+        once, notes must match all of them.
+
+        Args:
+            query (Union[_sre.SRE_Pattern, str]): A str or regular expression.
+
+        Returns:
+            Query: This query.
+        """
+        self._texts.append(query)
+        return self
+
+    def label(self, *labels):
+        """Match notes with any of the given labels. If called more than once, or combined with
+        :py:meth:`unlabeled`, notes can match any of them.
+
+        Args:
+            *labels (Union[gkeepapi.node.Label, str]): Label objects or ids.
+
+        Returns:
+            Query: This query.
+        """
+        self._labels.extend(label.id if isinstance(label, _node.Label) else label for label in labels)
+        return self
+
+    def unlabeled(self):
+        """Match notes with no labels. If combined with :py:meth:`label`, notes can match either.
+
+        Returns:
+            Query: This query.
+        """
+        self._unlabeled = True
+        return self
+
+    def color(self, *colors):
+        """Match notes with any of the given colors. If called more than once, notes can match any of them.
+
+        Args:
+            *colors (gkeepapi.node.ColorValue): Colors.
+
+        Returns:
+            Query: This query.
+        """
+        self._colors = (self._colors or frozenset()).union(colors)
+        return self
+
+    def pinned(self, value=True):
+        """Match notes by pin state.
+
+        Args:
+            value (Union[bool, None]): Whether notes should be pinned, or None to match either.
+
+        Returns:
+            Query: This query.
+        """
+        self._flags['pinned'] = value
+        return self
+
+    def archived(self, value=True):
+        """Match notes by archive state.
+
+        Args:
+            value (Union[bool, None]): Whether notes should be archived, or None to match either.
+
+        Returns:
+            Query: This query.
+        """
+        self._flags['archived'] = value
+        return self
+
+    def trashed(self, value=True):
+        """Match notes by trash state.
+
+        Args:
+            value (Union[bool, None]): Whether notes should be trashed, or None to match either.
+
+        Returns:
+            Query: This query.
+        """
+        self._flags['trashed'] = value
+        return self
+
+    def filter(self, func):
+        """Match notes with a filter function. These are checked last.
+
+        Args:
+            func (callable): Called with each note. Returns whether it matches.
+
+        Returns:
+            Query: This query.
+        """
+        self._funcs.append(func)
+        return self
+
+    def limit(self, count):
+        """Stop after the given number of results.
+
+        Args:
+            count (Union[int, None]): Maximum number of results, or None for no limit.
+
+        Returns:
+            Query: This query.
+        """
+        self._limit = count
+        return self
+
+    def sortByUpdated(self, descending=True):
+        """Sort results by the time they were last updated.
+
+        Args:
+            descending (bool): Whether to return the most recently updated notes first.
+
+        Returns:
+            Query: This query.
+        """
+        self._descending = descending
+        return self
+
+    def __iter__(self):
+        candidates, checks = self._compile()
+        results = self._scan(candidates, checks)
+        if self._descending is not None:
+            key = lambda node: node.timestamps.updated
+            if self._limit is not None:
+                pick = heapq.nlargest if self._descending else heapq.nsmallest
+                return iter(pick(self._limit, results, key=key))
+            return iter(sorted(results, key=key, reverse=self._descending))
+        if self._limit is not None:
+            return itertools.islice(results, self._limit)
+        return results
+
+    def all(self):
+        """Run the query.
+
+        Returns:
+            List[gkeepapi.node.TopLevelNode]: Results.
+        """
+        return list(self)
+
+    def first(self):
+        """Run the query, stopping at the first result.
+
+        Returns:
+            Union[gkeepapi.node.TopLevelNode, None]: The first result, if any.
+        """
+        return next(iter(self), None)
+
+    @staticmethod
+    def _scan(candidates, checks):
+        """Filter candidates by checks, in order.
+
+        Args:
+            candidates (List[gkeepapi.node.TopLevelNode]): Candidate nodes.
+            checks (List[callable]): Checks.
+
+        Returns:
+            Iterator[gkeepapi.node.TopLevelNode]: Nodes that pass all checks.
+        """
+        # Queries rarely have more than a few checks. Combining them into one function avoids running a
+        # generator with all() for every note.
+        if not checks:
+            return iter(candidates)
+        if len(checks) == 1:
+            check = checks[0]
+        elif len(checks) == 2:
+            a, b = checks
+            check = lambda node: a(node) and b(node)
+        elif len(checks) == 3:
+            a, b, c = checks
+            check = lambda node: a(node) and b(node) and c(node)
+        else:
+            check = lambda node: all(func(node) for func in checks)
+        return six.moves.filter(check, candidates)
+
+    def _compile(self):
+        """Pick candidates and order checks.
+
+        Returns:
+            Tuple[List[gkeepapi.node.TopLevelNode], List[callable]]: Candidate nodes, and the checks they must pass.
+        """
+        # pylint: disable=protected-access
+        keep = self._keep
+        registry = keep._nodes
+        labels = self._labels
+        unlabeled = self._unlabeled
+        flags = self._flags
+
+        if keep._store is not None:
+            # Load candidates from the store. Loaded nodes might've been modified, so they're all checked below.
+            # The store can't match labels and unlabeled notes at once, so only the flags narrow those down.
+            store_labels = None
+            if unlabeled != bool(labels):
+                store_labels = labels
+            node_ids = keep._store.find(store_labels, flags.get('pinned'), flags.get('archived'), flags.get('trashed'))
+            if node_ids is None:
+                keep._materializeAll()
+            else:
+                keep._materialize(node_ids)
+
+        candidates = registry.getChildren(_node.Root.ID)
+        total = float(max(len(candidates), 1))
+        # Each check has a cost and an estimated fraction of notes that pass it.
+        checks = []
+
+        for flag, value in flags.items():
+            if value is None:
+                continue
+            flagged = registry.getFlagged(flag)
+            if value and len(flagged) < len(candidates):
+                candidates = flagged
+            ratio = min(len(flagged) / total, 1.0)
+            checks.append((self.COST_FLAG, ratio if value else 1.0 - ratio, self._flagCheck(flag, value)))
+
+        if labels or unlabeled:
+            ratio = 0.0
+            if labels:
+                labeled = {}
+                for label_id in labels:
+                    labeled.update(keep._label_index.get(label_id))
+                if not unlabeled and len(labeled) < len(candidates):
+                    candidates = labeled
+                ratio += len(labeled) / total
+            if unlabeled:
+                ratio += 1.0 - len(keep._label_index) / total
+            checks.append((self.COST_LABEL, min(ratio, 1.0), self._labelCheck(labels, unlabeled)))
+
+        if self._colors is not None:
+            colors = self._colors
+            checks.append((self.COST_COLOR, 0.5, lambda node: node.color in colors))
+
+        for query in self._texts:
+            if isinstance(query, six.string_types):
+                ratio = 0.1
+                # Candidates from the text index still need to be verified.
+                if keep._text_index is not None:
+                    matched = keep._text_index.search(query)
+                    if matched is not None:
+                        if len(matched) < len(candidates):
+                            candidates = matched
+                        ratio = len(matched) / total
+                checks.append((self.COST_TEXT, ratio, self._textCheck(query)))
+            else:
+                checks.append((self.COST_PATTERN, 0.1, self._patternCheck(query)))
+
+        for func in self._funcs:
+            checks.append((self.COST_FUNC, 1.0, func))
+
+        # Running the checks in increasing order of cost per note ruled out minimizes the expected total cost.
+        checks.sort(key=lambda check: check[0] / max(1.0 - check[1], 0.001))
+        return list(candidates.values()), [check for _, _, check in checks]
+
+    @staticmethod
+    def _flagCheck(flag, value):
+        if flag == 'pinned':
+            return lambda node: node.pinned == value
+        if flag == 'archived':
+            return lambda node: node.archived == value
+        return lambda node: node.trashed == value
+
+    @staticmethod
+    def _labelCheck(labels, unlabeled=False):
+        if unlabeled:
+            # Removed labels are kept until the next sync, so notes with entries might still have no labels.
+            if not labels:
+                return lambda node: not node.labels or not node.labels.all()
+            check = Query._labelCheck(labels)
+            return lambda node: not node.labels or not node.labels.all() or check(node)
+        if len(labels) == 1:
+            label_id = labels[0]
+            return lambda node: node.labels.get(label_id) is not None
+        return lambda node: any(node.labels.get(label_id) is not None for label_id in labels)
+
+    @staticmethod
+    def _textCheck(query):
+        return lambda node: query in node.title or query in node.text
+
+    @staticmethod
+    def _patternCheck(query):
+        return lambda node: query.search(node.title) or query.search(node.text)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.retry
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import calendar
+import email.utils
+import random
+import time
+
+class ErrorKind(object):
+    """Classes of retryable errors."""
+    Auth = 'auth'
+    """The access token has expired (401)"""
+
+    Throttle = 'throttle'
+    """The request was rate limited (429). It wasn't processed, so it's always safe to retry"""
+
+    Server = 'server'
+    """The server failed (5xx)"""
+
+    Connection = 'connection'
+    """The request couldn't be completed due to a network error"""
+
+class RetryPolicy(object):
+    """Decides whether and when failed requests are retried.
+
+    Each class of error has its own budget of retries per request. Retries back off exponentially, with full
+    jitter, unless the server specifies a delay via `Retry-After`.
+    """
+    DEFAULT_BUDGETS = {
+        ErrorKind.Auth: 2,
+        ErrorKind.Throttle: 4,
+        ErrorKind.Server: 3,
+        ErrorKind.Connection: 3,
+    }
+
+    def __init__(self, budgets=None, backoff=0.5, max_backoff=30.0, sleep=time.sleep):
+        """
+        Args:
+            budgets (Dict[str, int]): Maximum retries per request for each :class:`ErrorKind`. Defaults are used for
+                any that aren't specified.
+            backoff (float): Seconds to wait before the first retry. This doubles with each retry.
+            max_backoff (float): Maximum seconds to wait before a retry. Requests are failed rather than waiting
+                longer than this for `Retry-After`.
+            sleep (callable): A function that waits for the given number of seconds.
+        """
+        self.budgets = dict(self.DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+
+    @staticmethod
+    def classify(code):
+        """Get the kind of error for a status code.
+
+        Args:
+            code (int): The status code.
+
+        Returns:
+            Union[str, None]: The :class:`ErrorKind`, or None if the error isn't retryable.
+        """
+        if code == 401:
+            return ErrorKind.Auth
+        if code == 429:
+            return ErrorKind.Throttle
+        if 500 <= code < 600:
+            return ErrorKind.Server
+        return None
+
+    def getDelay(self, kind, attempt, retry_after=None):
+        """Get the delay before a retry.
+
+        Args:
+            kind (str): The :class:`ErrorKind`.
+            attempt (int): The number of retries so far for this kind of error.
+            retry_after (Union[float, None]): The delay requested by the server.
+
+        Returns:
+            Union[float, None]: Seconds to wait, or None if the request shouldn't be retried.
+        """
+        if attempt >= self.budgets.get(kind, 0):
+            return None
+        if kind == ErrorKind.Auth:
+            # The token is refreshed, so there's no need to wait.
+            return 0.0
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def parseRetryAfter(value):
+        """Parse a `Retry-After` header.
+
+        Args:
+            value (Union[str, None]): The header value, in seconds or as an HTTP date.
+
+        Returns:
+            Union[float, None]: Seconds to wait.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        parsed = email.utils.parsedate_tz(value)
+        if parsed is None:
+            return None
+        timestamp = calendar.timegm(parsed[:9]) - (parsed[9] or 0)
+        return max(0.0, timestamp - time.time())
+
+class NoRetryPolicy(RetryPolicy):
+    """A policy that only refreshes expired access tokens."""
+    def __init__(self, sleep=time.sleep):
+        super(NoRetryPolicy, self).__init__(budgets={
+            ErrorKind.Throttle: 0,
+            ErrorKind.Server: 0,
+            ErrorKind.Connection: 0,
+        }, sleep=sleep)
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.scheduler
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import collections
+import logging
+import random
+import threading
+import time
+
+from six.moves import queue
+
+from . import exception
+
+logger = logging.getLogger(__name__)
+
+class Account(object):
+    """Scheduling state for a :class:`gkeepapi.Keep` object managed by a :class:`SyncScheduler`."""
+    def __init__(self, key, keep, due):
+        self.key = key
+        """The account key."""
+
+        self.keep = keep
+        """The Keep object."""
+
+        self.due = due
+        """When the next sync is due."""
+
+        self.running = False
+        """Whether a sync is in progress."""
+
+        self.syncs = 0
+        """Number of successful syncs."""
+
+        self.failures = 0
+        """Number of consecutive failed syncs."""
+
+        self.last_sync = None
+        """When the last successful sync finished."""
+
+        self.last_error = None
+        """The exception raised by the last failed sync."""
+
+        self.stopped = False
+        """Whether syncing stopped after an error that retrying won't fix. See :py:meth:`SyncScheduler.schedule`."""
+
+class SyncScheduler(object):
+    """Periodically syncs many :class:`gkeepapi.Keep` objects on a bounded pool of worker threads.
+
+    Due accounts with local changes are synced first. Accounts with local changes are always considered due,
+    so changes are sent up promptly. Syncs that fail due to server, network or consistency errors are retried
+    with exponential backoff, and accounts are resynced when the server requests it. Other errors, like a :py:class:`gkeepapi.exception.LoginException`, stop the account
+    from being synced::
+
+        scheduler = gkeepapi.scheduler.SyncScheduler(workers=8, interval=300)
+        for email, keep in accounts:
+            scheduler.add(email, keep)
+        scheduler.start()
+
+    Keep objects must not be used elsewhere while they're being synced.
+    """
+    POLL_INTERVAL = 1.0
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self, workers=4, interval=300, backoff=30, max_backoff=3600, sync_kwargs=None, clock=time.time): # pylint: disable=too-many-arguments
+        """
+        Args:
+            workers (int): Number of syncs to run at once.
+            interval (float): Seconds between syncs of an account.
+            backoff (float): Seconds to wait before retrying a failed sync. This doubles with each failure.
+            max_backoff (float): Maximum seconds to wait before retrying a failed sync.
+            sync_kwargs (dict): Arguments for :py:meth:`gkeepapi.Keep.sync`.
+            clock (callable): A function returning the current time in seconds.
+        """
+        self._workers = workers
+        self._interval = interval
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._sync_kwargs = sync_kwargs or {}
+        self._clock = clock
+
+        self._lock = threading.Condition()
+        self._accounts = {}
+        self._queue = queue.Queue()
+        self._threads = []
+        self._running = 0
+        self._stopping = False
+
+        self._started = None
+        self._syncs = 0
+        self._failures = 0
+        self._latencies = collections.deque(maxlen=self.LATENCY_SAMPLES)
+
+    def add(self, key, keep):
+        """Add an account. It's synced as soon as possible.
+
+        Args:
+            key (str): A unique key for the account.
+            keep (gkeepapi.Keep): The Keep object. It should already be logged in.
+        """
+        with self._lock:
+            self._accounts[key] = Account(key, keep, self._clock())
+            self._lock.notify_all()
+
+    def remove(self, key):
+        """Remove an account. A sync in progress is allowed to finish.
+
+        Args:
+            key (str): The account key.
+        """
+        with self._lock:
+            self._accounts.pop(key, None)
+
+    def get(self, key):
+        """Get scheduling state for an account.
+
+        Args:
+            key (str): The account key.
+
+        Returns:
+            Union[Account, None]: The account state.
+        """
+        return self._accounts.get(key)
+
+    def schedule(self, key):
+        """Sync an account as soon as possible. This also resumes an account that was stopped by an error.
+
+        Args:
+            key (str): The account key.
+        """
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is not None and (account.failures == 0 or account.stopped):
+                account.stopped = False
+                account.failures = 0
+                account.due = self._clock()
+                self._lock.notify_all()
+
+    def start(self):
+        """Start the worker threads and the dispatcher."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            if self._started is None:
+                self._started = self._clock()
+
+        self._startWorkers()
+        thread = threading.Thread(target=self._dispatchLoop, name='gkeepapi-scheduler')
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, wait=True):
+        """Stop syncing. Syncs in progress are allowed to finish.
+
+        Args:
+            wait (bool): Whether to wait for syncs in progress.
+        """
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+        for _ in range(self._workers):
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def runPending(self):
+        """Sync all due accounts and wait for them to finish. This is an alternative to :py:meth:`start` for
+        callers that drive the schedule themselves.
+
+        Returns:
+            int: The number of syncs run.
+        """
+        with self._lock:
+            if self._started is None:
+                self._started = self._clock()
+
+        started = not self._threads
+        if started:
+            self._startWorkers()
+        try:
+            with self._lock:
+                count = self._dispatch()
+                while self._running:
+                    self._lock.wait()
+                    count += self._dispatch()
+        finally:
+            if started:
+                self.stop()
+        return count
+
+    def getStats(self):
+        """Get fleet-wide sync metrics.
+
+        Returns:
+            dict: The number of accounts, successful and failed syncs, throughput in syncs per second and sync
+            latency percentiles in seconds, over the most recent syncs.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = self._clock() - self._started if self._started is not None else 0
+            now = self._clock()
+            return {
+                'accounts': len(self._accounts),
+                'running': self._running,
+                'due': sum(
+                    1 for account in self._accounts.values()
+                    if account.due <= now and not account.running and not account.stopped
+                ),
+                'syncs': self._syncs,
+                'failures': self._failures,
+                'throughput': self._syncs / elapsed if elapsed > 0 else 0.0,
+                'latency': {
+                    'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+                    'p50': self._percentile(latencies, 0.5),
+                    'p95': self._percentile(latencies, 0.95),
+                    'max': latencies[-1] if latencies else 0.0,
+                },
+            }
+
+    @staticmethod
+    def _percentile(values, fraction):
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    def _startWorkers(self):
+        for i in range(self._workers):
+            thread = threading.Thread(target=self._work, name='gkeepapi-sync-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _dispatchLoop(self):
+        with self._lock:
+            while not self._stopping:
+                self._dispatch()
+                self._lock.wait(self.POLL_INTERVAL)
+
+    def _dispatch(self):
+        """Queue due accounts for syncing, up to the number of idle workers. Must be called with the lock held. The
+        lock is released while accounts are checked for local changes.
+
+        Returns:
+            int: The number of accounts queued.
+        """
+        if self._running >= self._workers:
+            return 0
+        idle = [account for account in self._accounts.values() if not account.running and not account.stopped]
+
+        self._lock.release()
+        try:
+            checked = [(account, self._hasChanges(account)) for account in idle]
+        finally:
+            self._lock.acquire()
+
+        now = self._clock()
+        due = []
+        for account, dirty in checked:
+            # The account might've been queued or removed in the meantime.
+            if account.running or account.stopped or self._accounts.get(account.key) is not account:
+                continue
+            # Changes are synced up promptly, unless the account is backing off.
+            if account.due <= now or (dirty and account.failures == 0):
+                due.append((not dirty, account.due, account))
+
+        due.sort(key=lambda item: item[:2])
+        count = 0
+        for _, _, account in due[:self._workers - self._running]:
+            account.running = True
+            self._running += 1
+            self._queue.put(account)
+            count += 1
+        return count
+
+    @staticmethod
+    def _hasChanges(account):
+        """Check whether an account has local changes. Errors are logged, so they don't stop the dispatcher.
+
+        Args:
+            account (Account): The account.
+
+        Returns:
+            bool: Whether there are changes. False if they couldn't be checked.
+        """
+        try:
+            return account.keep.hasChanges()
+        except Exception: # pylint: disable=broad-except
+            logger.exception('Failed to check %s for changes', account.key)
+            return False
+
+    def _work(self):
+        while True:
+            account = self._queue.get()
+            if account is None:
+                return
+            self._sync(account)
+
+    def _sync(self, account):
+        start = self._clock()
+        error = None
+        try:
+            self._syncKeep(account)
+        except Exception as e: # pylint: disable=broad-except
+            error = e
+        end = self._clock()
+
+        with self._lock:
+            account.running = False
+            self._running -= 1
+            self._latencies.append(end - start)
+            if error is None:
+                self._syncs += 1
+                account.syncs += 1
+                account.failures = 0
+                account.last_sync = end
+                account.last_error = None
+                account.due = end + self._interval
+            else:
+                self._failures += 1
+                account.failures += 1
+                account.last_error = error
+                if self._isTransient(account.keep, error):
+                    delay = min(self._max_backoff, self._backoff * 2 ** (account.failures - 1))
+                    account.due = end + delay * random.uniform(0.5, 1.0)
+                    logger.warning('Sync failed for %s (attempt %d), retrying in %.0fs: %s',
+                        account.key, account.failures, account.due - end, error)
+                else:
+                    account.stopped = True
+                    logger.error('Sync failed for %s, stopping: %s', account.key, error)
+            self._lock.notify_all()
+
+    def _syncKeep(self, account):
+        """Sync an account, resyncing it if the server requests it.
+
+        Args:
+            account (Account): The account.
+        """
+        try:
+            account.keep.sync(**self._sync_kwargs)
+        except exception.ResyncRequiredException:
+            logger.warning('Server requested a full resync for %s', account.key)
+            kwargs = dict(self._sync_kwargs)
+            kwargs['resync'] = True
+            account.keep.sync(**kwargs)
+
+    @staticmethod
+    def _isTransient(keep, error):
+        """Check whether a sync might succeed if it's retried.
+
+        Args:
+            keep (gkeepapi.Keep): The Keep object.
+            error (Exception): The exception raised by the sync.
+
+        Returns:
+            bool: Whether the error came from the server or the network, or was a consistency issue.
+        """
+        if isinstance(error, (exception.APIException, exception.SyncException)):
+            return True
+        transport = keep._keep_api.getTransport() # pylint: disable=protected-access
+        return transport is not None and isinstance(error, transport.CONNECTION_ERRORS)
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.snapshot
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import datetime
+import json
+import re
+
+import six
+
+from . import exception
+
+MAGIC = b'GKEEPSNP'
+VERSION = 1
+
+class RecordType(object):
+    """Valid record types."""
+    End = 0
+    """End of snapshot marker"""
+
+    Meta = 1
+    """Account metadata"""
+
+    Label = 2
+    """A serialized label"""
+
+    Node = 3
+    """A serialized node"""
+
+    Shape = 4
+    """The keys of an object (internal)"""
+
+    Delete = 5
+    """A deleted node (store only)"""
+
+# Value kinds within a shape
+_VALUE = 0
+_NESTED = 1
+_TIMESTAMP = 2
+
+_TS_RE = re.compile(r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{6})Z\Z')
+_EPOCH_STR = u'1970-01-01T00:00:00.000000Z'
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+# Keys that hold timestamps. Other strings are stored as is, even if they look like timestamps.
+_TIMESTAMP_KEYS = frozenset(['created', 'deleted', 'trashed', 'updated', 'userEdited', 'lastMerged'])
+
+def _timestamp_to_int(value):
+    """Convert a timestamp string to microseconds since the epoch, if it can be converted back exactly.
+
+    Args:
+        value (str): The string.
+
+    Returns:
+        Union[int, None]: The timestamp or None.
+    """
+    if value == _EPOCH_STR:
+        return 0
+    match = _TS_RE.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, us = match.groups()
+    hour, minute, second = int(hour), int(minute), int(second)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    try:
+        days = datetime.date(int(year), int(month), int(day)).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return None
+    return (days * 86400 + hour * 3600 + minute * 60 + second) * 1000000 + int(us)
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, pos
+
+class Codec(object):
+    """Converts values to and from their encoded representation.
+
+    Objects are encoded as arrays that start with the id of a shape holding their keys, and lists are
+    encoded as arrays starting with -1. Timestamp fields are encoded as integers and decoded to
+    :class:`datetime.datetime` objects. Shapes are assigned ids in the order they're first seen, and must
+    be persisted alongside the encoded values.
+    """
+    def __init__(self):
+        self._shape_ids = {}
+        self._shapes = []
+        self._pending = []
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def addShape(self, keys, kinds):
+        """Register a persisted shape.
+
+        Args:
+            keys (List[str]): The object keys.
+            kinds (List[int]): The kind of value for each key.
+        """
+        self._shape_ids[(tuple(keys), tuple(kinds))] = len(self._shapes)
+        # Indices are offset by one to account for the shape id at the start of encoded objects.
+        self._shapes.append((
+            tuple(keys),
+            tuple(i + 1 for i, kind in enumerate(kinds) if kind == _NESTED),
+            tuple(i + 1 for i, kind in enumerate(kinds) if kind == _TIMESTAMP),
+        ))
+
+    def popShapes(self):
+        """Get shapes registered by :py:meth:`encode` since the last call. These must be persisted before the
+        values that use them.
+
+        Returns:
+            List[Tuple[List[str], List[int]]]: A list of keys and kinds.
+        """
+        pending = self._pending
+        self._pending = []
+        return pending
+
+    def encode(self, value):
+        """Encode a value.
+
+        Args:
+            value (Any): A JSON compatible value.
+
+        Returns:
+            Any: The encoded value.
+        """
+        if isinstance(value, (list, tuple)):
+            ret = [-1]
+            for item in value:
+                ret.append(self.encode(item) if isinstance(item, (dict, list, tuple)) else item)
+            return ret
+
+        if not isinstance(value, dict):
+            return value
+
+        keys = tuple(value)
+        kinds = []
+        ret = [None]
+        for key in keys:
+            item = value[key]
+            if isinstance(item, (dict, list, tuple)):
+                kinds.append(_NESTED)
+                item = self.encode(item)
+            elif key in _TIMESTAMP_KEYS and isinstance(item, six.string_types) and len(item) == 27:
+                timestamp = _timestamp_to_int(item)
+                if timestamp is None:
+                    kinds.append(_VALUE)
+                else:
+                    kinds.append(_TIMESTAMP)
+                    item = timestamp
+            else:
+                kinds.append(_VALUE)
+            ret.append(item)
+
+        kinds = tuple(kinds)
+        shape_id = self._shape_ids.get((keys, kinds))
+        if shape_id is None:
+            shape_id = len(self._shapes)
+            self.addShape(keys, kinds)
+            self._pending.append((list(keys), list(kinds)))
+        ret[0] = shape_id
+        return ret
+
+    def decode(self, value):
+        """Decode a value. The value is modified in place.
+
+        Args:
+            value (Any): An encoded value.
+
+        Returns:
+            Any: The value.
+
+        Raises:
+            ValueError: If the value is malformed.
+        """
+        if not isinstance(value, list):
+            return value
+
+        shape_id = value[0]
+        if shape_id < 0:
+            return [self.decode(item) if isinstance(item, list) else item for item in value[1:]]
+
+        try:
+            keys, nested, timestamps = self._shapes[shape_id]
+        except IndexError:
+            raise ValueError('Unknown shape %d' % shape_id)
+        if len(value) != len(keys) + 1:
+            raise ValueError('Shape mismatch')
+        for i in nested:
+            value[i] = self.decode(value[i])
+        for i in timestamps:
+            value[i] = _EPOCH + datetime.timedelta(microseconds=value[i]) if value[i] else _EPOCH
+        del value[0]
+        return dict(zip(keys, value))
+
+def dumps(value):
+    """Serialize an encoded value to a compact JSON payload.
+
+    Args:
+        value (Any): The encoded value.
+
+    Returns:
+        bytes: The payload.
+    """
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+class Writer(object):
+    """Writes a snapshot to a binary file object.
+
+    A snapshot is a header followed by a series of records. Each record is a type byte, a varint length and
+    a UTF-8 JSON payload, encoded with a :class:`Codec`. Shapes are written out as records ahead of the
+    first record that uses them, so keys are only written once per snapshot.
+    """
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._buf = bytearray(MAGIC)
+        _write_varint(self._buf, VERSION)
+        self._codec = Codec()
+
+    def write(self, type_, value):
+        """Write a record.
+
+        Args:
+            type_ (int): The :class:`RecordType`.
+            value (Any): A JSON compatible value.
+        """
+        value = self._codec.encode(value)
+        for shape in self._codec.popShapes():
+            self._writeRecord(RecordType.Shape, shape)
+        self._writeRecord(type_, value)
+
+    def close(self):
+        """Write the end marker and flush. Doesn't close the underlying file object."""
+        self._buf.append(RecordType.End)
+        _write_varint(self._buf, 0)
+        self.flush()
+
+    def flush(self):
+        """Flush buffered records to the file object."""
+        if self._buf:
+            self._fp.write(bytes(self._buf))
+            self._buf = bytearray()
+
+    def _writeRecord(self, type_, value):
+        payload = dumps(value)
+        self._buf.append(type_)
+        _write_varint(self._buf, len(payload))
+        self._buf += payload
+        if len(self._buf) >= self.BUFFER_SIZE:
+            self.flush()
+
+class Reader(object):
+    """Reads records from a snapshot in a binary file object.
+
+    Iterating yields tuples of the :class:`RecordType` and the decoded value. Records are read as needed.
+    """
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._buf = bytearray()
+        self._pos = 0
+        self._codec = Codec()
+
+        header = self._read(len(MAGIC))
+        if bytes(header) != MAGIC:
+            raise exception.ParseException('Not a snapshot', bytes(header))
+        self._fill(10)
+        try:
+            version, self._pos = _read_varint(self._buf, self._pos)
+        except IndexError:
+            raise exception.ParseException('Truncated snapshot', None)
+        if version != VERSION:
+            raise exception.ParseException('Unsupported snapshot version %d' % version, version)
+
+    def __iter__(self):
+        decode_json = json.JSONDecoder().raw_decode
+        while True:
+            if len(self._buf) - self._pos < 11:
+                self._fill(11)
+            try:
+                type_ = self._buf[self._pos]
+                length, self._pos = _read_varint(self._buf, self._pos + 1)
+            except IndexError:
+                raise exception.ParseException('Truncated snapshot', None)
+            if type_ == RecordType.End:
+                return
+
+            payload = self._read(length)
+            try:
+                value, _ = decode_json(payload.decode('utf-8'))
+                if type_ == RecordType.Shape:
+                    self._codec.addShape(*value)
+                    continue
+                value = self._codec.decode(value)
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                raise exception.ParseException('Malformed record: %s' % e, bytes(payload))
+            yield type_, value
+
+    def _fill(self, size):
+        """Buffer at least the given number of bytes, if available."""
+        while len(self._buf) - self._pos < size:
+            chunk = self._fp.read(max(self.BUFFER_SIZE, size))
+            if not chunk:
+                return
+            self._buf = self._buf[self._pos:] + bytearray(chunk)
+            self._pos = 0
+
+    def _read(self, size):
+        self._fill(size)
+        if len(self._buf) - self._pos < size:
+            raise exception.ParseException('Truncated snapshot', None)
+        data = self._buf[self._pos:self._pos + size]
+        self._pos += size
+        return data
@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.store
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+
+from . import node as _node
+from . import exception
+from . import snapshot as _snapshot
+
+logger = logging.getLogger(__name__)
+
+class Store(object):
+    """Base class for persistent node stores.
+
+    A store holds serialized nodes, labels and sync versions for a :class:`gkeepapi.Keep` object, so it can
+    resume without syncing or restoring everything. Nodes are loaded individually, and only changed nodes are
+    written back after each sync.
+    """
+    def close(self):
+        """Close the store."""
+        raise NotImplementedError()
+
+    def __len__(self):
+        raise NotImplementedError()
+
+    def __contains__(self, node_id):
+        raise NotImplementedError()
+
+    def getMeta(self):
+        """Get account metadata.
+
+        Returns:
+            Union[dict, None]: A dict with the `keep_version`, `reminder_version` and serialized `labels`, or None
+            if the store is empty.
+        """
+        raise NotImplementedError()
+
+    def getParentId(self, node_id):
+        """Get the parent of a stored node.
+
+        Args:
+            node_id (str): The node ID.
+
+        Returns:
+            Union[str, None]: The parent node ID.
+        """
+        raise NotImplementedError()
+
+    def getChildIds(self, parent_id):
+        """Get the stored children of a node.
+
+        Args:
+            parent_id (str): The parent node ID.
+
+        Returns:
+            List[str]: Node IDs.
+        """
+        raise NotImplementedError()
+
+    def getIdByServerId(self, server_id):
+        """Get the ID of a stored node with the given server ID.
+
+        Args:
+            server_id (str): The server ID.
+
+        Returns:
+            Union[str, None]: The node ID.
+        """
+        raise NotImplementedError()
+
+    def getDirtyIds(self):
+        """Get the IDs of stored nodes that have local modifications.
+
+        Returns:
+            List[str]: Node IDs.
+        """
+        raise NotImplementedError()
+
+    def find(self, labels=None, pinned=None, archived=None, trashed=None):
+        """Find stored top level nodes that might match the given criteria. See :py:meth:`gkeepapi.Keep.find`.
+
+        Args:
+            labels (Union[List[str], None]): A list of label ids to match. An empty list matches notes with no labels.
+            pinned (Union[bool, None]): Whether to match pinned notes.
+            archived (Union[bool, None]): Whether to match archived notes.
+            trashed (Union[bool, None]): Whether to match trashed notes.
+
+        Returns:
+            Union[List[str], None]: Candidate node IDs, or None if the store can't filter nodes.
+        """
+        return None
+
+    def load(self, node_id):
+        """Load a stored node.
+
+        Args:
+            node_id (str): The node ID.
+
+        Returns:
+            dict: The serialized node.
+
+        Raises:
+            KeyError: If the node isn't stored.
+            ParseException: If the record is invalid.
+        """
+        raise NotImplementedError()
+
+    def update(self, keep_version, reminder_version, labels, nodes, deleted_ids): # pylint: disable=too-many-arguments
+        """Write changes to the store.
+
+        Args:
+            keep_version (str): The notes sync version.
+            reminder_version (str): The reminders sync version.
+            labels (List[gkeepapi.node.Label]): All labels.
+            nodes (Iterable[gkeepapi.node.Node]): Created or modified nodes.
+            deleted_ids (Iterable[str]): Deleted node IDs.
+        """
+        raise NotImplementedError()
+
+    def clear(self):
+        """Remove everything from the store."""
+        raise NotImplementedError()
+
+class MmapStore(Store):
+    """Persistent node store backed by a memory-mapped, append-only file.
+
+    The file holds the same records as a snapshot (see :mod:`gkeepapi.snapshot`), with fixed size
+    record headers. Node records additionally start with the node id, parent id, server id and dirty state,
+    so an index of record offsets can be built on open without decoding any nodes. Updates are appended,
+    deletions are recorded as tombstones, and the file is compacted once it's mostly stale records.
+    """
+    MAGIC = b'GKEEPSTO'
+    VERSION = 1
+    COMPACT_THRESHOLD = 1 << 20
+
+    _HEADER = struct.Struct('<8sB')
+    _RECORD = struct.Struct('<BI')
+    _NODE = struct.Struct('<H')
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the store file. It's created if it doesn't exist.
+
+        Raises:
+            ParseException: If the file isn't a valid store.
+        """
+        self._path = path
+        self._fp = None
+        self._map = None
+        self._size = 0
+        self._garbage = 0
+        self._clearIndex()
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as fp:
+                fp.write(self._HEADER.pack(self.MAGIC, self.VERSION))
+        self._fp = open(path, 'r+b')
+        self._map = None
+        self._scan()
+
+    def _clearIndex(self):
+        self._codec = _snapshot.Codec()
+        self._shapes = []
+        self._meta = None
+        self._records = {}
+        self._parents = {}
+        self._children = {}
+        self._server_ids = {}
+        self._node_server_ids = {}
+        self._dirty = set()
+
+    def close(self):
+        self._unmap()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, node_id):
+        return node_id in self._records
+
+    def getMeta(self):
+        if self._meta is None:
+            return None
+        offset, length = self._meta
+        return self._decode(self._map[offset:offset + length])
+
+    def getParentId(self, node_id):
+        return self._parents.get(node_id)
+
+    def getChildIds(self, parent_id):
+        return list(self._children.get(parent_id, ()))
+
+    def getIdByServerId(self, server_id):
+        return self._server_ids.get(server_id)
+
+    def getDirtyIds(self):
+        return list(self._dirty)
+
+    def load(self, node_id):
+        offset, length = self._records[node_id]
+        header_length, = self._NODE.unpack_from(self._map, offset)
+        start = offset + self._NODE.size + header_length
+        return self._decode(self._map[start:offset + length])
+
+    def update(self, keep_version, reminder_version, labels, nodes, deleted_ids): # pylint: disable=too-many-arguments
+        buf = bytearray()
+        self._appendMeta(buf, keep_version, reminder_version, labels)
+        for node in nodes:
+            self._appendNode(buf, node)
+        for node_id in deleted_ids:
+            if node_id in self._records:
+                self._appendRecord(buf, _snapshot.RecordType.Delete, _snapshot.dumps([node_id]))
+
+        self._write(buf)
+        if self._garbage > self._size - self._garbage and self._size > self.COMPACT_THRESHOLD:
+            self.compact()
+
+    def clear(self):
+        self._unmap()
+        self._fp.seek(0)
+        self._fp.truncate()
+        self._fp.write(self._HEADER.pack(self.MAGIC, self.VERSION))
+        self._fp.flush()
+        self._garbage = 0
+        self._clearIndex()
+        self._scan()
+
+    def compact(self):
+        """Rewrite the store, dropping stale records."""
+        buf = bytearray(self._HEADER.pack(self.MAGIC, self.VERSION))
+        for body in self._shapes:
+            self._appendRecord(buf, _snapshot.RecordType.Shape, body)
+        if self._meta is not None:
+            offset, length = self._meta
+            self._appendRecord(buf, _snapshot.RecordType.Meta, self._map[offset:offset + length])
+        for offset, length in self._records.values():
+            self._appendRecord(buf, _snapshot.RecordType.Node, self._map[offset:offset + length])
+
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'wb') as fp:
+            fp.write(bytes(buf))
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        self.close()
+        getattr(os, 'replace', os.rename)(tmp_path, self._path)
+        self._fp = open(self._path, 'r+b')
+        self._garbage = 0
+        self._clearIndex()
+        self._scan()
+
+    def _decode(self, data):
+        try:
+            return self._codec.decode(json.loads(bytes(data).decode('utf-8')))
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            raise exception.ParseException('Malformed record: %s' % e, bytes(data))
+
+    def _appendRecord(self, buf, type_, body):
+        buf += self._RECORD.pack(type_, len(body))
+        buf += body
+
+    def _appendShapes(self, buf):
+        for shape in self._codec.popShapes():
+            self._appendRecord(buf, _snapshot.RecordType.Shape, _snapshot.dumps(shape))
+
+    def _appendMeta(self, buf, keep_version, reminder_version, labels):
+        meta = self._codec.encode({
+            'keep_version': keep_version,
+            'reminder_version': reminder_version,
+            'labels': [label.save(False) for label in labels],
+        })
+        self._appendShapes(buf)
+        self._appendRecord(buf, _snapshot.RecordType.Meta, _snapshot.dumps(meta))
+
+    def _appendNode(self, buf, node):
+        payload = _snapshot.dumps(self._codec.encode(node.save(False)))
+        self._appendShapes(buf)
+        header = _snapshot.dumps([node.id, node.parent_id, node.server_id, node.dirty])
+        self._appendRecord(buf, _snapshot.RecordType.Node, self._NODE.pack(len(header)) + header + payload)
+
+    def _write(self, buf):
+        """Append records and index them."""
+        self._unmap()
+        # Drop any partial record left behind by an interrupted write.
+        self._fp.truncate(self._size)
+        self._fp.seek(self._size)
+        self._fp.write(bytes(buf))
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._scan(self._size)
+
+    def _map_file(self):
+        self._map = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _scan(self, offset=None):
+        """Index records, starting at the given offset."""
+        self._unmap()
+        self._map_file()
+        size = len(self._map)
+        if offset is None:
+            if size < self._HEADER.size:
+                raise exception.ParseException('Not a store', None)
+            magic, version = self._HEADER.unpack_from(self._map, 0)
+            if magic != self.MAGIC:
+                raise exception.ParseException('Not a store', magic)
+            if version != self.VERSION:
+                raise exception.ParseException('Unsupported store version %d' % version, version)
+            offset = self._HEADER.size
+
+        while offset + self._RECORD.size <= size:
+            type_, length = self._RECORD.unpack_from(self._map, offset)
+            start = offset + self._RECORD.size
+            end = start + length
+            if end > size:
+                break
+            self._index(type_, start, length)
+            offset = end
+
+        if offset != size:
+            logger.warning('Ignoring partial record at end of store')
+        self._size = offset
+
+    def _index(self, type_, start, length):
+        record_size = self._RECORD.size + length
+        if type_ == _snapshot.RecordType.Shape:
+            body = self._map[start:start + length]
+            self._shapes.append(body)
+            # Shapes written by this store were registered when they were encoded.
+            if len(self._shapes) > len(self._codec):
+                self._codec.addShape(*json.loads(body.decode('utf-8')))
+        elif type_ == _snapshot.RecordType.Meta:
+            if self._meta is not None:
+                self._garbage += self._RECORD.size + self._meta[1]
+            self._meta = (start, length)
+        elif type_ == _snapshot.RecordType.Node:
+            header_length, = self._NODE.unpack_from(self._map, start)
+            header_start = start + self._NODE.size
+            node_id, parent_id, server_id, dirty = json.loads(
+                self._map[header_start:header_start + header_length].decode('utf-8')
+            )
+            self._unindex(node_id)
+            self._records[node_id] = (start, length)
+            self._parents[node_id] = parent_id
+            self._children.setdefault(parent_id, set()).add(node_id)
+            if server_id is not None:
+                self._server_ids[server_id] = node_id
+                self._node_server_ids[node_id] = server_id
+            if dirty:
+                self._dirty.add(node_id)
+        elif type_ == _snapshot.RecordType.Delete:
+            node_id, = json.loads(self._map[start:start + length].decode('utf-8'))
+            self._unindex(node_id)
+            self._garbage += record_size
+        else:
+            logger.warning('Unknown store record type: %s', type_)
+            self._garbage += record_size
+
+    def _unindex(self, node_id):
+        record = self._records.pop(node_id, None)
+        if record is None:
+            return
+        self._garbage += self._RECORD.size + record[1]
+        parent_id = self._parents.pop(node_id)
+        children = self._children[parent_id]
+        children.discard(node_id)
+        if not children:
+            del self._children[parent_id]
+        server_id = self._node_server_ids.pop(node_id, None)
+        if server_id is not None and self._server_ids.get(server_id) == node_id:
+            del self._server_ids[server_id]
+        self._dirty.discard(node_id)
+
+class SQLiteStore(Store):
+    """Persistent node store backed by an SQLite database.
+
+    Each node is a row holding its serialized data along with indexed columns for its parent, server ID,
+    dirty state and the pinned/archived/trashed state of top level nodes. Label references are kept in a
+    separate table, so :py:meth:`find` can be answered with an indexed query.
+    """
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+        'CREATE TABLE IF NOT EXISTS labels (id TEXT PRIMARY KEY, data TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS nodes ('
+            'id TEXT PRIMARY KEY, parent_id TEXT NOT NULL, server_id TEXT, dirty INTEGER NOT NULL, '
+            'pinned INTEGER, archived INTEGER, trashed INTEGER, data TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS nodes_parent ON nodes (parent_id, trashed, archived, pinned)',
+        'CREATE INDEX IF NOT EXISTS nodes_server_id ON nodes (server_id)',
+        'CREATE INDEX IF NOT EXISTS nodes_dirty ON nodes (dirty)',
+        'CREATE TABLE IF NOT EXISTS node_labels (node_id TEXT NOT NULL, label_id TEXT NOT NULL, '
+            'PRIMARY KEY (node_id, label_id))',
+        'CREATE INDEX IF NOT EXISTS node_labels_label ON node_labels (label_id)',
+    )
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the database. It's created if it doesn't exist.
+
+        Raises:
+            ParseException: If the file isn't a valid database.
+        """
+        try:
+            self._db = sqlite3.connect(path)
+            with self._db:
+                for statement in self._SCHEMA:
+                    self._db.execute(statement)
+        except sqlite3.DatabaseError as e:
+            raise exception.ParseException('Not a store: %s' % e, None)
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+
+    def __contains__(self, node_id):
+        return self._db.execute('SELECT 1 FROM nodes WHERE id = ?', (node_id,)).fetchone() is not None
+
+    def getMeta(self):
+        meta = dict(self._db.execute('SELECT key, value FROM meta'))
+        if not meta:
+            return None
+        return {
+            'keep_version': meta.get('keep_version'),
+            'reminder_version': meta.get('reminder_version'),
+            'labels': [self._decode(data) for data, in self._db.execute('SELECT data FROM labels')],
+        }
+
+    def getParentId(self, node_id):
+        row = self._db.execute('SELECT parent_id FROM nodes WHERE id = ?', (node_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def getChildIds(self, parent_id):
+        return [node_id for node_id, in self._db.execute('SELECT id FROM nodes WHERE parent_id = ?', (parent_id,))]
+
+    def getIdByServerId(self, server_id):
+        if server_id is None:
+            return None
+        row = self._db.execute('SELECT id FROM nodes WHERE server_id = ?', (server_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def getDirtyIds(self):
+        return [node_id for node_id, in self._db.execute('SELECT id FROM nodes WHERE dirty = 1')]
+
+    def find(self, labels=None, pinned=None, archived=None, trashed=None):
+        clauses = ['parent_id = ?']
+        params = [_node.Root.ID]
+        for column, value in (('pinned', pinned), ('archived', archived), ('trashed', trashed)):
+            if value is not None:
+                clauses.append('%s = ?' % column)
+                params.append(int(value))
+
+        if labels:
+            clauses.append('id IN (SELECT node_id FROM node_labels WHERE label_id IN (%s))' % (
+                ', '.join('?' * len(labels))
+            ))
+            params.extend(labels)
+        elif labels is not None:
+            clauses.append('id NOT IN (SELECT node_id FROM node_labels)')
+
+        query = 'SELECT id FROM nodes WHERE ' + ' AND '.join(clauses)
+        return [node_id for node_id, in self._db.execute(query, params)]
+
+    def load(self, node_id):
+        row = self._db.execute('SELECT data FROM nodes WHERE id = ?', (node_id,)).fetchone()
+        if row is None:
+            raise KeyError(node_id)
+        return self._decode(row[0])
+
+    def update(self, keep_version, reminder_version, labels, nodes, deleted_ids): # pylint: disable=too-many-arguments
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', [
+                ('keep_version', keep_version),
+                ('reminder_version', reminder_version),
+            ])
+
+            label_rows = [(label.id, json.dumps(label.save(False))) for label in labels]
+            self._db.executemany('INSERT OR REPLACE INTO labels (id, data) VALUES (?, ?)', label_rows)
+            label_ids = set(label_id for label_id, _ in label_rows)
+            self._db.executemany('DELETE FROM labels WHERE id = ?', [
+                (label_id,) for label_id, in self._db.execute('SELECT id FROM labels') if label_id not in label_ids
+            ])
+
+            for node in nodes:
+                self._writeNode(node)
+
+            deleted_ids = [(node_id,) for node_id in deleted_ids]
+            self._db.executemany('DELETE FROM nodes WHERE id = ?', deleted_ids)
+            self._db.executemany('DELETE FROM node_labels WHERE node_id = ?', deleted_ids)
+
+    def clear(self):
+        with self._db:
+            for table in ('meta', 'labels', 'nodes', 'node_labels'):
+                self._db.execute('DELETE FROM %s' % table)
+
+    def _decode(self, data):
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise exception.ParseException('Malformed record: %s' % e, data)
+
+    def _writeNode(self, node):
+        pinned = archived = trashed = None
+        if isinstance(node, _node.TopLevelNode):
+            pinned = node.pinned
+            archived = node.archived
+            trashed = node.trashed
+
+        self._db.execute('INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+            node.id, node.parent_id, node.server_id, node.dirty, pinned, archived, trashed,
+            json.dumps(node.save(False)),
+        ))
+
+        self._db.execute('DELETE FROM node_labels WHERE node_id = ?', (node.id,))
+        if isinstance(node, _node.TopLevelNode):
+            self._db.executemany('INSERT INTO node_labels (node_id, label_id) VALUES (?, ?)', [
+                (node.id, label_id) for label_id in node.labels._labels # pylint: disable=protected-access
+            ])
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.tokencache
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+class TokenCache(object):
+    """An in-memory cache of OAuth tokens, shared by :py:class:`gkeepapi.APIAuth` objects."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+
+    @staticmethod
+    def key(email, scopes):
+        """Get the cache key for an account.
+
+        Args:
+            email (str): The account.
+            scopes (str): The OAuth scopes.
+
+        Returns:
+            str: The key.
+        """
+        return '%s %s' % (email, scopes)
+
+    def get(self, key):
+        """Get a token, if it hasn't expired.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Union[Tuple[str, float], None]: The token and its expiry time in seconds since the epoch.
+        """
+        with self._lock:
+            entry = self._tokens.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0], entry[1]
+
+    def set(self, key, token, expiry):
+        """Store a token.
+
+        Args:
+            key (str): The cache key.
+            token (str): The OAuth token.
+            expiry (float): Expiry time in seconds since the epoch.
+        """
+        with self._lock:
+            self._tokens[key] = (token, expiry)
+            self._save()
+
+    def _save(self):
+        """Persist the cache. Called with the lock held."""
+
+class FileTokenCache(TokenCache):
+    """A token cache persisted to a JSON file, so restarted processes can reuse unexpired tokens.
+
+    The file is readable only by the current user, but it grants access to the cached accounts until the
+    tokens expire, so keep it somewhere safe.
+    """
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path to the cache file. It's created if it doesn't exist.
+        """
+        super(FileTokenCache, self).__init__()
+        self._path = path
+        try:
+            with open(path, 'r') as fh:
+                raw = json.load(fh)
+        except (IOError, OSError, ValueError):
+            raw = {}
+
+        now = time.time()
+        for key, entry in raw.items():
+            if entry.get('expiry', 0) > now:
+                self._tokens[key] = (entry['token'], entry['expiry'])
+
+    def _save(self):
+        now = time.time()
+        raw = {
+            key: {'token': token, 'expiry': expiry}
+            for key, (token, expiry) in self._tokens.items() if expiry > now
+        }
+
+        # Write to a temporary file and rename it over the old one, so readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self._path)), prefix='.gkeepapi')
+        try:
+            os.chmod(tmp_path, 0o600)
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(raw, fh)
+            getattr(os, 'replace', os.rename)(tmp_path, self._path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.transport
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+class Transport(object):
+    """Sends HTTP requests on behalf of API clients, using a pool of connections.
+
+    A transport can be shared between any number of API clients and :py:class:`gkeepapi.Keep` objects, and is
+    safe to use from multiple threads.
+    """
+    CONNECTION_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    """Exceptions raised when a request can't be completed"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, host_limits=None): # pylint: disable=too-many-arguments
+        """
+        Args:
+            pool_connections (int): Number of hosts to keep connection pools for.
+            pool_maxsize (int): Maximum number of connections to keep open per host.
+            pool_block (bool): Whether to wait for a connection when a pool is exhausted, rather than opening a
+                connection that's discarded after use.
+            keep_alive (bool): Whether to reuse connections.
+            host_limits (Dict[str, int]): Connection limits for specific URL prefixes, e.g.
+                `{'https://www.googleapis.com/': 20}`. Requests wait for a connection when these are exhausted.
+        """
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        for prefix, limit in (host_limits or {}).items():
+            self._session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=limit, pool_block=True))
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
+
+    def request(self, **req_kwargs):
+        """Send a request.
+
+        Args:
+            **req_kwargs: Arbitrary keyword arguments to pass to Requests.
+
+        Returns:
+            requests.Response: The response.
+        """
+        return self._session.request(**req_kwargs)
+
+    def iterContent(self, response, chunk_size):
+        """Read the body of a response sent with `stream=True`, decompressing it if necessary.
+
+        Args:
+            response (requests.Response): The response.
+            chunk_size (int): Bytes to read at a time.
+
+        Returns:
+            Iterator[bytes]: The body, in chunks.
+        """
+        return response.iter_content(chunk_size)
+
+    def wasSent(self, error):
+        """Check whether a failed request might have reached the server.
+
+        Args:
+            error (Exception): One of :py:attr:`CONNECTION_ERRORS`.
+
+        Returns:
+            bool: False if the connection couldn't be established.
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return False
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return not isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+    def close(self):
+        """Close all connections."""
+        self._session.close()
+
+class HTTPXTransport(Transport):
+    """Transport backed by :py:mod:`httpx`, which supports HTTP/2. HTTP/2 multiplexes requests to a host over a
+    single connection, so many accounts need far fewer sockets. Requires `httpx[http2]`.
+    """
+    def __init__(self, max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0, http2=True): # pylint: disable=super-init-not-called
+        """
+        Args:
+            max_connections (int): Maximum number of connections.
+            max_keepalive_connections (int): Maximum number of idle connections to keep open.
+            keepalive_expiry (float): Seconds to keep idle connections open.
+            http2 (bool): Whether to use HTTP/2.
+        """
+        import httpx # pylint: disable=import-outside-toplevel
+        self._httpx = httpx
+        self.CONNECTION_ERRORS = (httpx.TransportError,) # pylint: disable=invalid-name
+        self._client = httpx.Client(http2=http2, limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ))
+
+    def request(self, **req_kwargs):
+        """Send a request.
+
+        Args:
+            **req_kwargs: Keyword arguments, as for Requests.
+
+        Returns:
+            httpx.Response: The response.
+        """
+        req_kwargs['follow_redirects'] = req_kwargs.pop('allow_redirects', True)
+        if isinstance(req_kwargs.get('data'), bytes):
+            req_kwargs['content'] = req_kwargs.pop('data')
+        if req_kwargs.pop('stream', False):
+            follow_redirects = req_kwargs.pop('follow_redirects')
+            request = self._client.build_request(**req_kwargs)
+            return self._client.send(request, stream=True, follow_redirects=follow_redirects)
+        return self._client.request(**req_kwargs)
+
+    def iterContent(self, response, chunk_size):
+        return response.iter_bytes(chunk_size)
+
+    def wasSent(self, error):
+        return not isinstance(error, (self._httpx.ConnectError, self._httpx.ConnectTimeout))
+
+    def close(self):
+        """Close all connections."""
+        self._client.close()
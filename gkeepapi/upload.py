@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+.. automodule:: gkeepapi.upload
+   :members:
+
+.. moduleauthor:: Kai <z@kwi.li>
+"""
+
+class UploadBatcher(object):
+    """Splits local changes into batches, so large imports are sent up over several requests rather than one
+    that times out. Each batch is applied before the next is sent::
+
+        def progress(sent, total):
+            print('%d/%d' % (sent, total))
+
+        keep = gkeepapi.Keep(batcher=gkeepapi.upload.UploadBatcher(max_nodes=200, progress=progress))
+    """
+    def __init__(self, max_nodes=1000, max_bytes=4194304, progress=None, delta=False):
+        """
+        Args:
+            max_nodes (Union[int, None]): Maximum number of nodes per request.
+            max_bytes (Union[int, None]): Approximate maximum size of the nodes in a request, in bytes. Sizes are
+                estimated from the number of fields and the length of the text, without encoding nodes. A batch is
+                closed once it reaches this size, so it may be exceeded by one node.
+            progress (callable): A function that's called with the number of nodes sent and the total after each
+                batch is applied.
+            delta (bool): Whether to send only the modified fields of nodes the server has already seen, rather
+                than whole nodes. See :py:meth:`gkeepapi.node.Node.save_delta`.
+        """
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.progress = progress
+        self.delta = delta
+
+    def start(self, nodes):
+        """Start uploading nodes.
+
+        Args:
+            nodes (List[gkeepapi.node.Node]): Dirty nodes, with parents ahead of their children.
+
+        Returns:
+            Upload: The upload.
+        """
+        return Upload(self, nodes)
+
+class Upload(object):
+    """The progress of an upload. Nodes are only serialized, and marked clean, when their batch is sent. Until
+    then, changes from the server mustn't be loaded into them, or local changes would be lost. See
+    :py:meth:`isUnsent`.
+    """
+    FIELD_BYTES = 48
+    """Approximate encoded size of a field of a raw node, other than the title and text"""
+
+    def __init__(self, batcher, nodes):
+        self._batcher = batcher
+        self._nodes = nodes
+        self._positions = dict((node.id, i) for i, node in enumerate(nodes))
+        self._pos = 0
+        self._pending = 0
+
+        self.sent = 0
+        """Number of nodes sent and applied."""
+
+        self.total = len(nodes)
+        """Total number of nodes to send."""
+
+    @property
+    def remaining(self):
+        """Whether there are nodes left to send.
+
+        Returns:
+            bool: Whether there are more batches.
+        """
+        return self._pos < len(self._nodes)
+
+    def isUnsent(self, node_id):
+        """Check whether a node is waiting to be sent in a later batch.
+
+        Args:
+            node_id (str): The node ID.
+
+        Returns:
+            bool: Whether the node hasn't been serialized yet.
+        """
+        return self._positions.get(node_id, -1) >= self._pos
+
+    def nextBatch(self):
+        """Serialize the next batch of nodes.
+
+        Returns:
+            List[dict]: Raw nodes.
+        """
+        max_nodes = self._batcher.max_nodes
+        max_bytes = self._batcher.max_bytes
+        delta = self._batcher.delta
+        batch = []
+        size = 0
+        while self._pos < len(self._nodes):
+            if max_nodes is not None and len(batch) >= max_nodes:
+                break
+            if max_bytes is not None and size >= max_bytes:
+                break
+            node = self._nodes[self._pos]
+            raw = node.save_delta() if delta else node.save()
+            if max_bytes is not None:
+                size += self._estimateSize(raw)
+            batch.append(raw)
+            self._pos += 1
+
+        self._pending = len(batch)
+        return batch
+
+    @classmethod
+    def _estimateSize(cls, raw):
+        """Estimate the encoded size of a raw node. Encoding each node to measure it would double the cost of
+        serializing a request.
+
+        Args:
+            raw (dict): Raw node.
+
+        Returns:
+            int: Approximate size in bytes.
+        """
+        return cls.FIELD_BYTES * len(raw) + len(raw.get('title', '')) + len(raw.get('text', ''))
+
+    def acknowledge(self):
+        """Record that the last batch was applied."""
+        if not self._pending:
+            return
+        self.sent += self._pending
+        self._pending = 0
+        if self._batcher.progress is not None:
+            self._batcher.progress(self.sent, self.total)
+
+    def abort(self):
+        """Mark the last batch dirty again, if it wasn't applied, so it's resent by the next sync."""
+        for node in self._nodes[self._pos - self._pending:self._pos]:
+            node._mark_unsent() # pylint: disable=protected-access
+        self._pending = 0
@@ -68,4 +68,11 @@ setup(
         'future >= 0.16.0',
         "enum34 >= 1.1.6; python_version < '3.0'",
     ],
+
+    # Optional dependencies, installed with e.g. `pip install gkeepapi[aio]`.
+    extras_require={
+        'aio': ["aiohttp >= 3.0; python_version >= '3.5'"],
+        'http2': ["httpx[http2] >= 0.18; python_version >= '3.6'"],
+        'orjson': ["orjson >= 3.0; python_version >= '3.6'"],
+    },
 )
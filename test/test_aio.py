@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import asyncio
+
+import gkeepapi
+from gkeepapi import node, exception, retry, transport
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from gkeepapi import aio
+except ImportError:
+    aio = None
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class FakeServer(object):
+    """A minimal Keep server. Each auth token is a separate account."""
+    def __init__(self):
+        self.accounts = {}
+        self.requests = []
+        self.app = web.Application()
+        self.app.router.add_post('/notes/v1/changes', self.changes)
+        self.app.router.add_post('/reminders/list', self.reminders)
+        self.app.router.add_post('/reminders/history', self.history)
+        self.app.router.add_get('/media/{note}/{blob}', self.media)
+
+    def addAccount(self, token, pages):
+        self.accounts[token] = {'pages': list(pages), 'version': 0}
+
+    def auth(self, request):
+        token = request.headers.get('Authorization', '')[len('OAuth '):]
+        return self.accounts.get(token)
+
+    async def changes(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        account = self.auth(request)
+        if account is None:
+            return web.json_response({'error': {'code': 401}})
+
+        # Yield to other requests, as a real server would.
+        await asyncio.sleep(0.01)
+        account['version'] += 1
+        nodes = account['pages'].pop(0) if account['pages'] else []
+        for raw in body['nodes']:
+            raw = dict(raw)
+            raw['serverId'] = 'server.' + raw['id']
+            nodes.append(raw)
+        return web.json_response({
+            'toVersion': str(account['version']),
+            'truncated': bool(account['pages']),
+            'nodes': nodes,
+        })
+
+    async def reminders(self, request):
+        if self.auth(request) is None:
+            return web.json_response({'error': {'code': 401}})
+        return web.json_response({'storageVersion': '1'})
+
+    async def history(self, request):
+        return web.json_response({'highestStorageVersion': '1'})
+
+    async def media(self, request):
+        raise web.HTTPFound('https://example.com/' + request.match_info['blob'])
+
+def make_note(title):
+    note = node.Note()
+    note.title = title
+    note.text = 'Text'
+    return [note.save()] + [child.save() for child in note.children]
+
+@unittest.skipIf(aio is None, 'aiohttp is not installed')
+class AsyncKeepTests(unittest.TestCase):
+    def run_async(self, func):
+        async def run():
+            self.server = FakeServer()
+            self.test_server = TestServer(self.server.app)
+            await self.test_server.start_server()
+            try:
+                await func()
+            finally:
+                await self.test_server.close()
+        asyncio.run(run())
+
+    def make_keep(self, token, **kwargs):
+        keep = aio.AsyncKeep(**kwargs)
+        base_url = str(self.test_server.make_url('/'))
+        keep._keep_api._base_url = base_url + 'notes/v1/'
+        keep._reminders_api._base_url = base_url + 'reminders/'
+        keep._media_api._base_url = base_url + 'media/'
+
+        auth = aio.AsyncAPIAuth(keep.OAUTH_SCOPES)
+        auth._auth_token = token
+        for api in (keep._keep_api, keep._reminders_api, keep._media_api):
+            api.setAuth(auth)
+        return keep
+
+    def test_sync(self):
+        async def test():
+            self.server.addAccount('a', [make_note('A1'), make_note('A2')])
+            keep = self.make_keep('a')
+            await keep.sync()
+            self.assertEqual(['A1', 'A2'], sorted(n.title for n in keep.all()))
+            self.assertEqual('2', keep._keep_version)
+            self.assertEqual('1', keep._reminder_version)
+
+            note = keep.createNote('New', 'Text')
+            await keep.sync()
+            self.assertEqual('server.' + note.id, note.server_id)
+            self.assertFalse(note.dirty)
+            await keep.close()
+        self.run_async(test)
+
+    def test_concurrent(self):
+        async def test():
+            tokens = ['user%d' % i for i in range(10)]
+            for token in tokens:
+                self.server.addAccount(token, [make_note(token)])
+
+            keeps = [self.make_keep(token, session=None) for token in tokens]
+            await asyncio.gather(*(keep.sync() for keep in keeps))
+            for token, keep in zip(tokens, keeps):
+                self.assertEqual([token], [n.title for n in keep.all()])
+            await asyncio.gather(*(keep.close() for keep in keeps))
+        self.run_async(test)
+
+    def test_concurrent_sync(self):
+        async def test():
+            self.server.addAccount('a', [make_note('A1'), make_note('A2')])
+            keep = self.make_keep('a')
+            await keep.sync(concurrent=True)
+            self.assertEqual(['A1', 'A2'], sorted(n.title for n in keep.all()))
+            self.assertEqual('1', keep._reminder_version)
+
+            async def history(version):
+                raise exception.APIException(500, 'Error')
+            keep._reminders_api.history = history
+            with self.assertRaises(exception.APIException):
+                await keep.sync(concurrent=True)
+            await keep.close()
+        self.run_async(test)
+
+    def test_refresh(self):
+        async def test():
+            self.server.addAccount('good', [])
+            keep = self.make_keep('expired')
+            auth = keep._keep_api.getAuth()
+            refreshed = []
+
+            def refresh():
+                refreshed.append(True)
+                auth._auth_token = 'good'
+                return auth._auth_token
+            auth._refresh = refresh
+
+            await keep.sync()
+            self.assertEqual([True], refreshed)
+            self.assertEqual('1', keep._keep_version)
+
+            keep._keep_api.getAuth()._auth_token = 'bad'
+            auth._refresh = lambda: 'bad'
+            with self.assertRaises(exception.APIException):
+                await keep.sync()
+            await keep.close()
+        self.run_async(test)
+
+    def test_retry_policy(self):
+        async def test():
+            policy = retry.RetryPolicy(budgets={retry.ErrorKind.Auth: 0}, sleep=asyncio.sleep)
+            keep = self.make_keep('expired', retry_policy=policy)
+            for api in (keep._keep_api, keep._reminders_api, keep._media_api):
+                self.assertIs(policy, api._retry_policy)
+
+            auth = keep._keep_api.getAuth()
+            refreshed = []
+            auth._refresh = lambda: refreshed.append(True)
+            with self.assertRaises(exception.APIException):
+                await keep.sync()
+            self.assertEqual([], refreshed)
+            await keep.close()
+        self.run_async(test)
+
+    def test_transport(self):
+        with self.assertRaises(ValueError):
+            aio.AsyncKeep(transport=transport.Transport())
+
+        # No unused requests session is created.
+        created = []
+        init = transport.Transport.__init__
+        def create(self, *args, **kwargs):
+            created.append(self)
+            init(self, *args, **kwargs)
+        transport.Transport.__init__ = create
+        try:
+            keep = aio.AsyncKeep()
+        finally:
+            transport.Transport.__init__ = init
+        self.assertEqual([], created)
+        self.assertIsInstance(keep._keep_api, aio.AsyncKeepAPI)
+
+    def test_refresh_ahead(self):
+        async def test():
+            self.server.addAccount('old', [])
+            self.server.addAccount('new', [])
+            keep = self.make_keep('old')
+            auth = keep._keep_api.getAuth()
+            auth._expiry = auth._clock() + 60
+
+            def refresh():
+                auth._auth_token = 'new'
+                auth._expiry = auth._clock() + 3600
+                return auth._auth_token
+            auth._refresh = refresh
+
+            # The token is close to expiry, so it's refreshed in the background while it's still used.
+            await keep.sync()
+            prefetch = auth._prefetch
+            if prefetch is not None:
+                self.assertIsNone(prefetch.wait())
+            self.assertEqual('new', auth.getAuthToken())
+            self.assertIsNone(auth._prefetch)
+            self.assertEqual('1', keep._keep_version)
+            await keep.close()
+        self.run_async(test)
+
+    def test_media(self):
+        async def test():
+            self.server.addAccount('a', [])
+            keep = self.make_keep('a')
+            note = node.Note()
+            note.server_id = 'note'
+            blob = node.Blob(parent_id=note.id)
+            blob.server_id = 'blob'
+            note.append(blob)
+            self.assertEqual('https://example.com/blob', await keep.getMediaLink(blob))
+            await keep.close()
+        self.run_async(test)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import gkeepapi
+from gkeepapi import node, tokencache
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class Clock(object):
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+class CountingLock(object):
+    """A lock that signals each time a thread tries to take it."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.arrived = threading.Semaphore(0)
+
+    def __enter__(self):
+        self.arrived.release()
+        self.lock.acquire()
+
+    def __exit__(self, *args):
+        self.lock.release()
+
+class APIAuthTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lifetime = 3600
+        self.delay = 0
+        self.perform_oauth = gkeepapi.gpsoauth.perform_oauth
+        gkeepapi.gpsoauth.perform_oauth = self.fake_oauth
+        self.clock = Clock()
+
+    def tearDown(self):
+        gkeepapi.gpsoauth.perform_oauth = self.perform_oauth
+
+    def fake_oauth(self, email, master_token, android_id, **kwargs):
+        self.calls.append(email)
+        if self.delay:
+            time.sleep(self.delay)
+        return {
+            'Auth': 'token%d' % len(self.calls),
+            'Expiry': str(int(time.time() + self.lifetime)),
+        }
+
+    def make_auth(self, cache=None):
+        auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES, cache=cache, clock=self.clock)
+        auth.load('user@example.com', 'master', 'android')
+        return auth
+
+    def test_expiry(self):
+        auth = self.make_auth()
+        self.assertEqual('token1', auth.getAuthToken())
+        self.assertTrue(auth.getExpiry() > time.time())
+
+        # Expired tokens are refreshed before they're returned.
+        self.clock.now = auth.getExpiry() + 1
+        self.assertEqual('token2', auth.getAuthToken())
+
+    def test_refresh_ahead(self):
+        auth = self.make_auth()
+        self.clock.now = auth.getExpiry() - 60
+        self.lifetime = 7200
+        self.delay = 0.05
+        self.assertEqual('token1', auth.getAuthToken())
+        auth._prefetch.wait()
+        self.assertEqual('token2', auth.getAuthToken())
+        self.assertEqual(2, len(self.calls))
+
+    def test_single_flight(self):
+        auth = self.make_auth()
+        lock = CountingLock()
+        auth._lock = lock
+        started = threading.Event()
+        release = threading.Event()
+        refresh = auth._refresh
+
+        def blocking_refresh():
+            started.set()
+            release.wait()
+            return refresh()
+        auth._refresh = blocking_refresh
+
+        threads = [threading.Thread(target=auth.refresh) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        # Hold the first refresh until every thread is waiting for it.
+        for _ in threads:
+            lock.arrived.acquire()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, len(self.calls))
+        self.assertEqual('token2', auth.getAuthToken())
+
+    def test_no_expiry(self):
+        gkeepapi.gpsoauth.perform_oauth = lambda *args, **kwargs: {'Auth': 'token'}
+        auth = self.make_auth()
+        self.assertIsNone(auth.getExpiry())
+        self.assertEqual('token', auth.getAuthToken())
+
+    def test_cache(self):
+        cache = tokencache.TokenCache()
+        self.make_auth(cache)
+        auth = self.make_auth(cache)
+        self.assertEqual('token1', auth.getAuthToken())
+        self.assertEqual(1, len(self.calls))
+
+        # Tokens close to expiry aren't reused.
+        self.lifetime = 60
+        cache = tokencache.TokenCache()
+        self.make_auth(cache)
+        self.make_auth(cache)
+        self.assertEqual(3, len(self.calls))
+
+    def test_file_cache(self):
+        path = tempfile.mkdtemp()
+        try:
+            cache_path = os.path.join(path, 'tokens.json')
+            self.make_auth(tokencache.FileTokenCache(cache_path))
+            self.assertEqual(0o600, os.stat(cache_path).st_mode & 0o777)
+
+            auth = self.make_auth(tokencache.FileTokenCache(cache_path))
+            self.assertEqual('token1', auth.getAuthToken())
+            self.assertEqual(1, len(self.calls))
+        finally:
+            shutil.rmtree(path)
+
+if __name__ == '__main__':
+    unittest.main()
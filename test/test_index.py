@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+
+import gkeepapi
+from gkeepapi import node, index
+
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class NodeRegistryTests(unittest.TestCase):
+    def test_add_remove(self):
+        r = index.NodeRegistry()
+        n = node.Note()
+        n.server_id = 'sid'
+        r.add(n)
+
+        self.assertIn(n.id, r)
+        self.assertEqual(n, r[n.id])
+        self.assertEqual(n, r.getByServerId('sid'))
+        self.assertEqual({n.id: n}, r.getChildren(node.Root.ID))
+        self.assertEqual({n.id: n}, r.getByType(node.NodeType.Note))
+
+        self.assertEqual(n, r.remove(n.id))
+        self.assertNotIn(n.id, r)
+        self.assertEqual(None, r.getByServerId('sid'))
+        self.assertEqual({}, r.getChildren(node.Root.ID))
+        self.assertEqual({}, r.getByType(node.NodeType.Note))
+
+    def test_reindex(self):
+        r = index.NodeRegistry()
+        n = node.ListItem(parent_id='a')
+        r.add(n)
+
+        n.server_id = 'sid'
+        n.parent_id = 'b'
+        r.reindex(n)
+        self.assertEqual(n, r.getByServerId('sid'))
+        self.assertEqual({}, r.getChildren('a'))
+        self.assertEqual({n.id: n}, r.getChildren('b'))
+
+    def test_flags(self):
+        keep = gkeepapi.Keep()
+        a = keep.createNote('A')
+        b = keep.createNote('B')
+        self.assertEqual({}, keep._nodes.getFlagged('pinned'))
+
+        a.pinned = True
+        b.archived = True
+        b.trashed = True
+        self.assertEqual({a.id: a}, keep._nodes.getFlagged('pinned'))
+        self.assertEqual({b.id: b}, keep._nodes.getFlagged('archived'))
+        self.assertEqual({b.id: b}, keep._nodes.getFlagged('trashed'))
+
+        self.assertEqual([a], list(keep.find(pinned=True)))
+        self.assertEqual([b], list(keep.find(archived=True, trashed=True)))
+        self.assertEqual([a], list(keep.find()))
+
+        a.pinned = False
+        self.assertEqual({}, keep._nodes.getFlagged('pinned'))
+        self.assertEqual([], list(keep.find(pinned=True)))
+
+    def test_get(self):
+        keep = gkeepapi.Keep()
+        n = keep.createNote('A', 'B')
+        self.assertEqual(n, keep.get(n.id))
+
+        keep._parseNodes([{'id': n.id, 'serverId': 'sid', 'parentId': node.Root.ID, 'type': 'NOTE', 'kind': 'notes#node',
+            'timestamps': n.timestamps.save(False), 'nodeSettings': n.settings.save(False),
+            'annotationsGroup': n.annotations.save(False)}])
+        self.assertEqual(n, keep.get('sid'))
+        self.assertEqual([n], keep.all())
+
+class TextIndexTests(unittest.TestCase):
+    def test_search(self):
+        i = index.TextIndex()
+        a = node.Note()
+        a.title = 'Shopping list'
+        a.text = 'Buy milk, eggs & bread'
+        b = node.Note()
+        b.title = 'Ideas'
+        b.text = 'Milkshake recipe'
+        i.update(a)
+        i.update(b)
+
+        self.assertEqual({a.id}, set(i.term('MILK')))
+        self.assertEqual({a.id, b.id}, set(i.prefix('mil')))
+        self.assertEqual({a.id, b.id}, set(i.search('ilk')))
+        self.assertEqual({a.id}, set(i.search('milk, eggs')))
+        self.assertEqual({a.id}, set(i.search('ping li')))
+        self.assertEqual({}, i.search('milk eggs bacon'))
+        self.assertEqual(None, i.search(' & '))
+
+        a.text = 'Buy bread'
+        i.update(a)
+        self.assertEqual({b.id}, set(i.search('milk')))
+
+        i.remove(b.id)
+        self.assertEqual({}, i.search('milk'))
+
+    def test_substring(self):
+        class Terms(dict):
+            def __iter__(self):
+                raise AssertionError('Scanned terms')
+
+        i = index.TextIndex()
+        a = node.Note()
+        a.text = 'Buttermilk pancakes'
+        b = node.Note()
+        b.text = 'Milk'
+        i.update(a)
+        i.update(b)
+        # Sort the terms for prefix lookups up front.
+        i.prefix('')
+        i._keys = Terms(i._keys)
+
+        # Tokens of at least a trigram are found without scanning every term.
+        self.assertEqual({a.id, b.id}, set(i.search('milk')))
+        self.assertEqual({a.id}, set(i.search('cake')))
+        self.assertEqual({a.id, b.id}, set(i.search('ilk')))
+        self.assertEqual({a.id}, set(i.search('ttermilk pan')))
+        self.assertEqual({}, i.search('milks'))
+        with self.assertRaises(AssertionError):
+            i.search('mi')
+
+        i._keys = dict(i._keys)
+        i.remove(a.id)
+        i.remove(b.id)
+        self.assertEqual({}, i._grams)
+
+    def test_find(self):
+        keep = gkeepapi.Keep(text_index=True)
+        a = keep.createNote('Shopping', 'Milk')
+        b = keep.createList('Groceries', [('Eggs', False), ('milk', True)])
+        c = keep.createNote('Misc', 'Other')
+
+        self.assertEqual([a], list(keep.find(query='Milk')))
+        self.assertEqual([b], list(keep.find(query='milk')))
+        self.assertEqual([a, b], list(keep.find(query='ilk')))
+        self.assertEqual([c], list(keep.find(query='Misc')))
+        self.assertEqual([b], list(keep.find(query=' ')))
+
+        b.items[0].text = 'Milk'
+        self.assertEqual([a, b], list(keep.find(query='Milk')))
+
+class LabelIndexTests(unittest.TestCase):
+    def test_find(self):
+        keep = gkeepapi.Keep()
+        label = keep.createLabel('Label')
+        other = keep.createLabel('Other')
+        a = keep.createNote('A')
+        b = keep.createNote('B')
+        a.labels.add(label)
+        b.labels.add(other)
+
+        self.assertEqual({a.id: a}, keep._label_index.get(label.id))
+        self.assertEqual([a], list(keep.find(labels=[label])))
+        self.assertEqual([a, b], list(keep.find(labels=[label, other.id])))
+
+        a.labels.remove(label)
+        self.assertEqual([], list(keep.find(labels=[label])))
+
+    def test_delete_label(self):
+        keep = gkeepapi.Keep()
+        label = keep.createLabel('Label')
+        a = keep.createNote('A')
+        b = keep.createNote('B')
+        a.labels.add(label)
+        for n in keep._findDirtyNodes():
+            n.save()
+
+        keep.deleteLabel(label.id)
+        self.assertEqual([], a.labels.all())
+        self.assertEqual([a], keep._findDirtyNodes())
+
+    def test_restore(self):
+        keep = gkeepapi.Keep()
+        label = keep.createLabel('Label')
+        a = keep.createNote('A')
+        a.labels.add(label)
+
+        keep2 = gkeepapi.Keep()
+        keep2.restore(keep.dump())
+        a2 = keep2.get(a.id)
+        label2 = keep2.getLabel(label.id)
+        self.assertEqual([label2], a2.labels.all())
+        self.assertEqual([a2], list(keep2.find(labels=[label2])))
+
+        # Dropping the label from the account unbinds it.
+        keep2._parseUserInfo({'labels': []})
+        self.assertEqual([], a2.labels.all())
+
+if __name__ == '__main__':
+    unittest.main()
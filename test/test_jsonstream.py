@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import unittest
+import json
+
+from gkeepapi import jsonstream
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class ObjectStreamTests(unittest.TestCase):
+    def test_items(self):
+        doc = {
+            'kind': 'notes#downSync',
+            'userInfo': {'labels': [{'name': 'x' * 1000}] * 20},
+            'nodes': [{'id': str(i), 'value': i * 1.5, 'text': u'é☃' * (i % 5)} for i in range(500)],
+            'toVersion': '12345',
+            'truncated': True,
+            'count': 123456789,
+        }
+        data = json.dumps(doc).encode('utf-8')
+
+        # Chunk boundaries can fall anywhere, including inside numbers and multibyte characters.
+        for size in (1, 7, 4096, len(data)):
+            stream = jsonstream.ObjectStream(chunked(data, size), 'nodes')
+            self.assertEqual(['kind', 'userInfo'], sorted(stream.readFields()))
+            self.assertEqual(doc['nodes'], list(stream.items()))
+            fields = dict(doc)
+            del fields['nodes']
+            self.assertEqual(fields, stream.fields)
+
+    def test_missing(self):
+        for doc in ({}, {'nodes': []}, {'toVersion': '1'}, {'nodes': [1, [2]], 'a': None}):
+            stream = jsonstream.ObjectStream([json.dumps(doc).encode('utf-8')], 'nodes')
+            self.assertEqual(doc.get('nodes', []), list(stream.items()))
+            self.assertEqual(dict((k, v) for k, v in doc.items() if k != 'nodes'), stream.fields)
+
+    def test_invalid(self):
+        for data in (b'', b'[1]', b'{"nodes": [1, 2', b'{"a" 1}', b'{"nodes": [1 2]}', b'<html>'):
+            with self.assertRaises(ValueError):
+                list(jsonstream.ObjectStream([data], 'nodes').items())
+
+    def test_close(self):
+        closed = []
+        stream = jsonstream.ObjectStream([b'{}'], 'nodes', lambda: closed.append(True))
+        stream.close()
+        stream.close()
+        self.assertEqual([True], closed)
+
+if __name__ == '__main__':
+    unittest.main()
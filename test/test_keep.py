@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import threading
+import json
+import collections
+
+import gkeepapi
+from gkeepapi import node, exception, jsonstream, upload
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+def sync_clean(keep):
+    """Save all dirty nodes, as a sync would."""
+    for n in keep._findDirtyNodes():
+        n.save()
+
+class DirtyTrackingTests(unittest.TestCase):
+    def test_new_nodes(self):
+        keep = gkeepapi.Keep()
+        note = keep.createNote('Title', 'Text')
+        glist = keep.createList('List', [('Item', False)])
+
+        dirty = keep._findDirtyNodes()
+        self.assertEqual(set(keep._scanDirtyNodes()), set(n.id for n in dirty))
+        self.assertIn(note, dirty)
+        self.assertIn(glist, dirty)
+        for item in glist.items:
+            self.assertIn(item, dirty)
+
+        # Parents are ordered ahead of their children.
+        self.assertLess(dirty.index(glist), dirty.index(glist.items[0]))
+
+    def test_modified_child(self):
+        keep = gkeepapi.Keep()
+        glist = keep.createList('List', [('A', False), ('B', False)])
+        other = keep.createNote('Title', 'Text')
+        sync_clean(keep)
+        self.assertEqual([], keep._findDirtyNodes())
+
+        item = glist.items[0]
+        item.checked = True
+
+        dirty = keep._findDirtyNodes()
+        self.assertEqual([glist, item], dirty)
+        self.assertNotIn(other, dirty)
+        self.assertEqual(set(keep._scanDirtyNodes()), set(n.id for n in dirty))
+
+    def test_modified_element(self):
+        keep = gkeepapi.Keep()
+        note = keep.createNote('Title', 'Text')
+        label = keep.createLabel('Label')
+        sync_clean(keep)
+
+        note.labels.add(label)
+        self.assertEqual([note], keep._findDirtyNodes())
+        sync_clean(keep)
+
+        note.annotations.category = node.CategoryValue.Books
+        self.assertEqual([note], keep._findDirtyNodes())
+        sync_clean(keep)
+
+        note.annotations.category = node.CategoryValue.TV
+        self.assertEqual([note], keep._findDirtyNodes())
+
+    def test_restore(self):
+        keep = gkeepapi.Keep()
+        note = keep.createNote('Title', 'Text')
+        sync_clean(keep)
+        note.title = 'Title 2'
+
+        keep2 = gkeepapi.Keep()
+        keep2.restore(keep.dump())
+        self.assertEqual([note.id], [n.id for n in keep2._findDirtyNodes()])
+
+class LazyTests(unittest.TestCase):
+    def test_restore(self):
+        keep = gkeepapi.Keep()
+        note = keep.createNote('Title', 'Text')
+        keep.createList('List', [('Item', False)])
+        sync_clean(keep)
+        note.pinned = True
+        state = keep.dump()
+
+        keep2 = gkeepapi.Keep(lazy=True)
+        keep2.restore(keep.dump())
+        self.assertEqual([note.id], [n.id for n in keep2.find(pinned=True)])
+        self.assertEqual([note.id], [n.id for n in keep2._findDirtyNodes()])
+        self.assertTrue(all(isinstance(n._timestamps, node._Deferred) for n in keep2._nodes.values() if n.id != node.Root.ID))
+
+        self.assertEqual(state, keep2.dump())
+
+class ConcurrentSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.keep = gkeepapi.Keep()
+        self.reminders_started = threading.Event()
+        self.notes_started = threading.Event()
+
+        def reminders_list():
+            self.reminders_started.set()
+            # Only returns once notes are being synced as well.
+            self.assertTrue(self.notes_started.wait(5))
+            return {'storageVersion': '1'}
+
+        def changes(target_version=None, nodes=None, labels=None):
+            self.notes_started.set()
+            self.assertTrue(self.reminders_started.wait(5))
+            return {'toVersion': '1', 'truncated': False}
+
+        self.keep._reminders_api.list = reminders_list
+        self.keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+        self.keep._keep_api.changes = changes
+
+    def test_sync(self):
+        self.keep.sync(concurrent=True)
+        self.assertEqual('1', self.keep._keep_version)
+        self.assertEqual('1', self.keep._reminder_version)
+
+    def test_error(self):
+        def history(version):
+            raise exception.APIException(500, 'Error')
+        self.keep._reminders_api.history = history
+
+        with self.assertRaises(exception.APIException):
+            self.keep.sync(concurrent=True)
+        # Notes are still synced.
+        self.assertEqual('1', self.keep._keep_version)
+
+class PipelinedSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.keep = gkeepapi.Keep()
+        self.keep._reminders_api.list = lambda: {'storageVersion': '1'}
+        self.keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+
+        self.pages = []
+        for i in range(3):
+            note = node.Note()
+            note.title = str(i)
+            self.pages.append([note.save()] + [child.save() for child in note.children])
+        self.requested = dict((str(i), threading.Event()) for i in range(len(self.pages)))
+        self.requests = []
+
+        def changes(target_version=None, nodes=None, labels=None):
+            self.requests.append((target_version, nodes))
+            version = 0 if target_version is None else int(target_version)
+            self.requested[str(version)].set()
+            return {
+                'toVersion': str(version + 1),
+                'truncated': version + 1 < len(self.pages),
+                'nodes': self.pages[version],
+            }
+        self.keep._keep_api.changes = changes
+
+    def test_sync(self):
+        apply_changes = self.keep._applyChanges
+        applied = []
+        def wait_and_apply(changes):
+            # The next page is requested before this one is parsed.
+            if changes['truncated']:
+                self.assertTrue(self.requested[changes['toVersion']].wait(5))
+            applied.append(changes['toVersion'])
+            return apply_changes(changes)
+        self.keep._applyChanges = wait_and_apply
+
+        note = self.keep.createNote('Local', 'Text')
+        self.keep.sync(concurrent=True)
+        self.assertEqual(['1', '2', '3'], applied)
+        self.assertEqual('3', self.keep._keep_version)
+        self.assertEqual(['0', '1', '2', 'Local'], sorted(n.title for n in self.keep.all()))
+
+        # Local changes are only sent up with the first request.
+        self.assertIn(note.id, [raw['id'] for raw in self.requests[0][1]])
+        self.assertEqual([None, None], [nodes for _, nodes in self.requests[1:]])
+
+    def test_error(self):
+        self.pages[1] = None
+        with self.assertRaises(TypeError):
+            self.keep.sync(concurrent=True)
+        self.assertEqual('1', self.keep._keep_version)
+
+    def test_resync(self):
+        changes = self.keep._keep_api.changes
+        self.keep._keep_api.changes = lambda **kwargs: dict(changes(**kwargs), forceFullResync=True)
+        with self.assertRaises(exception.ResyncRequiredException):
+            self.keep.sync(concurrent=True)
+        # The next page isn't fetched, and this one isn't applied.
+        self.assertEqual(1, len(self.requests))
+        self.assertEqual([], self.keep.all())
+
+class UploadBatchTests(unittest.TestCase):
+    def setUp(self):
+        self.progress = []
+        self.batcher = upload.UploadBatcher(max_nodes=10, progress=lambda sent, total: self.progress.append((sent, total)))
+        self.keep = gkeepapi.Keep(batcher=self.batcher)
+        self.keep._reminders_api.list = lambda: {'storageVersion': '1'}
+        self.keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+        self.requests = []
+        self.server = {}
+
+        def changes(target_version=None, nodes=None, labels=None):
+            self.requests.append(nodes)
+            version = 0 if target_version is None else int(target_version)
+            echoed = []
+            for raw in nodes or []:
+                stored = self.server.get(raw['id'], {})
+                raw = dict(stored, **raw)
+                raw['timestamps'] = dict(stored.get('timestamps', {}), **raw['timestamps'])
+                self.server[raw['id']] = raw
+                raw['serverId'] = 'server.' + raw['id']
+                raw['baseVersion'] = str(version + 1)
+                echoed.append(raw)
+            return {'toVersion': str(version + 1), 'truncated': False, 'nodes': echoed}
+        self.keep._keep_api.changes = changes
+
+    def check_order(self):
+        # Every node's parent was sent in the same or an earlier request.
+        sent = set([node.Root.ID])
+        for nodes in self.requests:
+            sent.update(raw['id'] for raw in nodes or [])
+            for raw in nodes or []:
+                self.assertIn(raw['parentId'], sent)
+
+    def test_batches(self):
+        for i in range(12):
+            self.keep.createList(str(i), [('Item', False)])
+        self.keep.sync()
+
+        self.assertEqual([10, 10, 4], [len(nodes) for nodes in self.requests])
+        self.assertEqual([(10, 24), (20, 24), (24, 24)], self.progress)
+        self.check_order()
+        self.assertFalse(self.keep.hasChanges())
+        self.assertEqual('3', self.keep._keep_version)
+        for note in self.keep.all():
+            self.assertEqual('server.' + note.id, note.server_id)
+
+    def test_bytes(self):
+        self.batcher.max_nodes = None
+        self.batcher.max_bytes = 1
+        for i in range(3):
+            self.keep.createNote(str(i))
+        self.keep.sync(concurrent=True)
+        self.assertEqual([1, 1, 1], [len(nodes) for nodes in self.requests])
+        self.check_order()
+
+    def test_estimate(self):
+        note = self.keep.createNote('Title', 'Text' * 100)
+        for n in (note, note.children[0]):
+            raw = n.save(False)
+            size = len(json.dumps(raw))
+            self.assertLess(abs(upload.Upload._estimateSize(raw) - size), size * 0.25)
+
+    def test_error(self):
+        for i in range(12):
+            self.keep.createNote(str(i))
+        changes = self.keep._keep_api.changes
+        def fail(**kwargs):
+            if self.requests:
+                raise exception.APIException(500, 'Error')
+            return changes(**kwargs)
+        self.keep._keep_api.changes = fail
+
+        with self.assertRaises(exception.APIException):
+            self.keep.sync()
+
+        # The batch that failed is sent again.
+        self.assertTrue(self.keep.hasChanges())
+        self.keep._keep_api.changes = changes
+        self.keep.sync()
+        self.assertEqual([10, 2], [len(nodes) for nodes in self.requests])
+        self.assertFalse(self.keep.hasChanges())
+
+    def test_unsent(self):
+        self.batcher.max_nodes = 2
+        self.keep.createNote('A', 'Text A')
+        b = self.keep.createNote('B', 'Text B')
+        item = b.children[0]
+        server_edit = dict(item.save(False), text='Server edit', serverId='server.' + item.id, baseVersion='1')
+
+        changes = self.keep._keep_api.changes
+        def edit(**kwargs):
+            response = changes(**kwargs)
+            if len(self.requests) == 1:
+                response['nodes'].append(server_edit)
+            return response
+        self.keep._keep_api.changes = edit
+
+        # Changes from the server don't overwrite local changes that haven't been sent yet.
+        self.keep.sync()
+        self.assertEqual('Text B', b.text)
+        self.assertIn('Text B', [raw.get('text') for raw in self.requests[1]])
+        self.assertFalse(self.keep.hasChanges())
+
+    def test_delta(self):
+        self.batcher.delta = True
+        note = self.keep.createNote('Title', 'Text')
+        self.keep.sync()
+        self.assertIn('text', self.requests[0][1])
+
+        note.title = 'Updated'
+        self.keep.sync()
+        raw, = self.requests[1]
+        self.assertEqual(note.id, raw['id'])
+        self.assertEqual('Updated', raw['title'])
+        self.assertNotIn('color', raw)
+        self.assertNotIn('nodeSettings', raw)
+
+class StreamingSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.keep = gkeepapi.Keep(stream=True)
+        self.keep._reminders_api.list = lambda: {'storageVersion': '1'}
+        self.keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+
+        label = node.Label()
+        label.name = 'Label'
+        self.pages = []
+        for i in range(3):
+            note = node.Note()
+            note.title = str(i)
+            note.labels.add(label)
+            self.pages.append([note.save()] + [child.save() for child in note.children])
+        self.label = label.save()
+        self.trailer = []
+        self.version_first = False
+        self.closed = []
+
+        def changes(target_version=None, nodes=None, labels=None, stream=False):
+            self.assertTrue(stream)
+            version = 0 if target_version is None else int(target_version)
+            # Fields after the nodes are only seen once they've been parsed.
+            fields = [
+                ('nodes', self.pages[version]),
+                ('userInfo', {'labels': [self.label]}),
+                ('toVersion', str(version + 1)),
+                ('truncated', version + 1 < len(self.pages)),
+            ]
+            if self.version_first:
+                fields = fields[2:] + fields[:2]
+            data = json.dumps(collections.OrderedDict(fields + self.trailer)).encode('utf-8')
+            chunks = [data[i:i + 100] for i in range(0, len(data), 100)]
+            return jsonstream.ObjectStream(chunks, 'nodes', lambda: self.closed.append(version))
+        self.keep._keep_api.changes = changes
+
+    def test_sync(self):
+        for concurrent in (False, True):
+            self.keep.sync(resync=True, concurrent=concurrent)
+            self.assertEqual('3', self.keep._keep_version)
+            self.assertEqual(['0', '1', '2'], sorted(n.title for n in self.keep.all()))
+            label = self.keep.findLabel('Label')
+            for note in self.keep.all():
+                self.assertIs(label, note.labels.get(label.id))
+            self.assertEqual([0, 1, 2], self.closed)
+            self.closed = []
+
+    def test_resync(self):
+        # The flag follows the nodes, which mustn't be applied.
+        self.trailer = [('forceFullResync', True)]
+        with self.assertRaises(exception.ResyncRequiredException):
+            self.keep.sync()
+        self.assertEqual([0], self.closed)
+        self.assertIsNone(self.keep._keep_version)
+        self.assertEqual([], self.keep.all())
+        self.assertIsNone(self.keep.findLabel('Label'))
+
+    def test_resync_prefetched(self):
+        # The next page is prefetched before the flag after the nodes is seen, so it's released unread.
+        released = threading.Event()
+        changes = self.keep._keep_api.changes
+        def prefetch(target_version=None, **kwargs):
+            stream = changes(target_version=target_version, **kwargs)
+            if target_version is not None:
+                close = stream._close
+                stream._close = lambda: (close(), released.set())
+            return stream
+        self.keep._keep_api.changes = prefetch
+
+        self.version_first = True
+        self.trailer = [('forceFullResync', True)]
+        with self.assertRaises(exception.ResyncRequiredException):
+            self.keep.sync(concurrent=True)
+        self.assertTrue(released.wait(5))
+        self.assertEqual([0, 1], sorted(self.closed))
+        self.assertEqual([], self.keep.all())
+
+    def test_resync_update(self):
+        self.keep.sync()
+        note = self.keep.get(self.pages[0][0]['id'])
+        self.assertEqual('0', note.title)
+
+        # Changes to existing notes are held until the page is checked.
+        self.pages[3:] = [[dict(self.pages[0][0], title='Updated'), node.Note().save()]]
+        self.trailer = [('forceFullResync', True)]
+        with self.assertRaises(exception.ResyncRequiredException):
+            self.keep.sync()
+        self.assertEqual('0', note.title)
+        self.assertEqual(3, len(self.keep.all()))
+
+        self.trailer = []
+        self.keep.sync()
+        self.assertEqual('Updated', note.title)
+        self.assertEqual(4, len(self.keep.all()))
+
+    def test_upgrade(self):
+        self.trailer = [('upgradeRecommended', True)]
+        with self.assertRaises(exception.UpgradeRecommendedException):
+            self.keep.sync(concurrent=True)
+        self.assertEqual([], self.keep.all())
+
+if __name__ == '__main__':
+    unittest.main()
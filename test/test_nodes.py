@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 import unittest
 import logging
+import datetime
+import functools
+import random
+
+import six
 
 from gkeepapi import node
 
@@ -154,6 +159,17 @@ class NodeAnnotationsTests(unittest.TestCase):
         self.assertTrue(n.dirty)
         self.assertEqual([sub], n.links)
 
+    def test_empty(self):
+        a = node.NodeAnnotations()
+        b = node.NodeAnnotations()
+        b.load(a.save())
+        a.category = node.CategoryValue.Books
+        b.append(node.WebLink())
+
+        self.assertEqual(1, len(a))
+        self.assertEqual(1, len(b))
+        self.assertEqual(0, len(node.NodeAnnotations()))
+
 class NodeTimestampsTests(unittest.TestCase):
     def test_save_load(self):
         a, b = generate_save_load(node.NodeTimestamps)
@@ -189,6 +205,26 @@ class NodeTimestampsTests(unittest.TestCase):
         self.assertTrue(n.dirty)
         self.assertEqual(TZ, n.edited)
 
+    def test_codec(self):
+        strs = [
+            '1970-01-01T00:00:00.000Z',
+            '1970-01-01T00:00:00.000000Z',
+            '2018-03-04T05:06:07.8Z',
+            '2018-03-04T05:06:07.089Z',
+            '2018-12-31T23:59:59.999999Z',
+        ]
+        for tzs in strs:
+            dt = datetime.datetime.strptime(tzs, node.NodeTimestamps.TZ_FMT)
+            self.assertEqual(dt, node.NodeTimestamps.str_to_dt(tzs))
+            self.assertEqual(dt, node._parse_fixed_datetime(tzs[:-1]))
+            self.assertEqual(dt.strftime(node.NodeTimestamps.TZ_FMT), node.NodeTimestamps.dt_to_str(dt))
+
+        for tzs in ['2018-13-01T00:00:00.000Z', '2018-01-01T00:00:00.0000000Z', '2018-01-01T00:00:00Z', '2018-01-01T00:00: 0.000Z']:
+            self.assertRaises(ValueError, node.NodeTimestamps.str_to_dt, tzs)
+
+        self.assertEqual(datetime.datetime(1970, 1, 1), node.NodeTimestamps.int_to_dt(0))
+        self.assertEqual('1970-01-01T00:00:00.000000Z', node.NodeTimestamps.int_to_str(0))
+
 class NodeSettingsTests(unittest.TestCase):
     def test_save_load(self):
         a, b = generate_save_load(node.NodeSettings)
@@ -309,6 +345,10 @@ class NodeTests(unittest.TestCase):
         sub.delete()
         self.assertTrue(n.dirty)
 
+    def test_slots(self):
+        for cls in (node.Note, node.List, node.ListItem, node.Blob, node.Label):
+            self.assertFalse(hasattr(cls(), '__dict__'), cls)
+
     def test_delete(self):
         n = node.Node(type_=node.NodeType.Note)
         clean_node(n)
@@ -318,6 +358,132 @@ class NodeTests(unittest.TestCase):
         self.assertTrue(n.dirty)
         # FIXME: Node is not done
 
+class LazyNodeTests(unittest.TestCase):
+    def test_save_load(self):
+        a = node.Note()
+        a.title = 'Title'
+        a.trashed = True
+        a.annotations.category = node.CategoryValue.Books
+        a.collaborators.add('user@google.com')
+        raw = a.save(False)
+
+        b = node.from_json(raw, lazy=True)
+        for name in ('timestamps', 'settings', 'annotations', 'collaborators'):
+            self.assertIsInstance(getattr(b, '_' + name), node._Deferred)
+
+        # State checks don't decode the node.
+        self.assertEqual('Title', b.title)
+        self.assertTrue(b.trashed)
+        self.assertFalse(b.deleted)
+        self.assertTrue(b.dirty)
+        self.assertIsInstance(b._timestamps, node._Deferred)
+
+        self.assertEqual(node.CategoryValue.Books, b.annotations.category)
+        self.assertIsInstance(b._annotations, node.NodeAnnotations)
+        self.assertEqual(a.save(False), b.save(False))
+        self.assertIsInstance(b._timestamps, node.NodeTimestamps)
+
+    def test_dirty(self):
+        a = node.Note()
+        clean_node(a)
+        b = node.from_json(a.save(False), lazy=True)
+        self.assertFalse(b.dirty)
+
+        b.timestamps.created = node.NodeTimestamps.int_to_dt(0)
+        self.assertTrue(b.dirty)
+
+    def test_parse_error(self):
+        raw = node.Note().save(False)
+        raw['nodeSettings']['newListItemPlacement'] = 'INVALID'
+        n = node.from_json(raw, lazy=True)
+        with self.assertRaises(node.exception.ParseException):
+            n.settings
+
+    def test_blob(self):
+        a = node.Blob(parent_id='parent')
+        a.blob = node.NodeImage()
+        a.blob.load(dict(a.blob.save(False), width=640, height=480))
+        raw = a.save(False)
+
+        b = node.from_json(raw, lazy=True)
+        self.assertIsInstance(b._blob, node._Deferred)
+        self.assertIsInstance(b.blob, node.NodeImage)
+        self.assertEqual(640, b.blob._width)
+        self.assertEqual(raw, b.save(False))
+
+class DeltaTests(unittest.TestCase):
+    def synced(self, cls):
+        raw = cls().save()
+        raw['serverId'] = 'server'
+        raw['baseVersion'] = '1'
+        return node.from_json(raw)
+
+    def test_save_delta(self):
+        n = self.synced(node.Note)
+        base = n.save()
+        n.title = 'Title'
+        n.labels.add(node.Label())
+        n.annotations.category = node.CategoryValue.Books
+
+        raw = n.save_delta()
+        self.assertFalse(n.dirty)
+        self.assertEqual(
+            ['annotationsGroup', 'baseVersion', 'id', 'kind', 'labelIds', 'parentId', 'serverId', 'timestamps',
+             'title', 'type'],
+            sorted(raw)
+        )
+
+        # Applying the delta to the server's copy reproduces the full node.
+        base['timestamps'].update(raw.pop('timestamps'))
+        base.update(raw)
+        self.assertEqual(n.save(), base)
+
+        # Nothing has changed since.
+        raw = n.save_delta()
+        self.assertEqual(['baseVersion', 'id', 'kind', 'parentId', 'serverId', 'timestamps', 'type'], sorted(raw))
+
+    def test_timestamps(self):
+        n = self.synced(node.Note)
+        n.title = 'Title'
+        self.assertEqual(['kind', 'updated', 'userEdited'], sorted(n.save_delta()['timestamps']))
+
+        n.delete()
+        self.assertEqual(['deleted', 'kind', 'updated'], sorted(n.save_delta()['timestamps']))
+
+        # Timestamps restored from a snapshot are sent in full.
+        n.trashed = True
+        n = node.from_json(n.save(False))
+        self.assertIn('created', n.save_delta()['timestamps'])
+
+    def test_listitem(self):
+        n = self.synced(node.ListItem)
+        n.checked = True
+        raw = n.save_delta()
+        self.assertTrue(raw['checked'])
+        self.assertIn('superListItemId', raw)
+        self.assertNotIn('text', raw)
+        self.assertNotIn('nodeSettings', raw)
+
+    def test_full(self):
+        # New nodes are sent in full.
+        n = node.Note()
+        n.title = 'Title'
+        self.assertEqual(n.save(False), n.save_delta(False))
+
+        # As are nodes that failed to upload.
+        n = self.synced(node.Note)
+        n.title = 'Title'
+        n.save_delta()
+        n._mark_unsent()
+        self.assertTrue(n.dirty)
+        self.assertEqual(n.save(False), n.save_delta(False))
+
+        # And dirty nodes restored from a snapshot.
+        n = self.synced(node.Note)
+        n.pinned = True
+        n = node.from_json(n.save(False))
+        self.assertIn('color', n.save_delta(False))
+
 class TestElement(node.Element, node.TimestampsMixin):
     def __init__(self):
         super(TestElement, self).__init__()
@@ -434,6 +600,154 @@ class ListTests(unittest.TestCase):
         self.assertTrue(n.dirty)
         self.assertEqual(u'☐ %s' % TEXT, n.text)
 
+    def test_extend(self):
+        root = node.Root()
+        n = node.List()
+        root.append(n, False)
+        first = n.add('First')
+        clean_node(n)
+        changed = []
+        root.watch(changed.append)
+
+        items = n.extend([('A', False), ('B', True), ('C', False)])
+        self.assertEqual([first] + items, n.items)
+        self.assertEqual(['A', 'B', 'C'], [item.text for item in items])
+        self.assertEqual([items[1]], n.checked)
+        self.assertTrue(all(item.dirty for item in items))
+        self.assertTrue(n.dirty)
+
+        # One notice per item, and one for the list.
+        self.assertEqual(items + [n], changed)
+
+    def test_replace_items(self):
+        n = node.List()
+        old = n.extend([('A', False), ('B', True)])
+        new = n.replace_items([('C', False)])
+        self.assertEqual(new, n.items)
+        self.assertTrue(all(item.deleted for item in old))
+
+    def test_check_items(self):
+        n = node.List()
+        items = n.extend([('A', False), ('B', True), ('C', False)])
+        clean_node(n)
+
+        n.check_items(items[:2])
+        self.assertEqual(items[:2], n.checked)
+        self.assertTrue(items[0].dirty)
+        self.assertFalse(items[1].dirty)
+        self.assertEqual(items[0].timestamps.updated, items[0].timestamps.edited)
+
+        n.check_items()
+        self.assertEqual(items, n.checked)
+        n.uncheck_items()
+        self.assertEqual(items, n.unchecked)
+
+    def test_reorder(self):
+        n = node.List()
+        a, b, c, d = n.extend([('A', False), ('B', False), ('C', False), ('D', False)])
+        clean_node(n)
+
+        n.reorder([d, b, a])
+        self.assertEqual([d, b, c, a], n.items)
+        self.assertFalse(b.dirty)
+        self.assertFalse(c.dirty)
+        self.assertTrue(a.dirty)
+
+    def test_items_cache(self):
+        n = node.List()
+        items = [n.add(str(i), sort=i) for i in range(10)]
+
+        def check():
+            expected = node.List.items_sort([item for item in n.children if not item.deleted])
+            self.assertEqual(expected, n.items)
+            self.assertEqual([item for item in expected if item.checked], n.checked)
+            self.assertEqual([item for item in expected if not item.checked], n.unchecked)
+
+        check()
+        items[0].sort = 100
+        check()
+        items[1].checked = True
+        check()
+        items[2].indent(items[3])
+        check()
+        items[2].sort = 200
+        check()
+        items[2].dedent(items[3])
+        check()
+        items[4].delete()
+        check()
+        n.remove(items[5])
+        check()
+        n.add('New', sort=50)
+        check()
+
+        # Changes from the server are picked up too.
+        raw = items[6].save()
+        raw['sortValue'] = 300
+        items[6].load(raw)
+        check()
+
+def reference_sort(items):
+    """The original comparison-based ordering: keys are compared element by element, and a missing element sorts
+    ahead of any value."""
+    def cmp(a, b):
+        for x, y in six.moves.zip_longest(a, b):
+            if x != y:
+                if x is None:
+                    return 1
+                if y is None:
+                    return -1
+                return x - y
+        return 0
+
+    def key(item):
+        if item.indented:
+            return (int(item.parent_item.sort), int(item.sort))
+        return (int(item.sort),)
+
+    return sorted(items, key=functools.cmp_to_key(lambda a, b: cmp(key(a), key(b))), reverse=True)
+
+class ItemsSortTests(unittest.TestCase):
+    def build(self, spec):
+        """Build a list from (sort, parent index) pairs."""
+        n = node.List()
+        items = []
+        for sort, parent in spec:
+            item = n.add(str(len(items)), sort=sort)
+            if parent is not None:
+                items[parent].indent(item)
+            items.append(item)
+        return n, items
+
+    def test_flat(self):
+        n, items = self.build([(1, None), (3, None), (2, None)])
+        self.assertEqual([items[1], items[2], items[0]], n.items)
+
+    def test_indented(self):
+        # Subitems follow their parent, whatever their own sort ids.
+        n, items = self.build([(10, None), (5, None), (1, 0), (20, 0), (7, 1), (6, None)])
+        self.assertEqual([items[0], items[3], items[2], items[5], items[1], items[4]], n.items)
+        self.assertEqual([items[3], items[2]], items[0].subitems)
+        self.assertEqual([items[4]], items[1].subitems)
+
+    def test_ties(self):
+        # Items with equal keys keep their relative order.
+        n, items = self.build([(5, None), (5, None), (5, 0), (5, 0)])
+        self.assertEqual(reference_sort(n.children), n.items)
+
+    def test_reference(self):
+        rand = random.Random(0)
+        for _ in range(200):
+            spec = []
+            for i in range(rand.randint(1, 30)):
+                parents = [j for j, (_, parent) in enumerate(spec) if parent is None]
+                parent = rand.choice(parents) if parents and rand.random() < 0.4 else None
+                spec.append((rand.randint(-5, 5), parent))
+            n, items = self.build(spec)
+            self.assertEqual(reference_sort(n.children), n.items)
+            for item in items:
+                self.assertEqual(reference_sort(item._subitems.values()), item.subitems)
+
 class ListItemTests(unittest.TestCase):
     def test_fields(self):
         n = node.ListItem()
@@ -471,6 +785,13 @@ class CollaboratorTests(unittest.TestCase):
         n.collaborators.remove(collab)
         self.assertTrue(n.dirty)
 
+    def test_empty(self):
+        a = node.NodeCollaborators()
+        a.load([], [])
+        a.add('user@google.com')
+        self.assertEqual(['user@google.com'], a.all())
+        self.assertEqual(0, len(node.NodeCollaborators()))
+
 class BlobTests(unittest.TestCase):
     def test_save_load(self):
         a, b = generate_save_load(node.NodeImage)
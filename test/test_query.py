@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import re
+
+import gkeepapi
+from gkeepapi import node
+
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class QueryTests(unittest.TestCase):
+    def setUp(self):
+        self.keep = gkeepapi.Keep(text_index=True)
+        self.label = self.keep.createLabel('Label')
+        self.a = self.keep.createNote('Shopping', 'Milk')
+        self.b = self.keep.createList('Groceries', [('Eggs', False), ('milk', True)])
+        self.c = self.keep.createNote('Misc', 'Other')
+        self.d = self.keep.createNote('Old', 'Milk')
+        self.a.labels.add(self.label)
+        self.b.labels.add(self.label)
+        self.b.color = node.ColorValue.Red
+        self.c.pinned = True
+        self.d.trashed = True
+
+    def test_criteria(self):
+        q = self.keep.query
+        self.assertEqual({self.a, self.b, self.c}, set(q()))
+        self.assertEqual({self.a, self.b}, set(q().label(self.label)))
+        self.assertEqual({self.a, self.b}, set(q().label('missing', self.label.id)))
+        self.assertEqual({self.c}, set(q().unlabeled()))
+        self.assertEqual({self.a, self.b, self.c}, set(q().unlabeled().label(self.label)))
+        self.assertEqual({self.a, self.b, self.c}, set(q().label(self.label).unlabeled()))
+        self.assertEqual({self.c}, set(q().label('missing').unlabeled()))
+        self.assertEqual({self.b}, set(q().color(node.ColorValue.Red)))
+        self.assertEqual({self.a, self.c}, set(q().color(node.ColorValue.White)))
+        self.assertEqual({self.c}, set(q().pinned()))
+        self.assertEqual({self.a, self.b}, set(q().pinned(False)))
+        self.assertEqual({self.d}, set(q().trashed()))
+        self.assertEqual({self.a, self.b, self.c, self.d}, set(q().trashed(None)))
+        self.assertEqual({self.a}, set(q().text('Milk')))
+        self.assertEqual({self.a, self.b}, set(q().text(re.compile('milk', re.I))))
+        self.assertEqual({self.b}, set(q().text('Eggs').text('milk')))
+        self.assertEqual({self.b}, set(q().label(self.label).filter(lambda n: isinstance(n, node.List))))
+        self.assertEqual([], q().label(self.label).pinned().all())
+
+    def test_sort(self):
+        for i, n in enumerate((self.b, self.c, self.a)):
+            n.timestamps.updated = node.NodeTimestamps.int_to_dt(1000 + i)
+
+        self.assertEqual([self.a, self.c, self.b], self.keep.query().sortByUpdated().all())
+        self.assertEqual([self.b, self.c, self.a], self.keep.query().sortByUpdated(False).all())
+        self.assertEqual([self.a, self.c], self.keep.query().sortByUpdated().limit(2).all())
+        self.assertEqual(self.b, self.keep.query().sortByUpdated(False).first())
+        self.assertEqual(None, self.keep.query().text('Nothing').first())
+
+    def test_order(self):
+        # Filter functions only see notes that passed the cheaper checks.
+        seen = []
+        def func(n):
+            seen.append(n)
+            return True
+        self.assertEqual({self.a, self.b}, set(self.keep.query().filter(func).label(self.label)))
+        self.assertEqual({self.a, self.b}, set(seen))
+
+    def test_lazy(self):
+        seen = []
+        def func(n):
+            seen.append(n)
+            return True
+        self.assertEqual(1, len(self.keep.query().filter(func).limit(1).all()))
+        self.assertEqual(1, len(seen))
+
+if __name__ == '__main__':
+    unittest.main()
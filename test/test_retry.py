@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import json
+import email.utils
+import time
+
+import requests
+
+import gkeepapi
+from gkeepapi import node, exception, retry
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class FakeResponse(object):
+    def __init__(self, code=200, body=None, headers=None):
+        self.status_code = code
+        self.text = json.dumps(body) if body is not None else 'Error'
+        self.content = self.text.encode('utf-8')
+        self.headers = headers or {}
+
+class FakeTransport(gkeepapi.transport.Transport):
+    """Returns canned responses, raising any exceptions."""
+    def __init__(self, responses):
+        super(FakeTransport, self).__init__()
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, **req_kwargs):
+        self.requests.append(req_kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def error(code, headers=None):
+    return FakeResponse(code, {'error': {'code': code}}, headers)
+
+OK = FakeResponse(200, {'toVersion': '1'})
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(retry.ErrorKind.Auth, retry.RetryPolicy.classify(401))
+        self.assertEqual(retry.ErrorKind.Throttle, retry.RetryPolicy.classify(429))
+        self.assertEqual(retry.ErrorKind.Server, retry.RetryPolicy.classify(503))
+        self.assertIsNone(retry.RetryPolicy.classify(400))
+
+    def test_delay(self):
+        policy = retry.RetryPolicy(budgets={retry.ErrorKind.Server: 3}, backoff=1.0, max_backoff=3.0)
+        for attempt, cap in enumerate([1.0, 2.0, 3.0]):
+            delay = policy.getDelay(retry.ErrorKind.Server, attempt)
+            self.assertTrue(0 <= delay <= cap)
+        self.assertIsNone(policy.getDelay(retry.ErrorKind.Server, 3))
+
+        self.assertEqual(2.5, policy.getDelay(retry.ErrorKind.Server, 0, retry_after=2.5))
+        self.assertIsNone(policy.getDelay(retry.ErrorKind.Server, 0, retry_after=60))
+        self.assertEqual(0, policy.getDelay(retry.ErrorKind.Auth, 0))
+
+    def test_retry_after(self):
+        self.assertEqual(5.0, retry.RetryPolicy.parseRetryAfter('5'))
+        self.assertIsNone(retry.RetryPolicy.parseRetryAfter(None))
+        self.assertIsNone(retry.RetryPolicy.parseRetryAfter('soon'))
+
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertTrue(25 < retry.RetryPolicy.parseRetryAfter(date) <= 30)
+
+class SendTests(unittest.TestCase):
+    def make_api(self, responses, **kwargs):
+        self.sleeps = []
+        self.refreshes = []
+        auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES)
+        auth._auth_token = 'token'
+        auth.refresh = lambda: self.refreshes.append(True)
+        policy = retry.RetryPolicy(sleep=self.sleeps.append, **kwargs)
+        self.transport = FakeTransport(responses)
+        return gkeepapi.KeepAPI(auth, transport=self.transport, retry_policy=policy)
+
+    def test_changes(self):
+        api = self.make_api([error(503), requests.exceptions.ConnectionError(), error(429, {'Retry-After': '2'}), OK])
+        self.assertEqual({'toVersion': '1'}, api.changes())
+        self.assertEqual(4, len(self.transport.requests))
+        self.assertEqual(3, len(self.sleeps))
+        self.assertEqual(2.0, self.sleeps[-1])
+
+    def test_budget(self):
+        api = self.make_api([error(503)] * 3, budgets={retry.ErrorKind.Server: 2})
+        with self.assertRaises(exception.APIException) as ctx:
+            api.changes()
+        self.assertEqual(503, ctx.exception.code)
+        self.assertEqual(2, len(self.sleeps))
+
+    def test_refresh(self):
+        api = self.make_api([error(401), error(401), OK])
+        api.changes()
+        self.assertEqual(2, len(self.refreshes))
+        self.assertEqual([], self.sleeps)
+
+        api = self.make_api([error(401)] * 4)
+        with self.assertRaises(exception.APIException):
+            api.changes()
+
+    def test_not_idempotent(self):
+        api = self.make_api([error(503)])
+        with self.assertRaises(exception.APIException):
+            api.send(url='https://example.com/', method='POST')
+
+        api = self.make_api([requests.exceptions.ReadTimeout()])
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            api.send(url='https://example.com/', method='POST')
+
+        # Rate limited and unsent requests are always retried.
+        api = self.make_api([error(429), requests.exceptions.ConnectTimeout(), OK])
+        api.send(url='https://example.com/', method='POST')
+        self.assertEqual(2, len(self.sleeps))
+
+    def test_non_json(self):
+        api = self.make_api([FakeResponse(502), OK])
+        self.assertEqual({'toVersion': '1'}, api.changes())
+
+        api = self.make_api([FakeResponse(400)])
+        with self.assertRaises(exception.APIException) as ctx:
+            api.changes()
+        self.assertEqual(400, ctx.exception.code)
+
+    def test_no_retry(self):
+        api = self.make_api([error(500)])
+        api.setRetryPolicy(retry.NoRetryPolicy(sleep=self.sleeps.append))
+        with self.assertRaises(exception.APIException):
+            api.changes()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import threading
+import time
+
+import gkeepapi
+from gkeepapi import node, scheduler, exception
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+logging.getLogger(scheduler.__name__).addHandler(logging.NullHandler())
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_keep(name, log, fail=None):
+    """Create a Keep object with a fake server. Syncs are recorded in the log."""
+    keep = gkeepapi.Keep()
+    keep._reminders_api.list = lambda: {'storageVersion': '1'}
+    keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+
+    def changes(target_version=None, nodes=None, labels=None):
+        log.append(name)
+        if fail:
+            fail.pop()
+            raise exception.APIException(500, 'Error')
+        return {'toVersion': '1', 'truncated': False}
+    keep._keep_api.changes = changes
+    return keep
+
+class SchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.log = []
+
+    def test_interval(self):
+        sched = scheduler.SyncScheduler(workers=2, interval=60, clock=self.clock)
+        for name in ('a', 'b', 'c'):
+            sched.add(name, make_keep(name, self.log))
+
+        self.assertEqual(3, sched.runPending())
+        self.assertEqual(['a', 'b', 'c'], sorted(self.log))
+        self.assertEqual(0, sched.runPending())
+
+        self.clock.now += 60
+        self.assertEqual(3, sched.runPending())
+        stats = sched.getStats()
+        self.assertEqual(6, stats['syncs'])
+        self.assertEqual(0, stats['failures'])
+        self.assertEqual(3, stats['accounts'])
+        self.assertEqual(2, sched.get('a').syncs)
+
+    def test_priority(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=60, clock=self.clock)
+        keeps = dict((name, make_keep(name, self.log)) for name in ('a', 'b', 'c'))
+        for name in ('a', 'b', 'c'):
+            sched.add(name, keeps[name])
+            self.clock.now += 1
+        sched.runPending()
+        self.assertEqual(['a', 'b', 'c'], self.log)
+
+        # Accounts with changes are synced first, and without waiting for the interval.
+        del self.log[:]
+        self.clock.now += 60
+        keeps['c'].createNote('Title', 'Text')
+        sched.runPending()
+        self.assertEqual(['c', 'a', 'b'], self.log)
+
+        del self.log[:]
+        keeps['b'].createNote('Title', 'Text')
+        sched.runPending()
+        self.assertEqual(['b'], self.log)
+
+    def test_backoff(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=600, backoff=10, clock=self.clock)
+        sched.add('a', make_keep('a', self.log, fail=[True, True]))
+
+        self.assertEqual(1, sched.runPending())
+        account = sched.get('a')
+        self.assertEqual(1, account.failures)
+        self.assertIsInstance(account.last_error, exception.APIException)
+        self.assertTrue(self.clock.now + 5 <= account.due <= self.clock.now + 10)
+        self.assertEqual(0, sched.runPending())
+
+        self.clock.now += 10
+        self.assertEqual(1, sched.runPending())
+        self.assertEqual(2, account.failures)
+        self.assertTrue(self.clock.now + 10 <= account.due <= self.clock.now + 20)
+
+        self.clock.now += 20
+        self.assertEqual(1, sched.runPending())
+        self.assertEqual(0, account.failures)
+        self.assertEqual(self.clock.now + 600, account.due)
+        self.assertEqual(2, sched.getStats()['failures'])
+
+    def test_stop_on_error(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=600, backoff=10, clock=self.clock)
+        keep = make_keep('a', self.log)
+        def changes(target_version=None, nodes=None, labels=None):
+            self.log.append('a')
+            raise exception.LoginException('Bad token')
+        keep._keep_api.changes = changes
+        sched.add('a', keep)
+
+        # Errors that retrying won't fix aren't retried, even if there are changes to send.
+        self.assertEqual(1, sched.runPending())
+        account = sched.get('a')
+        self.assertTrue(account.stopped)
+        self.assertIsInstance(account.last_error, exception.LoginException)
+        keep.createNote('Title', 'Text')
+        self.clock.now += 3600
+        self.assertEqual(0, sched.runPending())
+        self.assertEqual(0, sched.getStats()['due'])
+
+        # Rescheduling the account resumes it.
+        keep._keep_api.changes = make_keep('a', self.log)._keep_api.changes
+        sched.schedule('a')
+        self.assertEqual(1, sched.runPending())
+        self.assertFalse(account.stopped)
+        self.assertEqual(0, account.failures)
+        self.assertEqual(['a', 'a'], self.log)
+
+        # Network errors are retried.
+        error = keep._keep_api.getTransport().CONNECTION_ERRORS[0]('Connection reset')
+        self.assertTrue(scheduler.SyncScheduler._isTransient(keep, error))
+
+    def test_resync(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=600, backoff=10, clock=self.clock)
+        keep = make_keep('a', self.log)
+        responses = [
+            {'toVersion': '1', 'truncated': False, 'forceFullResync': True},
+            {'toVersion': '1', 'truncated': False},
+        ]
+        def changes(target_version=None, nodes=None, labels=None):
+            self.log.append(target_version)
+            return responses.pop(0)
+        keep._keep_api.changes = changes
+        keep._keep_version = '5'
+        sched.add('a', keep)
+
+        # The account is resynced from scratch, rather than stopped.
+        self.assertEqual(1, sched.runPending())
+        account = sched.get('a')
+        self.assertFalse(account.stopped)
+        self.assertEqual(0, account.failures)
+        self.assertEqual(['5', None], self.log)
+
+        # Other consistency errors are retried.
+        error = exception.UpgradeRecommendedException('Upgrade recommended')
+        self.assertTrue(scheduler.SyncScheduler._isTransient(keep, error))
+
+    def test_check_unlocked(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=600, clock=self.clock)
+        keep = make_keep('a', self.log)
+        locked = []
+        def has_changes():
+            # Try to take the lock from another thread, as the lock is reentrant.
+            def check():
+                acquired = sched._lock.acquire(False)
+                if acquired:
+                    sched._lock.release()
+                locked.append(not acquired)
+            thread = threading.Thread(target=check)
+            thread.start()
+            thread.join()
+            return False
+        keep.hasChanges = has_changes
+        sched.add('a', keep)
+
+        self.assertEqual(1, sched.runPending())
+        self.assertTrue(locked)
+        self.assertFalse(any(locked))
+
+    def test_check_error(self):
+        sched = scheduler.SyncScheduler(workers=1, interval=600)
+        synced = threading.Event()
+        keep = make_keep('a', self.log)
+        keep._finishSync = synced.set
+        def has_changes():
+            raise RuntimeError('dictionary changed size during iteration')
+        keep.hasChanges = has_changes
+        sched.add('a', keep)
+
+        # Due accounts are still synced, and the dispatcher keeps running.
+        sched.start()
+        self.assertTrue(synced.wait(5))
+        synced.clear()
+        sched.schedule('a')
+        self.assertTrue(synced.wait(5))
+        sched.stop()
+        self.assertEqual(['a', 'a'], self.log)
+
+    def test_start(self):
+        sched = scheduler.SyncScheduler(workers=2, interval=600)
+        synced = threading.Event()
+        keep = make_keep('a', self.log)
+        keep._finishSync = synced.set
+        sched.add('a', keep)
+
+        sched.start()
+        self.assertTrue(synced.wait(5))
+        sched.stop()
+        self.assertEqual(['a'], self.log)
+        self.assertGreater(sched.getStats()['throughput'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
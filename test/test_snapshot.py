@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import io
+import json
+
+import gkeepapi
+from gkeepapi import node, snapshot, exception
+
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+def encode(*records):
+    fp = io.BytesIO()
+    writer = snapshot.Writer(fp)
+    for type_, value in records:
+        writer.write(type_, value)
+    writer.close()
+    return fp.getvalue()
+
+class SnapshotTests(unittest.TestCase):
+    def test_values(self):
+        value = {
+            'str': u'Unicode ☃',
+            'int': -12345678901234567890,
+            'float': 1.5,
+            'bool': True,
+            'none': None,
+            'list': [1, [2, {'a': 'b'}], {}],
+            'dict': {'created': '1970-01-01T00:00:00.000Z', 'x': '2018-01-01T00:00:00.000000'},
+        }
+        records = list(snapshot.Reader(io.BytesIO(encode((snapshot.RecordType.Node, value)))))
+        self.assertEqual([(snapshot.RecordType.Node, value)], records)
+
+    def test_timestamps(self):
+        tzs = node.NodeTimestamps.dt_to_str(node.NodeTimestamps.int_to_dt(1500000000.25))
+        data = encode(
+            (snapshot.RecordType.Node, {'created': tzs}),
+            (snapshot.RecordType.Node, {'created': node.NodeTimestamps.int_to_str(0)}),
+        )
+        self.assertNotIn(tzs.encode('utf-8'), data)
+
+        records = list(snapshot.Reader(io.BytesIO(data)))
+        self.assertEqual(node.NodeTimestamps.str_to_dt(tzs), records[0][1]['created'])
+        self.assertEqual(node.NodeTimestamps.int_to_dt(0), records[1][1]['created'])
+
+    def test_timestamp_text(self):
+        # Only timestamp fields are decoded to datetimes.
+        tzs = '2018-01-01T00:00:00.000000Z'
+        keep = gkeepapi.Keep()
+        note = keep.createNote(tzs, tzs)
+        note.labels.add(keep.createLabel(tzs))
+
+        fp = io.BytesIO()
+        keep.dumpTo(fp)
+        fp.seek(0)
+        keep2 = gkeepapi.Keep()
+        keep2.restoreFrom(fp)
+
+        note2 = keep2.get(note.id)
+        self.assertEqual(tzs, note2.title)
+        self.assertEqual(tzs, note2.text)
+        self.assertEqual(tzs, keep2.findLabel(tzs).name)
+        json.dumps(keep2.dump())
+
+    def test_invalid(self):
+        data = encode((snapshot.RecordType.Node, {'a': 'b'}))
+
+        with self.assertRaises(exception.ParseException):
+            list(snapshot.Reader(io.BytesIO(b'JUNK' + data)))
+        with self.assertRaises(exception.ParseException):
+            list(snapshot.Reader(io.BytesIO(data[:-1])))
+        with self.assertRaises(exception.ParseException):
+            list(snapshot.Reader(io.BytesIO(data[:len(snapshot.MAGIC)] + b'\x63' + data[len(snapshot.MAGIC) + 1:])))
+
+    def test_keep(self):
+        keep = gkeepapi.Keep()
+        label = keep.createLabel('Label')
+        note = keep.createNote('Title', u'Text ☃')
+        note.labels.add(label)
+        note.annotations.category = node.CategoryValue.Books
+        glist = keep.createList('List', [('A', False), ('B', True)])
+        item_a, item_b = glist.items
+        item_a.indent(item_b)
+        keep._keep_version = 'version'
+
+        fp = io.BytesIO()
+        keep.dumpTo(fp)
+        fp.seek(0)
+
+        keep2 = gkeepapi.Keep()
+        keep2.restoreFrom(fp)
+        self.assertEqual(keep.dump(), keep2.dump())
+        self.assertEqual([keep2.get(note.id)], list(keep2.find(labels=[label.id])))
+        self.assertEqual([item_b.id], [item.id for item in keep2._nodes[item_a.id].subitems])
+
+    def test_batches(self):
+        keep = gkeepapi.Keep()
+        for i in range(5):
+            keep.createList(str(i), [('A', False), ('B', True)])
+
+        fp = io.BytesIO()
+        keep.dumpTo(fp)
+        fp.seek(0)
+
+        keep2 = gkeepapi.Keep()
+        keep2.RESTORE_BATCH_SIZE = 2
+        keep2.restoreFrom(fp)
+        self.assertEqual(keep.dump(), keep2.dump())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+
+import gkeepapi
+from gkeepapi import node, store, exception
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+logging.getLogger(store.__name__).addHandler(logging.NullHandler())
+
+def fake_sync(keep, raw_nodes=None, version='2'):
+    """Point the Keep object at a fake server that returns the given nodes."""
+    keep._reminders_api.list = lambda: {'storageVersion': '1'}
+    keep._reminders_api.history = lambda version: {'highestStorageVersion': '1'}
+
+    def changes(target_version=None, nodes=None, labels=None):
+        ret = {'toVersion': version, 'truncated': False}
+        if raw_nodes is not None:
+            ret['nodes'] = raw_nodes
+        return ret
+    keep._keep_api.changes = changes
+
+def sample():
+    keep = gkeepapi.Keep()
+    label = keep.createLabel('Label')
+    note = keep.createNote('Title', u'Text ☃')
+    note.labels.add(label)
+    glist = keep.createList('List', [('A', False), ('B', True)])
+    for n in keep._findDirtyNodes():
+        n.save()
+    keep._keep_version = '1'
+    return keep, note, glist
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'state')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+class MmapStoreTests(StoreTestCase):
+
+    def test_update(self):
+        keep, note, glist = sample()
+        s = store.MmapStore(self.path)
+        s.update(keep._keep_version, None, keep.labels(), keep._dumpNodes(), [])
+        s.close()
+
+        s = store.MmapStore(self.path)
+        self.assertEqual(5, len(s))
+        self.assertEqual('1', s.getMeta()['keep_version'])
+        self.assertEqual(node.Root.ID, s.getParentId(note.id))
+        self.assertEqual(set(i.id for i in glist.items), set(s.getChildIds(glist.id)))
+        self.assertEqual('Title', s.load(note.id)['title'])
+
+        s.update('2', None, keep.labels(), [], [note.id])
+        self.assertNotIn(note.id, s)
+        self.assertEqual('2', s.getMeta()['keep_version'])
+
+        before = os.path.getsize(self.path)
+        s.compact()
+        self.assertLess(os.path.getsize(self.path), before)
+        self.assertEqual('List', s.load(glist.id)['title'])
+        s.close()
+
+    def test_timestamp_text(self):
+        tzs = '2018-01-01T00:00:00.000000Z'
+        keep, note, _ = sample()
+        note.title = tzs
+        note.text = tzs
+        s = store.MmapStore(self.path)
+        s.update(keep._keep_version, None, keep.labels(), keep._dumpNodes(), [])
+        s.close()
+
+        s = store.MmapStore(self.path)
+        keep2 = gkeepapi.Keep(store=s)
+        note2 = keep2.get(note.id)
+        self.assertEqual(tzs, note2.title)
+        self.assertEqual(tzs, note2.text)
+        s.close()
+
+    def test_partial_record(self):
+        keep, note, _ = sample()
+        s = store.MmapStore(self.path)
+        s.update(keep._keep_version, None, keep.labels(), [note], [])
+        size = os.path.getsize(self.path)
+        note.title = 'Title 2'
+        s.update(keep._keep_version, None, keep.labels(), [note], [])
+        s.close()
+
+        with open(self.path, 'r+b') as fp:
+            fp.truncate(size + 10)
+
+        s = store.MmapStore(self.path)
+        self.assertEqual('Title', s.load(note.id)['title'])
+        s.update(keep._keep_version, None, keep.labels(), [note], [])
+        s.close()
+
+        s = store.MmapStore(self.path)
+        self.assertEqual('Title 2', s.load(note.id)['title'])
+        s.close()
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as fp:
+            fp.write(b'JUNKJUNKJUNK')
+        with self.assertRaises(exception.ParseException):
+            store.MmapStore(self.path)
+
+class KeepStoreMixin(object):
+    def open(self):
+        raise NotImplementedError()
+
+    def test_keep(self):
+        keep, note, glist = sample()
+        note.pinned = True
+        s = self.open()
+        keep2 = gkeepapi.Keep(store=s)
+        keep2.restore(keep.dump())
+        s.close()
+
+        s = self.open()
+        keep3 = gkeepapi.Keep(store=s)
+        self.assertEqual('1', keep3._keep_version)
+        # Only the modified note is loaded up front.
+        self.assertIn(note.id, keep3._nodes)
+        self.assertNotIn(glist.id, keep3._nodes)
+        self.assertEqual([note.id], [n.id for n in keep3._findDirtyNodes()])
+
+        self.assertEqual(['A', 'B'], sorted(i.text for i in keep3.get(glist.id).items))
+        state, state3 = keep.dump(), keep3.dump()
+        for value in (state, state3):
+            value['nodes'].sort(key=lambda raw: raw['id'])
+        self.assertEqual(state, state3)
+        s.close()
+
+    def test_sync(self):
+        keep, note, glist = sample()
+        s = self.open()
+        keep2 = gkeepapi.Keep(store=s)
+        keep2.restore(keep.dump())
+
+        item = [i for i in glist.items if i.text == 'A'][0]
+        raw_item = item.save(False)
+        raw_item['text'] = 'C'
+        fake_sync(keep2, [raw_item, {'id': note.id}])
+        keep2.sync()
+        self.assertNotIn(note.id, keep2._nodes)
+        s.close()
+
+        s = self.open()
+        keep3 = gkeepapi.Keep(store=s)
+        self.assertEqual('2', keep3._keep_version)
+        self.assertIsNone(keep3.get(note.id))
+        self.assertEqual(['B', 'C'], sorted(i.text for i in keep3.get(glist.id).items))
+
+        keep3.get(glist.id).title = 'List 2'
+        fake_sync(keep3, version='3')
+        keep3.sync()
+        s.close()
+
+        s = self.open()
+        self.assertEqual('List 2', s.load(glist.id)['title'])
+        self.assertEqual('3', s.getMeta()['keep_version'])
+        s.close()
+
+class MmapKeepTests(KeepStoreMixin, StoreTestCase):
+    def open(self):
+        return store.MmapStore(self.path)
+
+class SQLiteKeepTests(KeepStoreMixin, StoreTestCase):
+    def open(self):
+        return store.SQLiteStore(self.path)
+
+    def test_find(self):
+        keep, note, glist = sample()
+        label = keep.findLabel('Label')
+        glist.pinned = True
+        glist.save()
+        s = self.open()
+        keep2 = gkeepapi.Keep(store=s)
+        keep2.restore(keep.dump())
+        s.close()
+
+        s = self.open()
+        self.assertEqual([glist.id], s.find(pinned=True))
+        self.assertEqual([note.id], s.find(labels=[label.id]))
+        self.assertEqual([glist.id], s.find(labels=[]))
+
+        keep3 = gkeepapi.Keep(store=s)
+        self.assertEqual([note.id], [n.id for n in keep3.find(labels=[label])])
+        self.assertNotIn(glist.id, keep3._nodes)
+        self.assertEqual(set([note.id, glist.id]), set(n.id for n in keep3.query().unlabeled().label(label)))
+
+        # Loaded nodes are matched based on their current state.
+        keep3.get(note.id).pinned = True
+        self.assertEqual(set([note.id, glist.id]), set(n.id for n in keep3.find(pinned=True)))
+        s.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import json
+import threading
+import zlib
+
+from six.moves import BaseHTTPServer, socketserver
+
+import gkeepapi
+from gkeepapi import node, transport, jsoncodec
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logging.getLogger(gkeepapi.__name__).addHandler(logging.NullHandler())
+logging.getLogger(node.__name__).addHandler(logging.NullHandler())
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        self.server.headers.append(dict(self.headers))
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        request = json.loads(body.decode('utf-8'))
+        self.server.bodies.append(request)
+
+        code = self.server.errors.pop(0) if self.server.errors else 200
+        if code != 200:
+            body = json.dumps({'error': {'code': code}}).encode('utf-8')
+        else:
+            body = json.dumps({'nodes': request.get('nodes', []), 'toVersion': '1', 'truncated': False}).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.gzip:
+            body = jsoncodec.gzip(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        self.send_response(302)
+        self.send_header('Location', 'https://example.com' + self.path)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args): # pylint: disable=arguments-differ
+        pass
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+class TransportTests(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.server.connections = set()
+        self.server.headers = []
+        self.server.bodies = []
+        self.server.errors = []
+        self.server.gzip = False
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,))
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_api(self, trans):
+        auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES)
+        auth._auth_token = 'token'
+        api = gkeepapi.KeepAPI(auth, trans)
+        api._base_url = self.url
+        return api
+
+    def test_shared(self):
+        trans = transport.Transport()
+        keeps = [gkeepapi.Keep(transport=trans) for _ in range(3)]
+        for keep in keeps:
+            for api in (keep._keep_api, keep._reminders_api, keep._media_api):
+                self.assertIs(trans, api.getTransport())
+
+        # A Keep object's APIs share a transport by default.
+        keep = gkeepapi.Keep()
+        self.assertIs(keep._keep_api.getTransport(), keep._reminders_api.getTransport())
+        self.assertIsNot(trans, keep._keep_api.getTransport())
+
+    def test_keep_alive(self):
+        trans = transport.Transport()
+        apis = [self.make_api(trans) for _ in range(3)]
+        for api in apis:
+            self.assertEqual('1', api.changes()['toVersion'])
+        self.assertEqual(1, len(self.server.connections))
+        self.assertTrue(self.server.headers[0]['User-Agent'].startswith('gkeepapi/'))
+        trans.close()
+
+    def test_no_keep_alive(self):
+        api = self.make_api(transport.Transport(keep_alive=False))
+        for _ in range(3):
+            api.changes()
+        self.assertEqual(3, len(self.server.connections))
+
+    def test_host_limits(self):
+        trans = transport.Transport(pool_maxsize=5, host_limits={self.url: 2})
+        self.assertEqual(2, trans._session.get_adapter(self.url)._pool_maxsize)
+        self.assertEqual(5, trans._session.get_adapter('https://example.com/')._pool_maxsize)
+
+        api = self.make_api(trans)
+        threads = [threading.Thread(target=api.changes) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(self.server.connections), 2)
+
+    def test_compression(self):
+        api = self.make_api(transport.Transport())
+        api.setCompression(True)
+        api.changes()
+        nodes = [{'id': str(i), 'text': 'Text ' * 20} for i in range(50)]
+        api.changes(nodes=nodes)
+
+        self.assertNotIn('Content-Encoding', self.server.headers[0])
+        self.assertEqual('gzip', self.server.headers[1]['Content-Encoding'])
+        self.assertLess(int(self.server.headers[1]['Content-Length']), len(json.dumps(nodes)))
+        self.assertEqual(nodes, self.server.bodies[1]['nodes'])
+        self.assertEqual('gzip', self.server.headers[1]['Accept-Encoding'])
+
+    def test_stream(self):
+        api = self.make_api(transport.Transport())
+        api.setRetryPolicy(gkeepapi.retry.RetryPolicy(sleep=lambda delay: None))
+        api.STREAM_CHUNK_SIZE = 64
+        self.server.gzip = True
+        self.server.errors = [503]
+
+        nodes = [{'id': str(i), 'text': 'Text ' * 20} for i in range(50)]
+        stream = api.changes(nodes=nodes, stream=True)
+        self.assertIsInstance(stream, gkeepapi.jsonstream.ObjectStream)
+        self.assertEqual(nodes, list(stream.items()))
+        self.assertEqual('1', stream.fields['toVersion'])
+        stream.close()
+        self.assertEqual(2, len(self.server.bodies))
+
+        # Errors are read in full.
+        self.server.errors = [400]
+        with self.assertRaises(gkeepapi.exception.APIException):
+            api.changes(stream=True)
+
+    def test_codecs(self):
+        codecs = [jsoncodec.JSONCodec(), jsoncodec.default_codec()]
+        obj = {'id': '1', 'text': u'T\u00e9xt', 'items': [1, 2.5, None, True]}
+        for codec in codecs:
+            self.assertEqual(obj, codec.loads(codec.dumps(obj)))
+            with self.assertRaises(ValueError):
+                codec.loads(b'<html>')
+
+        api = self.make_api(transport.Transport())
+        api.setCodec(codecs[0])
+        self.assertEqual('1', api.changes()['toVersion'])
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_httpx(self):
+        trans = transport.HTTPXTransport(http2=False)
+        api = self.make_api(trans)
+        for _ in range(2):
+            self.assertEqual('1', api.changes()['toVersion'])
+        stream = api.changes(nodes=[{'id': '1'}], stream=True)
+        self.assertEqual([{'id': '1'}], list(stream.items()))
+        stream.close()
+        self.assertEqual(1, len(self.server.connections))
+
+        media = gkeepapi.MediaAPI(api.getAuth(), trans)
+        media._base_url = self.url
+        note = node.Note()
+        note.server_id = 'note'
+        blob = node.Blob(parent_id=note.id)
+        blob.server_id = 'blob'
+        note.append(blob)
+        self.assertEqual('https://example.com/note/blob?s=0', media.get(blob))
+        trans.close()
+
+if __name__ == '__main__':
+    unittest.main()